@@ -11,7 +11,7 @@ import time
 import uuid
 from pathlib import Path
 import sys
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 
 # 프로젝트 루트 경로 설정
 project_root = Path(__file__).parent.parent
@@ -39,6 +39,7 @@ if os.getenv("LANGCHAIN_API_KEY"):
 # 핵심 모듈 임포트
 try:
     from core.agent_processor import ToolCallingAgentProcessor
+    from core.rag_registry import get_rag_registry
 except ImportError as e:
     st.error(f"핵심 모듈 임포트 실패: {e}")
     st.stop()
@@ -100,6 +101,45 @@ class UnifiedChatbotSystem:
                 'success': False
             }
 
+    def stream_query(self, user_input: str, current_user_id: Optional[int] = None,
+                     session_id: str = None) -> Iterator[Dict[str, Any]]:
+        """사용자 쿼리 스트리밍 처리 (토큰/도구 이벤트 후 최종 결과 이벤트)"""
+        start_time = time.time()
+        
+        try:
+            for event in self.agent_processor.stream_query(user_input, current_user_id, session_id):
+                if event['type'] != 'done':
+                    yield event
+                    continue
+                
+                agent_result = event['result']
+                yield {
+                    'type': 'done',
+                    'result': {
+                        'response': agent_result.get('response', '죄송합니다. 응답을 생성할 수 없습니다.'),
+                        'method': agent_result.get('method', 'tool_calling_agent'),
+                        'response_time': time.time() - start_time,
+                        'tools_used': agent_result.get('tools_used', []),
+                        'tasks_executed': agent_result.get('tasks_executed', 0),
+                        'success': agent_result.get('success', True)
+                    }
+                }
+                
+        except Exception as e:
+            response = f"죄송합니다. 시스템 오류가 발생했습니다: {str(e)}"
+            yield {'type': 'token', 'content': response}
+            yield {
+                'type': 'done',
+                'result': {
+                    'response': response,
+                    'method': 'error',
+                    'response_time': time.time() - start_time,
+                    'tools_used': [],
+                    'tasks_executed': 0,
+                    'success': False
+                }
+            }
+
 
 def main():
     """메인 애플리케이션"""
@@ -122,8 +162,8 @@ def main():
 
         # 데이터베이스에서 사용자 목록 조회
         try:
-            from core.db_query_engine import DatabaseQueryEngine
-            db_engine = DatabaseQueryEngine()
+            from core.db_query_engine import get_db_engine
+            db_engine = get_db_engine()
             users = db_engine.get_all_users()
             
             user_options = ["로그인하지 않음"] + [f"{user['username']} ({user['email']})" for user in users]
@@ -195,6 +235,9 @@ def main():
     # 챗봇 시스템 초기화 (캐시 클리어를 위해 강제 재초기화)
     if 'unified_chatbot' not in st.session_state or st.button("🔄 시스템 재시작"):
         with st.spinner("🚀 통합 챗봇 시스템을 초기화하는 중..."):
+            if 'unified_chatbot' in st.session_state:
+                # 재시작 시 모든 세션이 공유하는 RAG 벡터 스토어도 다시 읽음
+                get_rag_registry().reload_all()
             st.session_state.unified_chatbot = UnifiedChatbotSystem()
             if 'unified_chatbot' in st.session_state:
                 st.success("✅ 시스템이 성공적으로 재시작되었습니다!")
@@ -227,16 +270,35 @@ def main():
         with st.chat_message("user"):
             st.write(user_input)
         
-        # AI 응답 생성 및 표시
+        # AI 응답 생성 및 표시 (토큰 단위 스트리밍)
         with st.chat_message("assistant"):
-            with st.spinner("🤖 AI가 답변을 생성하는 중..."):
-                result = chatbot.process_query(
+            status = st.empty()
+            status.caption("🤖 AI가 답변을 생성하는 중...")
+            result = {}
+            rag_tokens = []
+
+            def token_stream():
+                for event in chatbot.stream_query(
                     user_input,
                     st.session_state.current_user_id,
                     st.session_state.session_id
-                )
-
-            st.write(result['response'])
+                ):
+                    if event['type'] == 'token':
+                        yield event['content']
+                    elif event['type'] == 'rag_token':
+                        # 문서 검색 답변은 최종 답변이 나오기 전까지 미리보기로 표시
+                        rag_tokens.append(event['content'])
+                        status.caption(f"📚 {''.join(rag_tokens)}")
+                    elif event['type'] == 'tool_start':
+                        rag_tokens.clear()
+                        status.caption(f"🔧 {event['tool']} 도구 사용 중...")
+                    elif event['type'] == 'tool_end' and not rag_tokens:
+                        status.caption("🤖 AI가 답변을 생성하는 중...")
+                    elif event['type'] == 'done':
+                        result.update(event['result'])
+
+            st.write_stream(token_stream())
+            status.empty()
 
             # 메타 정보 표시
             if result.get('method') == 'batch_processing':
@@ -2,21 +2,75 @@
 Tool Calling Agent 프로세서
 LangChain의 create_tool_calling_agent를 사용한 에이전트 구현
 """
+import queue
+import threading
 import time
-from typing import Dict, Any, List, Optional, Tuple
-from langchain_openai import ChatOpenAI
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.callbacks import BaseCallbackHandler
 from core.response_styler import ResponseStyler
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from .db_query_engine import get_db_engine
 from .langchain_tools import get_all_tools
+from .rag_registry import get_rag_registry
 
 load_dotenv()
 
 
+class _StreamCancelled(Exception):
+    """스트림 소비자가 중단하여 에이전트 실행을 멈출 때 사용"""
+
+
+class _StreamingEventHandler(BaseCallbackHandler):
+    """에이전트 실행 중 LLM 토큰과 도구 호출 이벤트를 큐로 전달하는 콜백 핸들러
+
+    cancel_event가 설정되면 다음 콜백에서 _StreamCancelled를 발생시켜 에이전트 실행을 중단한다.
+    """
+
+    # 콜백 예외를 무시하지 않고 에이전트 실행까지 전달 (중단 신호용)
+    raise_error: bool = True
+
+    def __init__(self, event_queue: "queue.Queue", cancel_event: Optional[threading.Event] = None):
+        self.event_queue = event_queue
+        self.cancel_event = cancel_event
+
+    def _check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise _StreamCancelled("스트림 소비자가 중단했습니다.")
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Dict[str, Any], **kwargs: Any) -> None:
+        self._check_cancelled()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self._check_cancelled()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], **kwargs: Any) -> None:
+        self._check_cancelled()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self._check_cancelled()
+        # 도구 호출 청크는 내용이 비어 있으므로 제외
+        if token:
+            self.event_queue.put({"type": "token", "content": token})
+
+    def on_custom_event(self, name: str, data: Any, **kwargs: Any) -> None:
+        # RAG 검색 도구가 생성 중인 답변 토큰 (RAGSearchTool 참고)
+        if name == "rag_token":
+            self._check_cancelled()
+            self.event_queue.put({"type": "rag_token", "content": data["content"]})
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self._check_cancelled()
+        self.event_queue.put({"type": "tool_start", "tool": (serialized or {}).get("name", "")})
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        self.event_queue.put({"type": "tool_end", "tool": kwargs.get("name", "")})
+
+
 class ToolCallingAgentProcessor:
     """Tool Calling Agent 기반 쿼리 프로세서"""
 
@@ -30,11 +84,8 @@ class ToolCallingAgentProcessor:
         self.model_name = model_name
         self.temperature = temperature
 
-        # LLM 초기화 (비용 절약을 위해 GPT-4o-mini 사용)
-        self.llm = ChatOpenAI(
-            model=model_name,
-            temperature=temperature
-        )
+        # LLM 초기화 (같은 설정의 클라이언트는 프로세스 전체에서 공유)
+        self.llm = get_rag_registry().get_llm(model_name, temperature)
         
         # 도구들 로드 (초기에는 사용자 컨텍스트 없이)
         self.tools = get_all_tools()
@@ -48,11 +99,12 @@ class ToolCallingAgentProcessor:
         # 대화 기록
         self.chat_history = []
 
+        # 대화 기록/도구/에이전트는 요청 간에 공유되므로 한 인스턴스의 에이전트 실행은 한 번에 하나씩
+        # (stream_query의 작업 스레드와 process_query가 동시에 들어와도 순서대로 처리)
+        self._request_lock = threading.RLock()
+
         # Batch 처리용 별도 LLM (더 빠른 응답을 위해)
-        self.batch_llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.1
-        )
+        self.batch_llm = get_rag_registry().get_llm("gpt-4o-mini", 0.1)
     
     def _initialize_agent(self):
         """에이전트 초기화"""
@@ -144,8 +196,8 @@ class ToolCallingAgentProcessor:
         """대화 기록 초기화"""
         self.chat_history = []
     
-    def process_query(self, query: str, user_id: Optional[str] = None, 
-                     session_id: Optional[str] = None) -> Dict[str, Any]:
+    def _handle_simple_query(self, query: str) -> Optional[Dict[str, Any]]:
+        """인사나 의미 없는 질문은 에이전트 실행 없이 바로 응답"""
         # 인사 감지
         if self._is_greeting(query):
             return {
@@ -165,6 +217,84 @@ class ToolCallingAgentProcessor:
                 "tools_used": [],
                 "success": True
             }
+
+        return None
+
+    def _prepare_agent_input(self, query: str, user_id: Optional[str]) -> Dict[str, Any]:
+        """사용자 컨텍스트 반영 후 에이전트 입력 생성"""
+        # 사용자 컨텍스트가 변경된 경우 도구들 업데이트
+        if user_id != self.current_user_id:
+            self.current_user_id = user_id
+            self.tools = get_all_tools(user_id)
+            # 에이전트 재초기화
+            self._initialize_agent()
+
+        # 사용자 컨텍스트가 있는 경우 쿼리에 추가
+        enhanced_query = query
+        if user_id:
+            enhanced_query = f"[현재 로그인한 사용자 ID: {user_id}] {query}"
+
+        return {
+            "input": enhanced_query,
+            "chat_history": self.chat_history
+        }
+
+    def _build_agent_result(self, query: str, result: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """에이전트 실행 결과를 응답 딕셔너리로 변환하고 대화 기록에 추가"""
+        response = result.get("output", "죄송합니다. 응답을 생성할 수 없습니다.")
+        
+        # 대화 기록에 추가
+        self.add_to_chat_history(query, response)
+        
+        return {
+            "response": response,
+            "method": "tool_calling_agent",
+            "response_time": time.time() - start_time,
+            "tools_used": self._extract_tools_used(result),
+            "success": True
+        }
+
+    def _build_fallback_result(self, error: Exception, start_time: float) -> Dict[str, Any]:
+        """에이전트 실패 시 폴백 응답"""
+        print(f"❌ 에이전트 처리 실패: {error}")
+        
+        fallback_response = self.response_styler.handle_error_response(
+            "system_error",
+            "일시적인 시스템 오류가 발생했습니다."
+        )
+        
+        return {
+            "response": fallback_response,
+            "method": "fallback",
+            "response_time": time.time() - start_time,
+            "tools_used": [],
+            "success": False,
+            "error": str(error)
+        }
+
+    def _log_interaction(self, query: str, result: Dict[str, Any], user_id: Optional[str],
+                         session_id: Optional[str]):
+        """대화 로그 저장 (백그라운드 스레드에서 일괄 저장되므로 응답 지연 없음)"""
+        try:
+            user_id_int = int(user_id) if user_id is not None else None
+        except (ValueError, TypeError):
+            user_id_int = None
+        try:
+            get_db_engine().log_chat_interaction(
+                session_id=session_id,
+                user_id=user_id_int,
+                user_message=query,
+                bot_response=result.get("response", ""),
+                # 사용한 도구가 있으면 도구 이름, 없으면 처리 방식 (greeting, fallback 등)
+                intent=",".join(result.get("tools_used") or []) or result.get("method"),
+                confidence=None,
+                response_time_ms=int(result.get("response_time", 0) * 1000)
+            )
+        except Exception as e:
+            print(f"⚠️ 대화 로그 저장 실패: {e}")
+
+    def process_query(self, query: str, user_id: Optional[str] = None, 
+                     session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         쿼리 처리 메인 함수
         
@@ -176,62 +306,107 @@ class ToolCallingAgentProcessor:
         Returns:
             처리 결과 딕셔너리
         """
+        simple_result = self._handle_simple_query(query)
+        if simple_result:
+            self._log_interaction(query, simple_result, user_id, session_id)
+            return simple_result
+
         start_time = time.time()
 
+        with self._request_lock:
+            try:
+                # 에이전트 실행
+                agent_result = self.agent_executor.invoke(self._prepare_agent_input(query, user_id))
+                result = self._build_agent_result(query, agent_result, start_time)
+                
+            except Exception as e:
+                result = self._build_fallback_result(e, start_time)
+
+        self._log_interaction(query, result, user_id, session_id)
+        return result
+
+    def stream_query(self, query: str, user_id: Optional[str] = None,
+                     session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        쿼리를 처리하면서 토큰/도구 이벤트를 순서대로 반환하는 제너레이터
+        
+        이벤트 형식:
+            {"type": "token", "content": str}     - 최종 답변 토큰
+            {"type": "rag_token", "content": str} - RAG 검색 도구가 생성 중인 답변 토큰 (최종 답변 전 미리보기)
+            {"type": "tool_start", "tool": str}   - 도구 실행 시작
+            {"type": "tool_end", "tool": str}     - 도구 실행 완료
+            {"type": "done", "result": dict}      - process_query와 같은 형식의 최종 결과
+
+        소비자가 중간에 반복을 멈추면(제너레이터 close) 작업 스레드는 다음 콜백에서 중단되고,
+        그때까지 전달한 응답이 "stream_cancelled"로 기록된다.
+        에이전트 실행은 같은 인스턴스의 다른 요청과 순서대로 처리된다 (대화 기록 공유).
+        """
+        simple_result = self._handle_simple_query(query)
+        if simple_result:
+            self._log_interaction(query, simple_result, user_id, session_id)
+            yield {"type": "token", "content": simple_result["response"]}
+            yield {"type": "done", "result": simple_result}
+            return
+
+        start_time = time.time()
+        event_queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        cancel_event = threading.Event()
+        outcome: Dict[str, Any] = {}
+
+        def run_agent():
+            try:
+                with self._request_lock:
+                    if cancel_event.is_set():
+                        raise _StreamCancelled("스트림 소비자가 중단했습니다.")
+                    agent_result = self.agent_executor.invoke(
+                        self._prepare_agent_input(query, user_id),
+                        config={"callbacks": [_StreamingEventHandler(event_queue, cancel_event)]}
+                    )
+                    outcome["result"] = self._build_agent_result(query, agent_result, start_time)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                event_queue.put(None)
+
+        # 에이전트는 별도 스레드에서 실행하고 콜백으로 들어오는 이벤트를 바로 전달
+        worker = threading.Thread(target=run_agent, daemon=True)
+        worker.start()
+
+        tokens: List[str] = []
+        tools_used: List[str] = []
+        finished = False
         try:
-            # 사용자 컨텍스트가 변경된 경우 도구들 업데이트
-            if user_id != self.current_user_id:
-                self.current_user_id = user_id
-                self.tools = get_all_tools(user_id)
-                # 에이전트 재초기화
-                self._initialize_agent()
-
-            # 사용자 컨텍스트가 있는 경우 쿼리에 추가
-            enhanced_query = query
-            if user_id:
-                enhanced_query = f"[현재 로그인한 사용자 ID: {user_id}] {query}"
-
-            # 에이전트 실행
-            result = self.agent_executor.invoke({
-                "input": enhanced_query,
-                "chat_history": self.chat_history
-            })
-            
-            response = result.get("output", "죄송합니다. 응답을 생성할 수 없습니다.")
-            
-            # 대화 기록에 추가
-            self.add_to_chat_history(query, response)
-            
-            # 응답 시간 계산
-            response_time = time.time() - start_time
-            
-            return {
-                "response": response,
-                "method": "tool_calling_agent",
-                "response_time": response_time,
-                "tools_used": self._extract_tools_used(result),
-                "success": True
-            }
-            
-        except Exception as e:
-            print(f"❌ 에이전트 처리 실패: {e}")
-            
-            # 폴백 응답
-            fallback_response = self.response_styler.handle_error_response(
-                "system_error",
-                "일시적인 시스템 오류가 발생했습니다."
-            )
-            
-            response_time = time.time() - start_time
-            
-            return {
-                "response": fallback_response,
-                "method": "fallback",
-                "response_time": response_time,
-                "tools_used": [],
-                "success": False,
-                "error": str(e)
-            }
+            while (event := event_queue.get()) is not None:
+                if event["type"] == "token":
+                    tokens.append(event["content"])
+                elif event["type"] == "tool_start" and event["tool"]:
+                    tools_used.append(event["tool"])
+                yield event
+            worker.join()
+            finished = True
+        finally:
+            if not finished:
+                # 소비자가 중간에 멈춤 (Streamlit 재실행, 연결 종료 등): 작업 스레드에 중단 신호를 보내고
+                # 지금까지 전달한 응답으로 대화 로그를 남긴다
+                cancel_event.set()
+                self._log_interaction(query, {
+                    "response": "".join(tokens),
+                    "method": "stream_cancelled",
+                    "response_time": time.time() - start_time,
+                    "tools_used": tools_used,
+                    "success": False
+                }, user_id, session_id)
+
+        if "error" in outcome:
+            result = self._build_fallback_result(outcome["error"], start_time)
+        else:
+            result = outcome["result"]
+        self._log_interaction(query, result, user_id, session_id)
+
+        # 토큰이 전달되지 않은 경우(폴백 등) 최종 응답을 한 번에 전달
+        if not tokens:
+            yield {"type": "token", "content": result["response"]}
+        yield {"type": "done", "result": result}
     
     def _extract_tools_used(self, agent_result: Dict[str, Any]) -> List[str]:
         """에이전트 결과에서 사용된 도구 목록 추출"""
@@ -322,6 +497,15 @@ class ToolCallingAgentProcessor:
         # 우선순위에 따라 정렬
         sorted_tasks = sorted(tasks, key=lambda x: x.get('priority', 3))
 
+        # 배송 추적/구매 상품 작업이 함께 쓰는 최근 주문 (상품 포함)은 한 번만 조회
+        recent_orders = None
+
+        def get_recent_orders() -> List[Dict[str, Any]]:
+            nonlocal recent_orders
+            if recent_orders is None:
+                recent_orders = get_db_engine().get_user_orders(int(user_id), limit=5)
+            return recent_orders
+
         for task in sorted_tasks:
             task_type = task['type']
             description = task['description']
@@ -353,17 +537,15 @@ class ToolCallingAgentProcessor:
 
                     if tool and user_id:
                         # 사용자의 최근 주문에서 배송 중인 상품 찾기
-                        from .db_query_engine import DatabaseQueryEngine
-                        db_engine = DatabaseQueryEngine()
-                        orders = db_engine.get_user_orders(int(user_id), limit=3)
+                        orders = get_recent_orders()[:3]
 
                         delivery_info = ""
                         for order in orders:
                             if order.get('status') in ['배송중', '배송준비중']:
-                                # 첫 번째 상품명으로 배송 추적
+                                # 첫 번째 상품명으로 배송 추적 (조회한 주문을 그대로 사용)
                                 if order.get('items'):
                                     product_name = order['items'][0]['product_name']
-                                    result = tool._run(product_name=product_name)
+                                    result = tool.track_order(order, product_name)
                                     delivery_info += f"\n{result}"
 
                         results[task_type] = {
@@ -375,9 +557,7 @@ class ToolCallingAgentProcessor:
                 elif task_type == "product_search":
                     # 상품 검색 - 사용자의 구매 내역에서 상품 정보
                     if user_id:
-                        from .db_query_engine import DatabaseQueryEngine
-                        db_engine = DatabaseQueryEngine()
-                        orders = db_engine.get_user_orders(int(user_id), limit=5)
+                        orders = get_recent_orders()
 
                         product_info = "구매하신 상품들:\n"
                         for order in orders:
@@ -497,25 +677,26 @@ class ToolCallingAgentProcessor:
                 # 복합 질문이 아니면 일반 처리
                 return self.process_query(query, user_id, session_id)
 
-            # 2. 사용자 컨텍스트 업데이트
-            if user_id != self.current_user_id:
-                self.current_user_id = user_id
-                self.tools = get_all_tools(user_id)
-                self._initialize_agent()
+            with self._request_lock:
+                # 2. 사용자 컨텍스트 업데이트
+                if user_id != self.current_user_id:
+                    self.current_user_id = user_id
+                    self.tools = get_all_tools(user_id)
+                    self._initialize_agent()
 
-            # 3. 배치 작업 실행
-            tasks = analysis.get('tasks', [])
-            batch_results = self._execute_batch_tasks(tasks, user_id)
+                # 3. 배치 작업 실행
+                tasks = analysis.get('tasks', [])
+                batch_results = self._execute_batch_tasks(tasks, user_id)
 
-            # 4. 결과 종합
-            final_response = self._combine_batch_results(query, batch_results)
+                # 4. 결과 종합
+                final_response = self._combine_batch_results(query, batch_results)
 
-            # 5. 대화 기록에 추가
-            self.add_to_chat_history(query, final_response)
+                # 5. 대화 기록에 추가
+                self.add_to_chat_history(query, final_response)
 
             response_time = time.time() - start_time
 
-            return {
+            result = {
                 "response": final_response,
                 "method": "batch_processing",
                 "response_time": response_time,
@@ -523,6 +704,8 @@ class ToolCallingAgentProcessor:
                 "batch_results": batch_results,
                 "success": True
             }
+            self._log_interaction(query, result, user_id, session_id)
+            return result
 
         except Exception as e:
             print(f"❌ 배치 처리 실패: {e}")
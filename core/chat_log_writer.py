@@ -0,0 +1,157 @@
+"""
+챗봇 대화 로그 비동기 일괄 저장
+요청 처리 스레드는 메모리 큐에 넣기만 하고, 전용 스레드가 모아서
+한 트랜잭션에 executemany로 저장 (건수 또는 시간 간격 기준으로 저장)
+"""
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ChatLogRow = Tuple[Optional[str], Optional[int], str, str, Optional[str], Optional[float], Optional[int]]
+
+INSERT_CHAT_LOG_SQL = """
+    INSERT INTO chat_logs
+    (session_id, user_id, user_message, bot_response, intent, confidence_score, response_time_ms)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# 큐가 가득 찼을 때 처리 방식
+#   drop:  새 로그를 바로 버림 (요청 지연 없음)
+#   block: block_timeout_seconds까지 기다린 뒤에도 자리가 없으면 버림 (제한된 역압)
+OVERFLOW_POLICIES = ("drop", "block")
+
+_STOP = object()
+
+
+class ChatLogWriter:
+    """대화 로그 비동기 일괄 저장기 (스레드 안전)"""
+
+    def __init__(self, get_connection: Callable[[], sqlite3.Connection], max_queue_size: int = 10000,
+                 batch_size: int = 200, flush_interval_seconds: float = 1.0,
+                 overflow_policy: str = "drop", block_timeout_seconds: float = 0.05):
+        """
+        Args:
+            get_connection: 저장 스레드에서 호출할 연결 함수 (스레드별 연결 반환)
+            max_queue_size: 저장 대기 중인 최대 로그 수
+            batch_size: 이만큼 모이면 바로 저장
+            flush_interval_seconds: 첫 로그가 들어온 뒤 이 시간이 지나면 모인 만큼 저장
+            overflow_policy: 큐가 가득 찼을 때 처리 방식 ("drop" 또는 "block")
+            block_timeout_seconds: "block" 정책에서 최대 대기 시간
+        """
+        if max_queue_size <= 0 or batch_size <= 0:
+            raise ValueError("max_queue_size와 batch_size는 1 이상이어야 합니다.")
+        if flush_interval_seconds <= 0:
+            raise ValueError("flush_interval_seconds는 0보다 커야 합니다.")
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"지원하지 않는 overflow_policy입니다: {overflow_policy} (지원: {OVERFLOW_POLICIES})")
+
+        self._get_connection = get_connection
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.overflow_policy = overflow_policy
+        self.block_timeout_seconds = block_timeout_seconds
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+        self._thread.start()
+
+    def _count(self, **deltas: int):
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def submit(self, row: ChatLogRow) -> bool:
+        """로그 한 건을 저장 대기열에 추가 (버려진 경우 False)"""
+        if self._closed:
+            self._count(dropped=1)
+            return False
+        try:
+            if self.overflow_policy == "block":
+                self._queue.put(row, timeout=self.block_timeout_seconds)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            self._count(dropped=1)
+            return False
+        self._count(submitted=1)
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """지금까지 추가된 로그를 저장할 때까지 대기 (시간 안에 끝나면 True)"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """남은 로그를 저장하고 저장 스레드 종료"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _write(self, batch: List[ChatLogRow]):
+        if not batch:
+            return
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(INSERT_CHAT_LOG_SQL, batch)
+            self._count(written=len(batch), flushes=1)
+        except Exception as e:
+            print(f"❌ 채팅 로그 저장 실패 ({len(batch)}건): {e}")
+            self._count(failed=len(batch))
+
+    def _run(self):
+        batch: List[ChatLogRow] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._write(batch)
+                return
+            if isinstance(item, threading.Event):
+                self._write(batch)
+                batch, deadline = [], None
+                item.set()
+                continue
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_seconds
+
+            if len(batch) >= self.batch_size or (deadline is not None and time.monotonic() >= deadline):
+                self._write(batch)
+                batch, deadline = [], None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """저장 통계 반환 (버려진/실패한 로그 수 포함)"""
+        with self._stats_lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "pending": self._queue.qsize(),
+                "avg_batch_size": self.written / self.flushes if self.flushes else 0.0
+            }
@@ -0,0 +1,165 @@
+"""
+RAG 프롬프트 컨텍스트 패킹
+검색된 청크 중 같은 문서의 인접/겹치는 청크는 하나로 합치고, 거의 같은 내용은 제거한 뒤
+관련도 순으로 토큰 예산 안에 들어가는 만큼만 프롬프트에 넣음
+"""
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.documents import Document
+
+from .token_counter import count_tokens
+
+
+ScoredDocument = Tuple[Document, Optional[float]]
+
+
+class ContextPacker:
+    """검색 결과를 토큰 예산 안의 컨텍스트 문자열로 조립"""
+
+    def __init__(self, max_tokens: int = 1500, dedup_threshold: float = 0.85,
+                 model_name: str = "gpt-4o-mini", max_overlap_chars: int = 400):
+        """
+        Args:
+            max_tokens: 컨텍스트 최대 토큰 수
+            dedup_threshold: 이 값 이상 겹치면(문자 3-gram 자카드 유사도) 중복으로 보고 제외
+            model_name: 토큰 수 계산 기준 모델
+            max_overlap_chars: 인접 청크 병합 시 확인할 최대 겹침 길이 (청크 overlap 이상)
+        """
+        self.max_tokens = max_tokens
+        self.dedup_threshold = dedup_threshold
+        self.model_name = model_name
+        self.max_overlap_chars = max_overlap_chars
+
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "tokens_before": 0, "tokens_after": 0, "dropped_duplicates": 0}
+
+    @staticmethod
+    def _normalize_items(docs: Sequence[Union[Document, ScoredDocument]]) -> List[ScoredDocument]:
+        return [item if isinstance(item, tuple) else (item, None) for item in docs]
+
+    @staticmethod
+    def _chunk_index(doc: Document) -> int:
+        chunk_id = doc.metadata.get("chunk_id", "")
+        try:
+            return int(chunk_id.rsplit("#", 1)[1])
+        except (IndexError, ValueError):
+            return 0
+
+    def _merge_text(self, first: str, second: str) -> str:
+        """앞 청크의 끝과 뒤 청크의 시작이 겹치면 겹친 부분을 한 번만 남기고 이어 붙임"""
+        limit = min(len(first), len(second), self.max_overlap_chars)
+        for size in range(limit, 0, -1):
+            if first.endswith(second[:size]):
+                return first + second[size:]
+        return first + "\n" + second
+
+    def _merge_chunks(self, items: List[ScoredDocument]) -> List[Dict[str, Any]]:
+        """같은 문서의 연속된 청크를 하나의 단락으로 병합
+
+        Returns:
+            {"text", "score", "rank"} 목록 (rank는 원래 검색 순위 중 가장 높은 값)
+        """
+        groups: Dict[str, List[Tuple[int, Document, Optional[float]]]] = {}
+        for rank, (doc, score) in enumerate(items):
+            key = doc.metadata.get("doc_id") or doc.metadata.get("chunk_id") or f"rank-{rank}"
+            groups.setdefault(key, []).append((rank, doc, score))
+
+        passages = []
+        for members in groups.values():
+            members.sort(key=lambda member: self._chunk_index(member[1]))
+            current = None
+            previous_index = None
+            for rank, doc, score in members:
+                index = self._chunk_index(doc)
+                if current is not None and index == previous_index + 1:
+                    current["text"] = self._merge_text(current["text"], doc.page_content)
+                    current["score"] = max(
+                        (s for s in (current["score"], score) if s is not None), default=None
+                    )
+                    current["rank"] = min(current["rank"], rank)
+                else:
+                    if current is not None:
+                        passages.append(current)
+                    current = {"text": doc.page_content, "score": score, "rank": rank}
+                previous_index = index
+            passages.append(current)
+        return passages
+
+    @staticmethod
+    def _shingles(text: str, size: int = 3) -> set:
+        compact = "".join(text.split())
+        return {compact[i:i + size] for i in range(max(1, len(compact) - size + 1))}
+
+    def _is_duplicate(self, shingles: set, selected: List[set]) -> bool:
+        for other in selected:
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= self.dedup_threshold:
+                return True
+        return False
+
+    def pack(self, docs: Sequence[Union[Document, ScoredDocument]]) -> Tuple[str, Dict[str, int]]:
+        """검색 결과를 컨텍스트 문자열로 조립
+
+        Args:
+            docs: 검색 순위 순서의 Document 또는 (Document, 관련도) 목록
+
+        Returns:
+            (컨텍스트 문자열, {"tokens_before", "tokens_after", "tokens_saved", "passages", "dropped_duplicates"})
+        """
+        items = self._normalize_items(docs)
+        tokens_before = count_tokens("\n\n".join(doc.page_content for doc, _ in items), self.model_name)
+
+        # 관련도 높은 순 (점수가 없으면 뒤로, 같으면 원래 검색 순위 순)
+        passages = sorted(
+            self._merge_chunks(items),
+            key=lambda p: (p["score"] is None, -(p["score"] or 0.0), p["rank"])
+        )
+
+        selected_texts: List[str] = []
+        selected_shingles: List[set] = []
+        dropped_duplicates = 0
+        used_tokens = 0
+        for passage in passages:
+            shingles = self._shingles(passage["text"])
+            if self._is_duplicate(shingles, selected_shingles):
+                dropped_duplicates += 1
+                continue
+
+            tokens = count_tokens(passage["text"], self.model_name)
+            if used_tokens + tokens > self.max_tokens:
+                if selected_texts:
+                    continue
+                # 첫 단락조차 예산을 넘으면 예산에 맞게 잘라서 사용
+                ratio = self.max_tokens / tokens
+                passage["text"] = passage["text"][:int(len(passage["text"]) * ratio)]
+                tokens = count_tokens(passage["text"], self.model_name)
+
+            selected_texts.append(passage["text"])
+            selected_shingles.append(shingles)
+            used_tokens += tokens
+
+        context = "\n\n".join(selected_texts)
+        tokens_after = count_tokens(context, self.model_name)
+        report = {
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": tokens_before - tokens_after,
+            "passages": len(selected_texts),
+            "dropped_duplicates": dropped_duplicates
+        }
+
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["tokens_before"] += tokens_before
+            self._stats["tokens_after"] += tokens_after
+            self._stats["dropped_duplicates"] += dropped_duplicates
+        return context, report
+
+    def get_stats(self) -> Dict[str, Any]:
+        """누적 패킹 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["tokens_saved"] = stats["tokens_before"] - stats["tokens_after"]
+        stats["saved_ratio"] = stats["tokens_saved"] / stats["tokens_before"] if stats["tokens_before"] else 0.0
+        return stats
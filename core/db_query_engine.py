@@ -2,38 +2,308 @@
 데이터베이스 쿼리 엔진
 사용자 정보, 주문 정보 등을 데이터베이스에서 조회
 """
+import atexit
 import sqlite3
 import json
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, Iterable, List, Optional, Any, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from .chat_log_writer import ChatLogWriter, INSERT_CHAT_LOG_SQL
+from .entity_cache import EntityCache
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "sample_db" / "ecommerce.db"
+
+# 상품 전문 검색 인덱스 (db/schema.sql과 동일, 기존 DB에는 migrate_database()로 생성)
+# trigram 토크나이저: 한국어도 3글자 이상 부분 문자열로 검색 가능
+# rowid = products.rowid, 트리거로 products와 동기화
+PRODUCT_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, description, keywords,
+    tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+    DELETE FROM products_fts WHERE rowid = new.rowid;
+    INSERT INTO products_fts (rowid, name, description, keywords)
+    VALUES (new.rowid, new.name, new.description, new.keywords);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+    DELETE FROM products_fts WHERE rowid = old.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN
+    DELETE FROM products_fts WHERE rowid = old.rowid;
+    INSERT INTO products_fts (rowid, name, description, keywords)
+    VALUES (new.rowid, new.name, new.description, new.keywords);
+END;
+"""
+
+# 엔티티 캐시 기본 유효 시간 (초): 주문은 배송 상태가 바뀌므로 짧게
+DEFAULT_ENTITY_CACHE_TTLS = {"user": 300, "order": 30, "product": 600}
+
+# 다른 엔티티 행을 함께 담고 있는 엔티티 (주문 조회 결과에 사용자명/전화번호 포함)
+ENTITY_CACHE_DEPENDENTS = {"user": ("order",)}
+
+# trigram 인덱스로 찾을 수 있는 최소 검색어 길이 (더 짧으면 LIKE 검색)
+FTS_MIN_KEYWORD_LENGTH = 3
+
+# bm25 열 가중치 (name, description, keywords)
+FTS_BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+
 class DatabaseQueryEngine:
     """데이터베이스 쿼리 처리 클래스"""
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, mmap_size_mb: int = 256,
+                 cache_size_mb: int = 16, cached_statements: int = 256, busy_timeout_ms: int = 5000,
+                 use_entity_cache: bool = True, entity_cache_size: int = 1024,
+                 entity_cache_ttls: Optional[Dict[str, float]] = None,
+                 async_chat_log: bool = True, chat_log_batch_size: int = 200,
+                 chat_log_flush_interval: float = 1.0, chat_log_queue_size: int = 10000,
+                 chat_log_overflow: str = "drop"):
+        """
+        Args:
+            db_path: SQLite 데이터베이스 경로 (생략 시 data/sample_db/ecommerce.db)
+            mmap_size_mb: 연결별 메모리 매핑 크기 (PRAGMA mmap_size, 0이면 사용 안 함)
+            cache_size_mb: 연결별 페이지 캐시 크기 (PRAGMA cache_size)
+            cached_statements: 연결별 준비된 SQL 문 캐시 개수
+            busy_timeout_ms: 쓰기 잠금 대기 시간
+            use_entity_cache: 사용자/주문/상품 기본 키 조회 결과를 메모리에 캐시할지 여부
+            entity_cache_size: 엔티티 캐시 최대 항목 수
+            entity_cache_ttls: 엔티티별 유효 시간 (초, "user"/"order"/"product" 중 바꿀 값만 지정)
+            async_chat_log: 대화 로그를 백그라운드 스레드에서 모아서 저장할지 여부 (False면 호출 시 바로 저장)
+            chat_log_batch_size: 대화 로그를 이만큼 모이면 바로 저장
+            chat_log_flush_interval: 대화 로그를 모으는 최대 시간 (초)
+            chat_log_queue_size: 저장 대기 중인 최대 대화 로그 수
+            chat_log_overflow: 대기열이 가득 찼을 때 처리 방식 ("drop": 바로 버림, "block": 잠시 기다린 뒤 버림)
+        """
         if db_path is None:
-            project_root = Path(__file__).parent.parent
-            self.db_path = project_root / "data" / "sample_db" / "ecommerce.db"
+            self.db_path = DEFAULT_DB_PATH
         else:
             self.db_path = Path(db_path)
+
+        for name, value in (("mmap_size_mb", mmap_size_mb), ("cache_size_mb", cache_size_mb),
+                            ("cached_statements", cached_statements), ("busy_timeout_ms", busy_timeout_ms)):
+            if value < 0:
+                raise ValueError(f"{name}는 0 이상이어야 합니다.")
+        self.mmap_size_mb = mmap_size_mb
+        self.cache_size_mb = cache_size_mb
+        self.cached_statements = cached_statements
+        self.busy_timeout_ms = busy_timeout_ms
+
+        # 스레드마다 연결을 하나씩 만들어 재사용 (sqlite3 연결은 스레드 간 공유 불가)
+        self._local = threading.local()
+        self._connections_lock = threading.Lock()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        # close() 호출 시 증가 → 다른 스레드에 남은 닫힌 연결을 다음 사용 시 새로 만듦
+        self._generation = 0
+        
+        self.fts_enabled = False
+
+        self.entity_cache = None
+        if use_entity_cache:
+            ttls = dict(DEFAULT_ENTITY_CACHE_TTLS)
+            unknown = set(entity_cache_ttls or {}) - set(ttls)
+            if unknown:
+                raise ValueError(f"지원하지 않는 캐시 엔티티입니다: {sorted(unknown)}")
+            ttls.update(entity_cache_ttls or {})
+            self.entity_cache = EntityCache(ttls, max_entries=entity_cache_size)
+        
+        self.async_chat_log = async_chat_log
+        self._chat_log_options = {
+            "batch_size": chat_log_batch_size,
+            "flush_interval_seconds": chat_log_flush_interval,
+            "max_queue_size": chat_log_queue_size,
+            "overflow_policy": chat_log_overflow
+        }
+        # 첫 로그 저장 시 생성 (close() 후 다시 로그를 남기면 새로 생성)
+        self._chat_log_writer: Optional[ChatLogWriter] = None
+        self._chat_log_writer_lock = threading.Lock()
+        if async_chat_log:
+            # 잘못된 설정은 생성 시점에 확인
+            self._get_chat_log_writer()
         
         self._ensure_db_exists()
+        self._detect_product_search_index()
     
     def _ensure_db_exists(self):
         """데이터베이스 파일 존재 확인"""
         if not self.db_path.exists():
             print(f"⚠️ 데이터베이스 파일이 없습니다: {self.db_path}")
             print("💡 'python db/init_db.py' 명령어로 데이터베이스를 초기화해주세요.")
+
+    def _detect_product_search_index(self):
+        """상품 전문 검색 테이블이 있으면 사용 (조회만 하며 DB 파일은 바꾸지 않음)"""
+        if not self.db_path.exists():
+            return
+        try:
+            with self._get_connection() as conn:
+                tables = {row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('products', 'products_fts')"
+                )}
+        except sqlite3.Error as e:
+            print(f"⚠️ 상품 전문 검색 인덱스 확인 실패, LIKE 검색을 사용합니다: {e}")
+            return
+        self.fts_enabled = "products_fts" in tables
+        if "products" in tables and not self.fts_enabled:
+            print("💡 상품 전문 검색 인덱스가 없어 LIKE 검색을 사용합니다. "
+                  "'python scripts/migrate_db.py'로 만들 수 있습니다.")
+
+    def migrate_database(self):
+        """DB 파일을 바꾸는 설정을 명시적으로 적용 (scripts/migrate_db.py, simple_db_init.py에서 호출)
+
+        - journal_mode=WAL: 읽기와 쓰기(채팅 로그 저장)가 서로를 막지 않음 (DB 파일에 영구 저장)
+        - 상품 전문 검색 테이블/트리거 생성, products와 행 수가 다르면 다시 구성
+          (INSERT OR REPLACE는 recursive_triggers가 꺼져 있으면 삭제 트리거가 실행되지 않아
+          이전 행의 색인이 남을 수 있음, 검색 시 products와 조인하므로 결과에는 영향 없음)
+
+        Raises:
+            sqlite3.Error: FTS5/trigram을 지원하지 않는 SQLite 등
+        """
+        with self._get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            has_products = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products'"
+            ).fetchone()
+            if not has_products:
+                return
+            conn.executescript(PRODUCT_FTS_SCHEMA)
+            indexed = conn.execute("SELECT COUNT(*) FROM products_fts").fetchone()[0]
+            total = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            if indexed != total:
+                print(f"🔧 상품 검색 인덱스 재구성 중... ({indexed} → {total}개)")
+                conn.execute("DELETE FROM products_fts")
+                conn.execute("""
+                    INSERT INTO products_fts (rowid, name, description, keywords)
+                    SELECT rowid, name, description, keywords FROM products
+                """)
+        self.fts_enabled = True
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """데이터베이스 연결 반환"""
-        conn = sqlite3.connect(self.db_path)
+    def _connect(self) -> sqlite3.Connection:
+        """새 연결 생성 및 PRAGMA 설정"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+            # close()는 다른 스레드에서 호출될 수 있음 (조회/쓰기는 만든 스레드에서만 사용)
+            check_same_thread=False
+        )
         conn.row_factory = sqlite3.Row  # 딕셔너리 형태로 결과 반환
+        # 연결 단위 설정만 적용 (WAL 전환처럼 DB 파일을 바꾸는 설정은 migrate_database()에서)
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            # WAL에서는 NORMAL도 커밋이 손상되지 않음 (롤백 저널 모드는 기본값 FULL 유지)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size_mb) * 1024 * 1024}")
+        # 음수는 KiB 단위
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_mb) * 1024}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """현재 스레드의 데이터베이스 연결 반환 (없으면 생성)
+
+        `with conn:`은 트랜잭션 커밋/롤백만 하고 연결을 닫지 않으므로 연결은 스레드별로 재사용된다.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+
+        conn = self._connect()
+        with self._connections_lock:
+            # 종료된 스레드(예: Streamlit 재실행 스레드)가 남긴 연결 정리
+            alive = []
+            for thread, other in self._connections:
+                if thread.is_alive():
+                    alive.append((thread, other))
+                else:
+                    other.close()
+            alive.append((threading.current_thread(), conn))
+            self._connections = alive
+            self._local.conn = conn
+            self._local.generation = self._generation
         return conn
+
+    def close(self):
+        """대기 중인 대화 로그를 저장하고 모든 스레드의 연결 닫기 (이후 호출 시 연결을 새로 만듦)"""
+        with self._chat_log_writer_lock:
+            writer = self._chat_log_writer
+            self._chat_log_writer = None
+        if writer is not None:
+            writer.close()
+
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+            self._generation += 1
+        for _, conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                print(f"⚠️ 데이터베이스 연결 종료 실패: {e}")
+
+    def __enter__(self) -> "DatabaseQueryEngine":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _cache_get(self, entity: str, key: Any) -> Optional[Dict[str, Any]]:
+        if self.entity_cache is None:
+            return None
+        return self.entity_cache.get(entity, str(key))
+
+    def _cache_put(self, entity: str, key: Any, row: Optional[Dict[str, Any]]):
+        if self.entity_cache is not None and row is not None:
+            self.entity_cache.put(entity, str(key), row)
+
+    def invalidate_cache(self, entity: Optional[str] = None, key: Any = None):
+        """엔티티 캐시 무효화 (entity가 None이면 전체, key가 None이면 해당 종류 전체)
+
+        사용자 행이 바뀌면 사용자 정보를 담은 주문 캐시도 함께 비운다.
+        """
+        if self.entity_cache is None:
+            return
+        self.entity_cache.invalidate(entity, None if key is None else str(key))
+        for dependent in ENTITY_CACHE_DEPENDENTS.get(entity, ()):
+            self.entity_cache.invalidate(dependent)
+
+    def execute_write(self, sql: str, params: Iterable[Any] = (),
+                      invalidates: Iterable[Union[str, Tuple[str, Any]]] = ()) -> int:
+        """쓰기 쿼리 실행 후 관련 엔티티 캐시 무효화
+
+        엔티티 테이블(users, orders, order_items, products)을 바꾸는 쓰기는 이 메서드를 거쳐야
+        캐시와 DB가 어긋나지 않는다. (다른 프로세스의 쓰기는 엔티티별 TTL 안에서만 늦게 반영됨)
+
+        Args:
+            sql: INSERT/UPDATE/DELETE 문
+            params: 바인딩 값
+            invalidates: 무효화할 엔티티 종류("order") 또는 (종류, 기본 키) 목록
+
+        Returns:
+            변경된 행 수
+        """
+        with self._get_connection() as conn:
+            rowcount = conn.execute(sql, tuple(params)).rowcount
+        # 커밋 후 무효화 (커밋 전에 다른 스레드가 이전 값을 다시 캐시하지 않도록)
+        for target in invalidates:
+            if isinstance(target, tuple):
+                self.invalidate_cache(*target)
+            else:
+                self.invalidate_cache(target)
+        return rowcount
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """엔티티 캐시 통계 반환 (적중률 등, 캐시를 쓰지 않으면 빈 딕셔너리)"""
+        if self.entity_cache is None:
+            return {}
+        return self.entity_cache.get_stats()
     
     def get_user_by_phone(self, phone: str) -> Optional[Dict[str, Any]]:
         """전화번호로 사용자 정보 조회"""
@@ -71,39 +341,73 @@ class DatabaseQueryEngine:
             print(f"❌ 사용자 조회 실패: {e}")
             return None
     
+    # SQLite 바인딩 변수 개수 제한(기본 999)보다 작게 나눠서 IN 조회
+    IN_BATCH_SIZE = 500
+
+    def _attach_order_items(self, cursor: sqlite3.Cursor, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """주문 목록의 상품 정보를 IN 조회로 한꺼번에 채움 (주문 수와 관계없이 일정한 쿼리 수)"""
+        items_by_order: Dict[str, List[Dict[str, Any]]] = {order['order_id']: [] for order in orders}
+        order_ids = list(items_by_order)
+        for i in range(0, len(order_ids), self.IN_BATCH_SIZE):
+            batch = order_ids[i:i + self.IN_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            cursor.execute(f"""
+                SELECT * FROM order_items WHERE order_id IN ({placeholders})
+                ORDER BY order_id, id
+            """, batch)
+            for row in cursor.fetchall():
+                items_by_order[row['order_id']].append(dict(row))
+
+        for order in orders:
+            order['items'] = items_by_order[order['order_id']]
+        return orders
+
     def get_order_by_id(self, order_id: str) -> Optional[Dict[str, Any]]:
         """주문 ID로 주문 정보 조회"""
+        orders = self.get_orders_by_ids([order_id])
+        return orders[0] if orders else None
+
+    def get_orders_by_ids(self, order_ids: List[str]) -> List[Dict[str, Any]]:
+        """여러 주문 ID의 주문 정보(사용자명, 전화번호, 상품 포함)를 한꺼번에 조회 (요청 순서 유지)"""
         try:
+            order_ids = list(dict.fromkeys(order_ids))
+            found = {}
+            for order_id in order_ids:
+                cached = self._cache_get("order", order_id)
+                if cached is not None:
+                    found[order_id] = cached
+            missing = [order_id for order_id in order_ids if order_id not in found]
+            if not missing:
+                return [found[order_id] for order_id in order_ids]
+
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # 주문 기본 정보 조회
-                cursor.execute("""
-                    SELECT o.*, u.username, u.phone 
-                    FROM orders o
-                    JOIN users u ON o.user_id = u.user_id
-                    WHERE o.order_id = ?
-                """, (order_id,))
-                
-                order_row = cursor.fetchone()
-                if not order_row:
-                    return None
-                
-                order_info = dict(order_row)
+                fetched = {}
+                for i in range(0, len(missing), self.IN_BATCH_SIZE):
+                    batch = missing[i:i + self.IN_BATCH_SIZE]
+                    placeholders = ",".join("?" * len(batch))
+                    cursor.execute(f"""
+                        SELECT o.*, u.username, u.phone 
+                        FROM orders o
+                        JOIN users u ON o.user_id = u.user_id
+                        WHERE o.order_id IN ({placeholders})
+                    """, batch)
+                    for row in cursor.fetchall():
+                        fetched[row['order_id']] = dict(row)
                 
                 # 주문 상품 정보 조회
-                cursor.execute("""
-                    SELECT * FROM order_items WHERE order_id = ?
-                """, (order_id,))
-                
-                items = [dict(row) for row in cursor.fetchall()]
-                order_info['items'] = items
-                
-                return order_info
+                self._attach_order_items(cursor, list(fetched.values()))
+
+            for order_id, order in fetched.items():
+                self._cache_put("order", order_id, order)
+            found.update(fetched)
+            return [found[order_id] for order_id in order_ids if order_id in found]
                 
         except Exception as e:
             print(f"❌ 주문 조회 실패: {e}")
-            return None
+            return []
     
     def get_user_orders(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """사용자의 주문 목록 조회"""
@@ -117,19 +421,10 @@ class DatabaseQueryEngine:
                     LIMIT ?
                 """, (user_id, limit))
                 
-                orders = []
-                for row in cursor.fetchall():
-                    order = dict(row)
-                    
-                    # 각 주문의 상품 정보 조회
-                    cursor.execute("""
-                        SELECT * FROM order_items WHERE order_id = ?
-                    """, (order['order_id'],))
-                    
-                    order['items'] = [dict(item_row) for item_row in cursor.fetchall()]
-                    orders.append(order)
+                orders = [dict(row) for row in cursor.fetchall()]
                 
-                return orders
+                # 주문 상품 정보 조회
+                return self._attach_order_items(cursor, orders)
                 
         except Exception as e:
             print(f"❌ 사용자 주문 목록 조회 실패: {e}")
@@ -138,11 +433,18 @@ class DatabaseQueryEngine:
     def get_recent_orders_by_phone(self, phone: str, limit: int = 5) -> List[Dict[str, Any]]:
         """전화번호로 최근 주문 조회"""
         try:
-            user = self.get_user_by_phone(phone)
-            if not user:
-                return []
-            
-            return self.get_user_orders(user['user_id'], limit)
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                # 같은 전화번호의 사용자가 여럿이면 먼저 등록된 사용자 기준 (get_user_by_phone과 동일)
+                cursor.execute("""
+                    SELECT * FROM orders 
+                    WHERE user_id = (SELECT user_id FROM users WHERE phone = ? LIMIT 1)
+                    ORDER BY order_date DESC 
+                    LIMIT ?
+                """, (phone, limit))
+                
+                orders = [dict(row) for row in cursor.fetchall()]
+                return self._attach_order_items(cursor, orders)
             
         except Exception as e:
             print(f"❌ 전화번호로 주문 조회 실패: {e}")
@@ -150,6 +452,14 @@ class DatabaseQueryEngine:
     
     def get_product_info(self, product_id: str) -> Optional[Dict[str, Any]]:
         """상품 정보 조회"""
+        cached = self._cache_get("product", product_id)
+        if cached is not None:
+            return cached
+        product = self._fetch_product_info(product_id)
+        self._cache_put("product", product_id, product)
+        return product
+
+    def _fetch_product_info(self, product_id: str) -> Optional[Dict[str, Any]]:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
@@ -187,16 +497,37 @@ class DatabaseQueryEngine:
             print(f"❌ 상품 정보 조회 실패: {e}")
             return None
     
-    def search_products(self, keyword: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """키워드로 상품 검색"""
+    def search_products(self, keyword: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """키워드로 상품 검색 (상품명 > 키워드 > 설명 순 가중치의 bm25 관련도순)
+
+        Args:
+            keyword: 상품명/설명/키워드에 포함된 문자열
+            limit: 반환할 상품 수
+            offset: 건너뛸 상품 수 (페이지 이동)
+        """
+        keyword = keyword.strip()
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT * FROM products 
-                    WHERE name LIKE ? OR description LIKE ? OR keywords LIKE ?
-                    LIMIT ?
-                """, (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%", limit))
+                if self.fts_enabled and len(keyword) >= FTS_MIN_KEYWORD_LENGTH:
+                    # 검색어 전체를 구문으로 검색 (따옴표 이스케이프)
+                    phrase = '"' + keyword.replace('"', '""') + '"'
+                    cursor.execute(f"""
+                        SELECT p.* FROM products_fts f
+                        JOIN products p ON p.rowid = f.rowid
+                        WHERE products_fts MATCH ?
+                        ORDER BY bm25(products_fts, {", ".join(map(str, FTS_BM25_WEIGHTS))}), p.rowid
+                        LIMIT ? OFFSET ?
+                    """, (phrase, limit, offset))
+                else:
+                    # trigram으로 찾을 수 없는 짧은 검색어: 상품명 일치 우선
+                    pattern = f"%{keyword}%"
+                    cursor.execute("""
+                        SELECT * FROM products 
+                        WHERE name LIKE ? OR description LIKE ? OR keywords LIKE ?
+                        ORDER BY (name LIKE ?) DESC, (keywords LIKE ?) DESC, rowid
+                        LIMIT ? OFFSET ?
+                    """, (pattern, pattern, pattern, pattern, pattern, limit, offset))
                 
                 products = []
                 for row in cursor.fetchall():
@@ -234,23 +565,46 @@ class DatabaseQueryEngine:
             print(f"❌ 주문 상태 통계 조회 실패: {e}")
             return {}
     
+    def _get_chat_log_writer(self) -> ChatLogWriter:
+        with self._chat_log_writer_lock:
+            if self._chat_log_writer is None:
+                self._chat_log_writer = ChatLogWriter(self._get_connection, **self._chat_log_options)
+            return self._chat_log_writer
+
     def log_chat_interaction(self, session_id: str, user_id: Optional[int], 
                            user_message: str, bot_response: str, 
-                           intent: str, confidence: float, response_time_ms: int):
-        """챗봇 대화 로그 저장"""
+                           intent: str, confidence: Optional[float], response_time_ms: int) -> bool:
+        """챗봇 대화 로그 저장
+
+        async_chat_log이면 대기열에 넣고 바로 반환한다 (저장은 백그라운드 스레드에서 일괄 처리).
+
+        Returns:
+            저장(또는 대기열 추가) 성공 여부 (대기열이 가득 차 버려지면 False)
+        """
+        row = (session_id, user_id, user_message, bot_response, intent, confidence, response_time_ms)
+        if self.async_chat_log:
+            return self._get_chat_log_writer().submit(row)
+
         try:
             with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO chat_logs 
-                    (session_id, user_id, user_message, bot_response, intent, confidence_score, response_time_ms)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (session_id, user_id, user_message, bot_response, intent, confidence, response_time_ms))
-                
-                conn.commit()
+                conn.execute(INSERT_CHAT_LOG_SQL, row)
+            return True
                 
         except Exception as e:
             print(f"❌ 채팅 로그 저장 실패: {e}")
+            return False
+
+    def flush_chat_logs(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 대화 로그를 저장할 때까지 대기 (시간 안에 끝나면 True)"""
+        with self._chat_log_writer_lock:
+            writer = self._chat_log_writer
+        return writer.flush(timeout) if writer is not None else True
+
+    def get_chat_log_stats(self) -> Dict[str, Any]:
+        """대화 로그 저장 통계 (비동기 저장을 쓰지 않으면 빈 딕셔너리)"""
+        with self._chat_log_writer_lock:
+            writer = self._chat_log_writer
+        return writer.get_stats() if writer is not None else {}
     
     def format_order_info(self, order: Dict[str, Any]) -> str:
         """주문 정보를 사용자 친화적 형태로 포맷팅"""
@@ -341,6 +695,14 @@ class DatabaseQueryEngine:
 
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """사용자 ID로 사용자 정보 조회"""
+        cached = self._cache_get("user", user_id)
+        if cached is not None:
+            return cached
+        user = self._fetch_user_by_id(user_id)
+        self._cache_put("user", user_id, user)
+        return user
+
+    def _fetch_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
@@ -394,6 +756,36 @@ class DatabaseQueryEngine:
             return []
 
 
+_shared_engines: Dict[Path, DatabaseQueryEngine] = {}
+_shared_engines_lock = threading.Lock()
+
+
+def get_db_engine(db_path: Optional[str] = None) -> DatabaseQueryEngine:
+    """데이터베이스 경로별로 프로세스에서 공유하는 DatabaseQueryEngine 반환
+
+    도구, 에이전트, Streamlit 사이드바가 같은 연결(스레드별)을 재사용한다.
+    """
+    key = Path(db_path or DEFAULT_DB_PATH).resolve()
+    with _shared_engines_lock:
+        engine = _shared_engines.get(key)
+        if engine is None:
+            engine = DatabaseQueryEngine(str(key))
+            _shared_engines[key] = engine
+        return engine
+
+
+def close_db_engines():
+    """공유 DatabaseQueryEngine의 연결을 모두 닫음 (프로세스 종료 시 자동 호출)"""
+    with _shared_engines_lock:
+        engines = list(_shared_engines.values())
+        _shared_engines.clear()
+    for engine in engines:
+        engine.close()
+
+
+atexit.register(close_db_engines)
+
+
 # 사용 예시
 if __name__ == "__main__":
     db_engine = DatabaseQueryEngine()
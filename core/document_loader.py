@@ -0,0 +1,89 @@
+"""
+대용량 JSON 문서 스트리밍 로더
+최상위가 배열인 JSON 파일을 한 번에 읽지 않고 일정 크기씩 읽으면서
+레코드 단위로 파싱하여, 코퍼스 크기와 관계없이 메모리 사용량을 일정하게 유지
+"""
+import json
+from pathlib import Path
+from typing import Any, Iterator, Union
+
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(path: Union[str, Path], read_size: int = 65536) -> Iterator[Any]:
+    """JSON 배열 파일의 원소를 하나씩 반환
+
+    Args:
+        path: JSON 파일 경로 (최상위가 배열이어야 함)
+        read_size: 한 번에 읽을 문자 수
+
+    Raises:
+        ValueError: 최상위가 배열이 아니거나 형식이 잘못된 경우
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            """버퍼에 다음 내용을 읽어 붙임 (처리한 앞부분은 버림)"""
+            nonlocal buffer, pos, eof
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace() -> str:
+            """공백을 건너뛰고 다음 문자 반환 (파일 끝이면 빈 문자열)"""
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not fill():
+                    return ""
+
+        if skip_whitespace() != "[":
+            raise ValueError(f"JSON 배열 형식이 아닙니다: {path}")
+        pos += 1
+
+        expect_value = True
+        while True:
+            char = skip_whitespace()
+            if char == "":
+                raise ValueError(f"JSON 배열이 닫히지 않았습니다: {path}")
+            if char == "]":
+                return
+            if not expect_value:
+                if char != ",":
+                    raise ValueError(f"JSON 배열 구분자가 잘못되었습니다: {path} (위치 {pos})")
+                pos += 1
+                expect_value = True
+                continue
+
+            # 원소 하나가 버퍼 안에 완전히 들어올 때까지 더 읽으면서 디코딩
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                    # 숫자는 버퍼 경계에서 잘린 채(예: "2.5e3" → "2.")로 디코딩될 수 있으므로
+                    # 원소 뒤에 구분 문자가 보일 때까지 더 읽음
+                    if eof or (end < len(buffer) and buffer[end] in _DELIMITERS):
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                if not fill():
+                    record, end = decoder.raw_decode(buffer, pos)
+                    break
+
+            yield record
+            pos = end
+            expect_value = False
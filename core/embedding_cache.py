@@ -0,0 +1,169 @@
+"""
+임베딩 디스크 캐시
+(모델명, 텍스트 SHA-256) 키로 임베딩 벡터를 로컬 SQLite 파일에 저장하여
+변경되지 않은 텍스트는 다시 임베딩 API를 호출하지 않도록 함
+"""
+import hashlib
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+
+class SQLiteEmbeddingCache(Embeddings):
+    """SQLite 기반 임베딩 캐시 래퍼 (embed_documents / embed_query 모두 캐시)"""
+
+    def __init__(self, underlying: Embeddings, model_name: str, cache_path: Path):
+        """
+        Args:
+            underlying: 실제 임베딩을 계산할 임베딩 객체 (예: OpenAIEmbeddings)
+            model_name: 캐시 키에 포함할 임베딩 모델명
+            cache_path: SQLite 캐시 파일 경로
+        """
+        self.underlying = underlying
+        self.model_name = model_name
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 스레드마다 별도 연결 사용 (sqlite3 연결은 스레드 간 공유 불가)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._init_db()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_path, timeout=30)
+            # WAL 모드: 여러 프로세스가 동시에 읽고 쓰더라도 안전
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._get_connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+            """)
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _decode(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    def _lookup(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """캐시에 저장된 벡터 조회 (SQLite 변수 개수 제한을 고려해 나눠서 조회)"""
+        conn = self._get_connection()
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), 500):
+            batch = unique[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [self.model_name, *batch]
+            ).fetchall()
+            for text_hash, blob in rows:
+                found[text_hash] = self._decode(blob)
+        return found
+
+    def _store(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+        conn = self._get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(self.model_name, text_hash, self._encode(vector)) for text_hash, vector in items.items()]
+            )
+
+    def _count(self, hits: int, misses: int):
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _partition(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], Dict[str, str]]:
+        """(텍스트 해시 목록, 캐시된 벡터, 캐시에 없는 해시 → 텍스트) 반환"""
+        hashes = [self._hash(text) for text in texts]
+        cached = self._lookup(hashes)
+
+        # 캐시에 없는 텍스트만 중복 없이 임베딩
+        missing: Dict[str, str] = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in cached:
+                missing.setdefault(text_hash, text)
+        return hashes, cached, missing
+
+    def _merge(self, hashes: List[str], cached: Dict[str, List[float]], missing: Dict[str, str],
+               vectors: List[List[float]]) -> List[List[float]]:
+        """새로 계산한 벡터를 캐시에 저장하고 입력 순서대로 결과 구성"""
+        new_items = dict(zip(missing.keys(), vectors))
+        self._store(new_items)
+        cached.update(new_items)
+
+        self._count(len(hashes) - len(missing), len(missing))
+        return [cached[text_hash] for text_hash in hashes]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (캐시에 없는 텍스트만 실제 임베딩)"""
+        hashes, cached, missing = self._partition(texts)
+        vectors = self.underlying.embed_documents(list(missing.values())) if missing else []
+        return self._merge(hashes, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩 (반복 질의는 캐시에서 반환)"""
+        hashes, cached, missing = self._partition([text])
+        vectors = [self.underlying.embed_query(text)] if missing else []
+        return self._merge(hashes, cached, missing, vectors)[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """비동기 문서 임베딩 (캐시 조회는 로컬이므로 동기, API 호출만 비동기)"""
+        hashes, cached, missing = self._partition(texts)
+        vectors = await self.underlying.aembed_documents(list(missing.values())) if missing else []
+        return self._merge(hashes, cached, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """비동기 쿼리 임베딩"""
+        hashes, cached, missing = self._partition([text])
+        vectors = [await self.underlying.aembed_query(text)] if missing else []
+        return self._merge(hashes, cached, missing, vectors)[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+
+    def close(self):
+        """현재 스레드의 연결 종료"""
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
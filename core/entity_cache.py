@@ -0,0 +1,117 @@
+"""
+엔티티 조회 캐시
+사용자/주문/상품처럼 기본 키로 조회하는 행을 메모리에 보관하여
+같은 대화 안에서 반복되는 조회가 SQLite까지 가지 않도록 함
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class EntityCache:
+    """(엔티티 종류, 기본 키) → 행 캐시 (엔티티별 TTL + 전체 LRU)"""
+
+    def __init__(self, ttl_seconds: Dict[str, float], max_entries: int = 1024):
+        """
+        Args:
+            ttl_seconds: 엔티티 종류별 항목 유효 시간 (초, 0 이하이면 만료 없음, 없는 종류는 캐시하지 않음)
+            max_entries: 전체 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries는 1 이상이어야 합니다.")
+        self.ttl_seconds = dict(ttl_seconds)
+        self.max_entries = max_entries
+
+        # 값: (저장 시각, 행)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = {entity: 0 for entity in self.ttl_seconds}
+        self._misses = {entity: 0 for entity in self.ttl_seconds}
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _is_expired(self, entity: str, stored_at: float, now: float) -> bool:
+        ttl = self.ttl_seconds[entity]
+        return ttl > 0 and now - stored_at > ttl
+
+    def get(self, entity: str, key: Hashable) -> Optional[Dict[str, Any]]:
+        """캐시된 행의 복사본 (없거나 만료되었으면 None)
+
+        복사본을 반환하므로 호출한 쪽에서 수정해도 캐시된 행은 바뀌지 않는다.
+        """
+        if entity not in self.ttl_seconds:
+            return None
+        with self._lock:
+            entry = self._entries.get((entity, key))
+            if entry is not None and self._is_expired(entity, entry[0], time.time()):
+                del self._entries[(entity, key)]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self._misses[entity] += 1
+                return None
+            self._entries.move_to_end((entity, key))
+            self._hits[entity] += 1
+            row = entry[1]
+        return copy.deepcopy(row)
+
+    def put(self, entity: str, key: Hashable, row: Dict[str, Any]):
+        """행 저장 (저장 후 원본을 수정해도 캐시에는 영향 없음)"""
+        if entity not in self.ttl_seconds or row is None:
+            return
+        row = copy.deepcopy(row)
+        with self._lock:
+            self._entries[(entity, key)] = (time.time(), row)
+            self._entries.move_to_end((entity, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, entity: Optional[str] = None, key: Optional[Hashable] = None):
+        """항목 무효화
+
+        Args:
+            entity: 무효화할 엔티티 종류 (None이면 전체)
+            key: 무효화할 기본 키 (None이면 해당 종류 전체)
+        """
+        with self._lock:
+            if entity is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            elif key is not None:
+                removed = 1 if self._entries.pop((entity, key), None) is not None else 0
+            else:
+                keys = [cache_key for cache_key in self._entries if cache_key[0] == entity]
+                for cache_key in keys:
+                    del self._entries[cache_key]
+                removed = len(keys)
+            self.invalidations += removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환 (엔티티별 적중/미스 포함)"""
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            by_entity = {}
+            for entity in self.ttl_seconds:
+                total = self._hits[entity] + self._misses[entity]
+                by_entity[entity] = {
+                    "entries": sum(1 for cache_key in self._entries if cache_key[0] == entity),
+                    "hits": self._hits[entity],
+                    "misses": self._misses[entity],
+                    "hit_ratio": self._hits[entity] / total if total else 0.0
+                }
+            return {
+                "entries": len(self._entries),
+                "hits": hits,
+                "misses": misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                "by_entity": by_entity
+            }
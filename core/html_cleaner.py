@@ -0,0 +1,136 @@
+"""
+크롤링한 FAQ HTML 정제 모듈
+HTML 태그/엔티티를 평문으로 바꾸고 링크 안내 같은 상투 문구를 제거한 뒤,
+FAQ 페이지 레코드를 질문 하나당 문서 하나로 나눔
+"""
+import re
+from html.parser import HTMLParser
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+# 줄바꿈으로 바꿀 블록 태그
+_BLOCK_TAGS = {"p", "br", "div", "li", "ul", "ol", "tr", "table", "h1", "h2", "h3", "h4", "h5", "h6"}
+# 내용을 버릴 태그
+_SKIP_TAGS = {"script", "style"}
+
+# 임베딩/프롬프트에 정보가 없는 상투 문구 (링크 버튼 문구 등)
+BOILERPLATE_PATTERNS = [
+    re.compile(r"^\[?[^\[\]]*바로\s?가기\]?$"),
+    re.compile(r"^아래 (내용|경로)를 확인해 주세요\.?$"),
+]
+# 문장 중간에 붙은 링크 버튼 문구 (예: "...하세요.[반품 접수 FAQ 바로가기]")
+_INLINE_LINK_PATTERN = re.compile(r"\[[^\[\]]*바로\s?가기\]")
+
+
+class _TextExtractor(HTMLParser):
+    """HTML에서 텍스트만 추출 (블록 태그는 줄바꿈으로 변환)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.paragraphs: List[str] = []
+        self._paragraph: List[str] = []
+        self._in_paragraph = False
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        if tag == "p":
+            self._in_paragraph = True
+            self._paragraph = []
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        if tag == "p" and self._in_paragraph:
+            self.paragraphs.append("".join(self._paragraph))
+            self._in_paragraph = False
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        # HTML 소스의 줄바꿈은 공백과 같으므로 줄 구분은 블록 태그로만 판단
+        data = data.replace("\n", " ")
+        self.parts.append(data)
+        if self._in_paragraph:
+            self._paragraph.append(data)
+
+
+def _normalize(text: str) -> str:
+    """공백 정리: nbsp 제거, 줄 안의 연속 공백 축소, 연속 빈 줄은 하나로"""
+    lines = [re.sub(r"[ \t\u00a0\u200b]+", " ", line).strip() for line in text.splitlines()]
+    normalized = []
+    for line in lines:
+        if not line and (not normalized or not normalized[-1]):
+            continue
+        normalized.append(line)
+    return "\n".join(normalized).strip()
+
+
+def html_to_text(html: str) -> str:
+    """HTML 조각을 평문으로 변환"""
+    parser = _TextExtractor()
+    parser.feed(html or "")
+    parser.close()
+    return _normalize("".join(parser.parts))
+
+
+def extract_paragraphs(html: str) -> List[str]:
+    """<p> 요소별 텍스트 목록 (FAQ 질문 목록 메타데이터 파싱용)"""
+    parser = _TextExtractor()
+    parser.feed(html or "")
+    parser.close()
+    return [_normalize(text) for text in parser.paragraphs if _normalize(text)]
+
+
+def strip_boilerplate(text: str) -> str:
+    """상투 문구 줄 제거"""
+    lines = [
+        _INLINE_LINK_PATTERN.sub("", line) for line in text.splitlines()
+        if not any(pattern.match(line.strip()) for pattern in BOILERPLATE_PATTERNS)
+    ]
+    return _normalize("\n".join(lines))
+
+
+def clean_faq_pages(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """크롤링한 FAQ 페이지 레코드를 질문별 문서로 정제
+
+    같은 페이지에서 수집된 레코드는 연속으로 나오며 title 메타데이터에 페이지의 질문 목록 HTML이
+    공통으로 들어 있다. 페이지 안에서 n번째 레코드의 본문이 n번째 질문의 답변이다.
+
+    Args:
+        records: {"page_content", "metadata": {"source", "tag", "title"}, "id"} 형태의 레코드
+
+    Yields:
+        {"id", "question", "answer", "category", "keywords"} 형태의 레코드 (답변이 비면 제외)
+    """
+    for title_html, page in groupby(records, key=lambda record: record.get("metadata", {}).get("title", "")):
+        page = list(page)
+        questions = extract_paragraphs(title_html)
+        if len(questions) != len(page):
+            # 질문 수와 답변 수가 다르면 짝을 맞출 수 없으므로 질문 없이 답변만 사용
+            print(f"FAQ 페이지 질문/답변 수 불일치 (질문 {len(questions)}개, 답변 {len(page)}개)")
+            questions = [""] * len(page)
+
+        for question, record in zip(questions, page):
+            answer = strip_boilerplate(html_to_text(record.get("page_content", "")))
+            if not answer:
+                continue
+            category = html_to_text(record.get("metadata", {}).get("tag", ""))
+            yield {
+                "id": record.get("id"),
+                "question": question,
+                "answer": answer,
+                "category": category,
+                "keywords": [category] if category else []
+            }
@@ -0,0 +1,147 @@
+"""
+벡터 인덱스 스냅샷 (이식 가능한 내보내기/가져오기 형식)
+벡터 스토어 내용을 백엔드/라이브러리 버전과 무관한 파일로 저장하여
+새 서버가 임베딩 API 호출 없이 인덱스를 바로 구성할 수 있게 함
+
+스냅샷 디렉토리 구성:
+    manifest.json     형식 버전, 임베딩 모델명, 차원, 청크 수, 파일/청크 해시
+    embeddings.npy    (청크 수 × 차원) float32 임베딩 행렬
+    documents.jsonl   행렬과 같은 순서의 {"id", "page_content", "metadata"}
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+DOCUMENTS_FILE = "documents.jsonl"
+
+
+def _file_hash(path: Path) -> str:
+    """파일 SHA-256 해시 (1MB씩 읽어 계산)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_snapshot(directory: Union[str, Path], ids: List[str], texts: List[str],
+                   metadatas: List[Dict[str, Any]], embeddings: np.ndarray, embedding_model: str,
+                   chunk_hashes: Optional[Dict[str, str]] = None,
+                   extra_files: Optional[Dict[str, Path]] = None) -> Dict[str, Any]:
+    """스냅샷 저장 (매니페스트는 마지막에 써서, 매니페스트가 있으면 완성된 스냅샷)
+
+    Args:
+        directory: 스냅샷 디렉토리
+        ids / texts / metadatas: 청크 ID, 본문, 메타데이터 (같은 순서)
+        embeddings: (청크 수 × 차원) 임베딩 행렬
+        embedding_model: 임베딩 모델명 (가져올 때 설정과 일치해야 함)
+        chunk_hashes: 청크 ID → 내용 해시 (증분 동기화 매니페스트로 복원)
+        extra_files: 함께 복사할 파일 (스냅샷 내 파일명 → 원본 경로, 예: 로컬 임베딩 IDF)
+
+    Returns:
+        저장한 매니페스트
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / MANIFEST_FILE).unlink(missing_ok=True)
+
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+        raise ValueError(f"임베딩 행렬 크기가 청크 수와 맞지 않습니다: {matrix.shape} (청크 {len(ids)}개)")
+
+    np.save(directory / EMBEDDINGS_FILE, matrix)
+    with open(directory / DOCUMENTS_FILE, 'w', encoding='utf-8') as f:
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            f.write(json.dumps({"id": doc_id, "page_content": text, "metadata": metadata},
+                               ensure_ascii=False) + "\n")
+
+    files = {EMBEDDINGS_FILE: None, DOCUMENTS_FILE: None}
+    for name, source in (extra_files or {}).items():
+        (directory / name).write_bytes(Path(source).read_bytes())
+        files[name] = None
+    files = {name: _file_hash(directory / name) for name in files}
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "embedding_model": embedding_model,
+        "dimensions": int(matrix.shape[1]),
+        "count": len(ids),
+        "files": files,
+        "chunks": chunk_hashes or {}
+    }
+    tmp_path = directory / (MANIFEST_FILE + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, directory / MANIFEST_FILE)
+    return manifest
+
+
+def read_manifest(directory: Union[str, Path]) -> Dict[str, Any]:
+    """스냅샷 매니페스트 로드
+
+    Raises:
+        ValueError: 매니페스트가 없거나 지원하지 않는 형식 버전인 경우
+    """
+    path = Path(directory) / MANIFEST_FILE
+    if not path.exists():
+        raise ValueError(f"스냅샷 매니페스트가 없습니다 (저장이 끝나지 않은 스냅샷일 수 있음): {path}")
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 스냅샷 형식 버전입니다: {manifest.get('format_version')}")
+    return manifest
+
+
+def load_snapshot(directory: Union[str, Path], verify: bool = True) -> Dict[str, Any]:
+    """스냅샷 로드 및 검증
+
+    Args:
+        directory: 스냅샷 디렉토리
+        verify: 파일 해시 검증 여부
+
+    Returns:
+        {"manifest", "ids", "texts", "metadatas", "embeddings"}
+
+    Raises:
+        ValueError: 파일이 손상되었거나 매니페스트와 내용이 맞지 않는 경우
+    """
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+
+    if verify:
+        for name, expected in manifest["files"].items():
+            if _file_hash(directory / name) != expected:
+                raise ValueError(f"스냅샷 파일 해시가 일치하지 않습니다: {name}")
+
+    embeddings = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")
+    ids, texts, metadatas = [], [], []
+    with open(directory / DOCUMENTS_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            ids.append(record["id"])
+            texts.append(record["page_content"])
+            metadatas.append(record["metadata"])
+
+    expected_shape = (manifest["count"], manifest["dimensions"])
+    if embeddings.shape != expected_shape or len(ids) != manifest["count"]:
+        raise ValueError(f"스냅샷 크기가 매니페스트와 다릅니다: 임베딩 {embeddings.shape}, "
+                         f"문서 {len(ids)}개 (매니페스트 {expected_shape})")
+
+    return {
+        "manifest": manifest,
+        "ids": ids,
+        "texts": texts,
+        "metadatas": metadatas,
+        "embeddings": embeddings
+    }
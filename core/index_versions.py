@@ -0,0 +1,116 @@
+"""
+벡터 인덱스 버전 관리 (블루/그린 재구축)
+인덱스를 버전별 디렉토리에 만들고, 검증이 끝난 버전만 CURRENT 포인터 파일을
+원자적으로 교체(os.replace)하여 서비스 버전으로 게시
+
+디렉토리 구성:
+    {root}/CURRENT                       현재 서비스 중인 버전명
+    {root}/versions/{버전}/               벡터 스토어 파일 + 동기화 매니페스트
+    {root}/versions/{버전}/index_manifest.json   임베딩 모델, 차원, 코퍼스 해시
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+class IndexVersionStore:
+    """버전별 인덱스 디렉토리와 CURRENT 포인터 관리"""
+
+    CURRENT_FILE = "CURRENT"
+    VERSIONS_DIR = "versions"
+    MANIFEST_FILE = "index_manifest.json"
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Args:
+            root: 인덱스 루트 디렉토리 (예: data/vectordb_chroma)
+        """
+        self.root = Path(root)
+
+    def path(self, version: str) -> Path:
+        return self.root / self.VERSIONS_DIR / version
+
+    def current(self) -> Optional[str]:
+        """현재 게시된 버전명 (없으면 None)"""
+        try:
+            version = (self.root / self.CURRENT_FILE).read_text(encoding='utf-8').strip()
+        except FileNotFoundError:
+            return None
+        return version if version and self.path(version).is_dir() else None
+
+    def versions(self) -> List[str]:
+        """존재하는 모든 버전명 (오래된 순)"""
+        versions_dir = self.root / self.VERSIONS_DIR
+        if not versions_dir.exists():
+            return []
+        return sorted(path.name for path in versions_dir.iterdir() if path.is_dir())
+
+    def new_version(self) -> str:
+        """새 버전 디렉토리 생성 후 버전명 반환 (생성 시각 기반, 이름순 = 생성순)"""
+        base = time.strftime("v%Y%m%d-%H%M%S")
+        version = base
+        suffix = 0
+        while self.path(version).exists():
+            suffix += 1
+            version = f"{base}-{suffix:02d}"
+        self.path(version).mkdir(parents=True)
+        return version
+
+    def pending_version(self, marker: str) -> Optional[str]:
+        """중단된 빌드 버전 (현재 버전보다 새롭고 marker 파일이 남아 있는 가장 최근 버전)"""
+        current = self.current()
+        for version in reversed(self.versions()):
+            if current is not None and version <= current:
+                break
+            if (self.path(version) / marker).exists():
+                return version
+        return None
+
+    def read_manifest(self, directory: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """인덱스 디렉토리의 매니페스트 (없으면 None)"""
+        path = Path(directory) / self.MANIFEST_FILE
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_manifest(self, version: str, manifest: Dict[str, Any]):
+        tmp_path = self.path(version) / (self.MANIFEST_FILE + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path(version) / self.MANIFEST_FILE)
+
+    def publish(self, version: str):
+        """CURRENT 포인터를 원자적으로 교체 (읽는 쪽은 이전 버전 또는 새 버전만 보게 됨)"""
+        if self.read_manifest(self.path(version)) is None:
+            raise ValueError(f"매니페스트가 없는 버전은 게시할 수 없습니다: {version}")
+        tmp_path = self.root / (self.CURRENT_FILE + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.root / self.CURRENT_FILE)
+
+    def prune(self, keep: int = 2):
+        """현재 버전과 그 이전 버전 keep-1개(롤백용)만 남기고 삭제
+
+        현재 버전보다 새 버전은 다른 프로세스가 빌드 중일 수 있으므로 남겨 둔다.
+        """
+        current = self.current()
+        if current is None:
+            return
+        older = [version for version in self.versions() if version < current]
+        for version in older[:max(0, len(older) - (keep - 1))]:
+            shutil.rmtree(self.path(version), ignore_errors=True)
+
+
+def corpus_hash(chunk_hashes: Dict[str, str]) -> str:
+    """청크 ID → 내용 해시 전체에 대한 해시 (같은 코퍼스로 만든 인덱스인지 비교용)"""
+    digest = hashlib.sha256()
+    for chunk_id in sorted(chunk_hashes):
+        digest.update(f"{chunk_id}\t{chunk_hashes[chunk_id]}\n".encode("utf-8"))
+    return digest.hexdigest()
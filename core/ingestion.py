@@ -0,0 +1,210 @@
+"""
+벡터 스토어 병렬 적재 파이프라인
+배치 임베딩을 스레드 풀에서 동시에 실행하고, 레이트 리밋(429) 응답에 맞춰
+동시성을 조절하며 실패한 배치는 재시도하고 진행 상황을 체크포인트로 남김
+"""
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+
+# (청크 ID 목록, 청크 목록, 임베딩 목록)을 벡터 스토어에 저장하는 함수
+WriteFunction = Callable[[List[str], List[Document], List[List[float]]], None]
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """레이트 리밋(HTTP 429) 오류인지 확인"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    name = type(error).__name__
+    message = str(error).lower()
+    return name == "RateLimitError" or "429" in message or "rate limit" in message
+
+
+class ParallelIngestor:
+    """청크 임베딩 및 저장을 병렬로 수행하는 적재기"""
+
+    def __init__(self, embeddings: Embeddings, write_fn: WriteFunction, batch_size: int = 100,
+                 max_workers: int = 4, max_retries: int = 5, base_backoff: float = 1.0,
+                 checkpoint_path: Optional[Path] = None,
+                 hash_fn: Optional[Callable[[Document], str]] = None,
+                 flush_fn: Optional[Callable[[], None]] = None, checkpoint_every: int = 1):
+        """
+        Args:
+            embeddings: 임베딩 객체
+            write_fn: 임베딩된 배치를 벡터 스토어에 저장하는 함수 (호출 스레드에서 실행)
+            batch_size: 임베딩 요청 1회당 청크 수
+            max_workers: 최대 동시 임베딩 요청 수
+            max_retries: 배치별 최대 재시도 횟수
+            base_backoff: 재시도 대기 시간의 기준값 (초, 지수 증가)
+            checkpoint_path: 완료된 청크를 기록할 체크포인트 파일 (중단 후 재개용)
+            hash_fn: 체크포인트에 기록할 청크 내용 해시 함수
+            flush_fn: 체크포인트 기록 전에 저장 내용을 디스크에 반영하는 함수
+            checkpoint_every: 몇 개 배치마다 flush 후 체크포인트를 기록할지
+        """
+        self.embeddings = embeddings
+        self.write_fn = write_fn
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.hash_fn = hash_fn or (lambda doc: doc.page_content)
+        self.flush_fn = flush_fn
+        self.checkpoint_every = checkpoint_every
+
+        # 레이트 리밋에 따라 조절되는 현재 동시성 (AIMD)
+        self._concurrency = max_workers
+
+    def _load_checkpoint(self) -> Dict[str, str]:
+        """완료된 청크 ID → 해시 로드"""
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return {}
+        done = {}
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.update(json.loads(line))
+                except json.JSONDecodeError:
+                    # 중단 시점에 잘린 마지막 줄은 무시
+                    continue
+        return done
+
+    def _append_checkpoint(self, entries: Dict[str, str]):
+        """저장 내용을 디스크에 반영한 뒤 완료된 청크 기록"""
+        if self.flush_fn:
+            self.flush_fn()
+        if not self.checkpoint_path:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            if entries:
+                f.write(json.dumps(entries) + "\n")
+
+    def _batches(self, items: Iterable[Tuple[str, Document]], done: Dict[str, str],
+                 skipped: List[int]) -> Iterator[Tuple[List[str], List[Document]]]:
+        """체크포인트에 있는 청크를 건너뛰며 배치 생성"""
+        def pending():
+            for chunk_id, chunk in items:
+                if done.get(chunk_id) == self.hash_fn(chunk):
+                    skipped[0] += 1
+                    continue
+                yield chunk_id, chunk
+
+        iterator = pending()
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                return
+            ids, chunks = zip(*batch)
+            yield list(ids), list(chunks)
+
+    def _embed_batch(self, chunks: List[Document]) -> List[List[float]]:
+        return self.embeddings.embed_documents([chunk.page_content for chunk in chunks])
+
+    def _backoff(self, attempt: int) -> float:
+        return self.base_backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def ingest(self, items: Iterable[Tuple[str, Document]]) -> Dict[str, Any]:
+        """(청크 ID, 청크) 목록을 임베딩하여 저장
+
+        Returns:
+            적재 통계 (written, skipped, failed, failed_ids, elapsed, chunks_per_sec)
+        """
+        start_time = time.time()
+        done = self._load_checkpoint()
+        skipped = [0]
+        written = 0
+        failed_ids: Set[str] = set()
+        batches = self._batches(items, done, skipped)
+
+        # 체크포인트 파일을 먼저 만들어 두어, 첫 배치 전에 중단되어도 재개 대상으로 인식
+        self._append_checkpoint({})
+        pending_entries: Dict[str, str] = {}
+        pending_batches = 0
+
+        # 재시도 대기 중인 배치: (재시도 가능 시각, 시도 횟수, ids, chunks)
+        retry_queue: List[Tuple[float, int, List[str], List[Document]]] = []
+        in_flight: Dict[Any, Tuple[int, List[str], List[Document]]] = {}
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                # 현재 동시성 한도까지 배치 제출 (재시도 배치 우선)
+                now = time.time()
+                while len(in_flight) < self._concurrency:
+                    ready = [entry for entry in retry_queue if entry[0] <= now]
+                    if ready:
+                        entry = min(ready, key=lambda e: e[0])
+                        retry_queue.remove(entry)
+                        _, attempt, ids, chunks = entry
+                    elif not exhausted:
+                        try:
+                            ids, chunks = next(batches)
+                            attempt = 0
+                        except StopIteration:
+                            exhausted = True
+                            continue
+                    else:
+                        break
+                    in_flight[executor.submit(self._embed_batch, chunks)] = (attempt, ids, chunks)
+
+                if not in_flight:
+                    if exhausted and not retry_queue:
+                        break
+                    # 재시도 대기 중인 배치만 남은 경우
+                    time.sleep(max(0.0, min(entry[0] for entry in retry_queue) - time.time()))
+                    continue
+
+                completed, _ = wait(list(in_flight), timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    attempt, ids, chunks = in_flight.pop(future)
+                    try:
+                        vectors = future.result()
+                        self.write_fn(ids, chunks, vectors)
+                        written += len(ids)
+
+                        pending_entries.update({chunk_id: self.hash_fn(chunk) for chunk_id, chunk in zip(ids, chunks)})
+                        pending_batches += 1
+                        if pending_batches >= self.checkpoint_every:
+                            self._append_checkpoint(pending_entries)
+                            pending_entries, pending_batches = {}, 0
+
+                        # 성공 시 동시성 1씩 회복
+                        self._concurrency = min(self.max_workers, self._concurrency + 1)
+                    except Exception as e:
+                        if is_rate_limit_error(e):
+                            # 레이트 리밋: 동시성 절반으로 감소
+                            self._concurrency = max(1, self._concurrency // 2)
+                        if attempt + 1 > self.max_retries:
+                            print(f"배치 적재 실패 ({len(ids)}개 청크, {attempt + 1}회 시도): {e}")
+                            failed_ids.update(ids)
+                        else:
+                            retry_queue.append((time.time() + self._backoff(attempt), attempt + 1, ids, chunks))
+
+                elapsed = time.time() - start_time
+                if completed and written:
+                    print(f"임베딩 진행: {written}개 청크 저장 ({written / elapsed:.1f} 청크/초, 동시성 {self._concurrency})")
+
+        if pending_entries:
+            self._append_checkpoint(pending_entries)
+
+        elapsed = time.time() - start_time
+        stats = {
+            "written": written,
+            "skipped": skipped[0],
+            "failed": len(failed_ids),
+            "failed_ids": failed_ids,
+            "elapsed": elapsed,
+            "chunks_per_sec": written / elapsed if elapsed > 0 else 0.0
+        }
+        print(f"적재 완료: 저장 {written}개, 체크포인트 건너뜀 {skipped[0]}개, 실패 {len(failed_ids)}개, "
+              f"{stats['chunks_per_sec']:.1f} 청크/초")
+        return stats
@@ -4,12 +4,13 @@ LangChain Tool 래퍼 모듈
 """
 import json
 from typing import Dict, Any, Optional, List
+from langchain_core.callbacks import CallbackManagerForToolRun
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
 # 기존 컴포넌트 임포트
-from .rag_processor import RAGProcessor
-from .db_query_engine import DatabaseQueryEngine
+from .rag_registry import get_rag_registry
+from .db_query_engine import get_db_engine
 from .delivery_api_wrapper import DeliveryAPIWrapper
 from .response_styler import ResponseStyler, ResponseTone
 
@@ -29,23 +30,21 @@ class RAGSearchTool(BaseTool):
     - 회사 정책, 서비스 안내 등 일반적인 질문"""
     args_schema: type = RAGSearchInput
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self._rag_processor = None
-
     def _get_rag_processor(self):
-        """RAG 프로세서 지연 로딩"""
-        if self._rag_processor is None:
-            self._rag_processor = RAGProcessor()
-            self._rag_processor.initialize_vector_store()
-        return self._rag_processor
-
-    def _run(self, query: str) -> str:
-        """RAG 검색 실행"""
+        """프로세스 전역에서 공유하는 RAG 프로세서 반환 (최초 호출 시 초기화)"""
+        return get_rag_registry().get_processor()
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        """RAG 검색 실행 (생성 중인 답변 토큰은 "rag_token" 이벤트로 콜백 핸들러에 전달)"""
         try:
             rag = self._get_rag_processor()
-            result = rag.process_query(query)
-            return result['response']
+            callbacks = run_manager.get_child() if run_manager else None
+            chunks = []
+            for chunk in rag.stream_response(query):
+                chunks.append(chunk)
+                if callbacks is not None:
+                    callbacks.on_custom_event("rag_token", {"content": chunk})
+            return "".join(chunks)
         except Exception as e:
             return f"죄송합니다. 검색 중 오류가 발생했습니다: {str(e)}"
 
@@ -70,7 +69,7 @@ class OrderLookupTool(BaseTool):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._db_engine = DatabaseQueryEngine()
+        self._db_engine = get_db_engine()
         self._current_user_id = None  # 현재 사용자 ID 저장용
     
     def _run(self, order_id: Optional[str] = None, phone: Optional[str] = None,
@@ -162,7 +161,7 @@ class DeliveryTrackingTool(BaseTool):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._delivery_api = DeliveryAPIWrapper()
-        self._db_engine = DatabaseQueryEngine()
+        self._db_engine = get_db_engine()
         self._current_user_id = None  # 현재 사용자 ID 저장용
     
     def _run(self, tracking_number: Optional[str] = None, order_id: Optional[str] = None,
@@ -181,11 +180,7 @@ class DeliveryTrackingTool(BaseTool):
                 # 주문번호로 배송 정보 조회
                 order = self._db_engine.get_order_by_id(order_id)
                 if order:
-                    delivery_info = self._delivery_api.get_delivery_status_by_order(order)
-                    if delivery_info:
-                        return self._delivery_api.format_delivery_info(delivery_info)
-                    else:
-                        return f"주문번호 {order_id}의 배송 정보를 조회할 수 없습니다."
+                    return self.track_order(order)
                 else:
                     return f"주문번호 {order_id}에 해당하는 주문을 찾을 수 없습니다."
 
@@ -207,11 +202,7 @@ class DeliveryTrackingTool(BaseTool):
 
                     if matching_order:
                         # 해당 주문의 배송 정보 조회
-                        delivery_info = self._delivery_api.get_delivery_status_by_order(matching_order)
-                        if delivery_info:
-                            return f"'{product_name}' 상품의 배송 현황입니다.\n\n" + self._delivery_api.format_delivery_info(delivery_info)
-                        else:
-                            return f"'{product_name}' 상품의 배송 정보를 조회할 수 없습니다."
+                        return self.track_order(matching_order, product_name)
                     else:
                         return f"'{product_name}' 상품을 포함한 주문을 찾을 수 없습니다."
 
@@ -224,6 +215,17 @@ class DeliveryTrackingTool(BaseTool):
         except Exception as e:
             return f"배송 추적 중 오류가 발생했습니다: {str(e)}"
 
+    def track_order(self, order: Dict[str, Any], product_name: Optional[str] = None) -> str:
+        """이미 조회한 주문의 배송 현황 (주문을 다시 조회하지 않음)"""
+        delivery_info = self._delivery_api.get_delivery_status_by_order(order)
+        if product_name:
+            if delivery_info:
+                return f"'{product_name}' 상품의 배송 현황입니다.\n\n" + self._delivery_api.format_delivery_info(delivery_info)
+            return f"'{product_name}' 상품의 배송 정보를 조회할 수 없습니다."
+        if delivery_info:
+            return self._delivery_api.format_delivery_info(delivery_info)
+        return f"주문번호 {order['order_id']}의 배송 정보를 조회할 수 없습니다."
+
     def set_current_user_id(self, user_id: str):
         """현재 사용자 ID 설정"""
         self._current_user_id = user_id
@@ -233,6 +235,7 @@ class ProductSearchInput(BaseModel):
     """상품 검색 도구 입력 스키마"""
     keyword: str = Field(description="검색할 상품명이나 키워드")
     limit: int = Field(default=5, description="검색 결과 개수 (기본값: 5)")
+    offset: int = Field(default=0, description="건너뛸 결과 개수 (다음 페이지 조회 시 이전까지 받은 개수)")
 
 
 class ProductSearchTool(BaseTool):
@@ -247,12 +250,12 @@ class ProductSearchTool(BaseTool):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._db_engine = DatabaseQueryEngine()
+        self._db_engine = get_db_engine()
 
-    def _run(self, keyword: str, limit: int = 5) -> str:
+    def _run(self, keyword: str, limit: int = 5, offset: int = 0) -> str:
         """상품 검색 실행"""
         try:
-            products = self._db_engine.search_products(keyword, limit)
+            products = self._db_engine.search_products(keyword, limit, offset)
             if products:
                 return self._db_engine.format_product_list(products)
             else:
@@ -0,0 +1,112 @@
+"""
+로컬 임베딩 백엔드 (네트워크 불필요)
+문자 n-gram을 해시하여 고정 차원의 TF-IDF 벡터로 만드는 임베딩.
+개발/CI 환경의 오프라인 검색 테스트와 지연 시간이 중요한 간단한 FAQ 검색에 사용
+"""
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# 다항식 롤링 해시 및 비트 섞기 상수 (uint64 연산은 2^64로 자연스럽게 wrap-around)
+_HASH_BASE = np.uint64(1099511628211)
+_MIX_MULTIPLIER = np.uint64(0xff51afd7ed558ccd)
+
+
+class HashedNgramEmbeddings(Embeddings):
+    """해시된 문자 n-gram TF-IDF 임베딩"""
+
+    IDF_FILE = "local_idf.npy"
+
+    def __init__(self, dimensions: int = 2048, ngram_range: Tuple[int, int] = (2, 3)):
+        """
+        Args:
+            dimensions: 임베딩 차원 (n-gram 해시 버킷 수)
+            ngram_range: 문자 n-gram 길이 범위 (최소, 최대)
+        """
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+        # 문서 빈도로 계산한 IDF (fit 전에는 모든 n-gram 가중치 1)
+        self.idf: Optional[np.ndarray] = None
+
+    @property
+    def model_name(self) -> str:
+        """매니페스트/캐시 키에 쓰는 모델명"""
+        min_n, max_n = self.ngram_range
+        return f"local-hashed-ngram-{min_n}{max_n}-{self.dimensions}"
+
+    def _buckets(self, text: str) -> np.ndarray:
+        """텍스트의 모든 문자 n-gram 해시 버킷 인덱스"""
+        normalized = " " + _WHITESPACE_PATTERN.sub(" ", text.lower()).strip() + " "
+        codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+        buckets = []
+        min_n, max_n = self.ngram_range
+        for n in range(min_n, max_n + 1):
+            count = len(codes) - n + 1
+            if count <= 0:
+                break
+            hashes = np.full(count, n, dtype=np.uint64)
+            for offset in range(n):
+                hashes = hashes * _HASH_BASE + codes[offset:offset + count]
+            # 하위 비트 편향을 줄이기 위해 상위 비트와 섞은 뒤 버킷 선택
+            hashes = (hashes ^ (hashes >> np.uint64(33))) * _MIX_MULTIPLIER
+            hashes ^= hashes >> np.uint64(29)
+            buckets.append((hashes % np.uint64(self.dimensions)).astype(np.int64))
+
+        return np.concatenate(buckets) if buckets else np.zeros(0, dtype=np.int64)
+
+    def fit(self, texts: Iterable[str]) -> "HashedNgramEmbeddings":
+        """코퍼스 문서 빈도로 IDF 계산 (텍스트를 하나씩 읽으므로 메모리 사용량 일정)"""
+        document_frequency = np.zeros(self.dimensions, dtype=np.float64)
+        total = 0
+        for text in texts:
+            document_frequency[np.unique(self._buckets(text))] += 1
+            total += 1
+        self.idf = (np.log((1 + total) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def save(self, directory: Union[str, Path]):
+        """IDF 저장"""
+        if self.idf is None:
+            return
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / self.IDF_FILE, self.idf)
+
+    def load(self, directory: Union[str, Path]) -> bool:
+        """저장된 IDF 로드 (없으면 False)"""
+        path = Path(directory) / self.IDF_FILE
+        if not path.exists():
+            return False
+        idf = np.load(path)
+        if idf.shape != (self.dimensions,):
+            raise ValueError(f"IDF 차원이 맞지 않습니다: {idf.shape} (설정 {self.dimensions})")
+        self.idf = idf
+        return True
+
+    def _embed(self, text: str) -> List[float]:
+        counts = np.bincount(self._buckets(text), minlength=self.dimensions).astype(np.float32)
+
+        # 로그 스케일 TF × IDF, L2 정규화
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        nonzero = counts > 0
+        vector[nonzero] = 1 + np.log(counts[nonzero])
+        if self.idf is not None:
+            vector *= self.idf
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
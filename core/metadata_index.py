@@ -0,0 +1,144 @@
+"""
+메타데이터 사전 필터 인덱스
+출처(source), 카테고리, 상품 ID별 청크 ID 집합과 가격순 정렬 배열을 미리 만들어 두고
+검색 필터에 맞는 후보 청크만 골라 벡터/BM25 검색 대상을 줄임
+
+필터 형식 (모든 키는 선택, 여러 키는 AND):
+    {"source": "product" 또는 ["faq", "product"],
+     "category": "셔츠" 또는 ["셔츠", "니트"],
+     "min_price": 10000, "max_price": 50000,
+     "product_ids": ["GM0025032809786", ...]}
+"""
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+FILTER_KEYS = {"source", "category", "min_price", "max_price", "product_ids"}
+
+
+def _as_values(value: Any) -> List[str]:
+    """단일 값 또는 여러 값을 문자열 목록으로 변환"""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def parse_price(value: Any) -> Optional[float]:
+    """가격을 숫자로 변환 ("39,000" 같은 문자열 포함, 변환할 수 없으면 None)
+
+    문서 생성 시에도 사용하여 Chroma where 절의 숫자 비교와 같은 값으로 필터링되게 한다.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").replace("원", "").strip())
+    except ValueError:
+        return None
+
+
+def validate_filters(filters: Dict[str, Any]):
+    """알 수 없는 필터 키 확인
+
+    Raises:
+        ValueError: 지원하지 않는 필터 키가 있는 경우
+    """
+    unknown = set(filters) - FILTER_KEYS
+    if unknown:
+        raise ValueError(f"지원하지 않는 검색 필터입니다: {sorted(unknown)}")
+
+
+class MetadataIndex:
+    """청크 메타데이터 기반 후보 집합 인덱스"""
+
+    def __init__(self):
+        self._all: FrozenSet[str] = frozenset()
+        self._by_source: Dict[str, FrozenSet[str]] = {}
+        self._by_category: Dict[str, FrozenSet[str]] = {}
+        self._by_product_id: Dict[str, FrozenSet[str]] = {}
+        # 가격이 있는 청크를 가격순으로 정렬 (범위 조회는 이진 탐색)
+        self._prices: List[float] = []
+        self._price_ids: List[str] = []
+
+    def build(self, ids: Iterable[str], metadatas: Iterable[Optional[Dict[str, Any]]]):
+        """청크 ID와 메타데이터로 인덱스 구성"""
+        by_source: Dict[str, set] = {}
+        by_category: Dict[str, set] = {}
+        by_product_id: Dict[str, set] = {}
+        priced = []
+        all_ids = set()
+
+        for chunk_id, metadata in zip(ids, metadatas):
+            metadata = metadata or {}
+            all_ids.add(chunk_id)
+            for key, groups in (("source", by_source), ("category", by_category), ("product_id", by_product_id)):
+                if metadata.get(key) not in (None, ""):
+                    groups.setdefault(str(metadata[key]), set()).add(chunk_id)
+            price = parse_price(metadata.get("price"))
+            if price is not None:
+                priced.append((price, chunk_id))
+
+        priced.sort()
+        self._all = frozenset(all_ids)
+        self._by_source = {key: frozenset(value) for key, value in by_source.items()}
+        self._by_category = {key: frozenset(value) for key, value in by_category.items()}
+        self._by_product_id = {key: frozenset(value) for key, value in by_product_id.items()}
+        self._prices = [price for price, _ in priced]
+        self._price_ids = [chunk_id for _, chunk_id in priced]
+
+    @staticmethod
+    def _union(groups: Dict[str, FrozenSet[str]], values: List[str]) -> FrozenSet[str]:
+        if len(values) == 1:
+            return groups.get(values[0], frozenset())
+        return frozenset().union(*(groups.get(value, frozenset()) for value in values))
+
+    def candidates(self, filters: Optional[Dict[str, Any]]) -> Optional[FrozenSet[str]]:
+        """필터에 맞는 청크 ID 집합 (필터가 없으면 None = 전체)"""
+        if not filters:
+            return None
+        validate_filters(filters)
+
+        sets = []
+        if filters.get("source") is not None:
+            sets.append(self._union(self._by_source, _as_values(filters["source"])))
+        if filters.get("category") is not None:
+            sets.append(self._union(self._by_category, _as_values(filters["category"])))
+        if filters.get("product_ids") is not None:
+            sets.append(self._union(self._by_product_id, _as_values(filters["product_ids"])))
+        if filters.get("min_price") is not None or filters.get("max_price") is not None:
+            start = bisect_left(self._prices, filters["min_price"]) if filters.get("min_price") is not None else 0
+            end = (bisect_right(self._prices, filters["max_price"])
+                   if filters.get("max_price") is not None else len(self._prices))
+            sets.append(frozenset(self._price_ids[start:end]))
+
+        if not sets:
+            return None
+        # 작은 집합부터 교집합
+        sets.sort(key=len)
+        result = sets[0]
+        for other in sets[1:]:
+            result = result & other
+        return result
+
+    @staticmethod
+    def to_chroma_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """필터를 Chroma where 절로 변환 (Chroma는 자체 메타데이터 인덱스로 사전 필터링)"""
+        if not filters:
+            return None
+        validate_filters(filters)
+
+        conditions = []
+        for key, field in (("source", "source"), ("category", "category"), ("product_ids", "product_id")):
+            if filters.get(key) is not None:
+                conditions.append({field: {"$in": _as_values(filters[key])}})
+        if filters.get("min_price") is not None:
+            conditions.append({"price": {"$gte": filters["min_price"]}})
+        if filters.get("max_price") is not None:
+            conditions.append({"price": {"$lte": filters["max_price"]}})
+
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+    def __len__(self) -> int:
+        return len(self._all)
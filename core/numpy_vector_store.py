@@ -0,0 +1,402 @@
+"""
+NumPy 기반 인메모리 벡터 스토어
+정규화된 임베딩을 연속된 float32/float16 행렬(.npy)로 저장하고
+시작 시 메모리 매핑하여 행렬-벡터 곱 한 번과 argpartition으로 top-k 검색
+
+검색 인덱스 모드: 앞쪽 차원만 잘라 다시 정규화한 벡터(Matryoshka 임베딩)를
+int8/이진 양자화하여 1차 후보를 고르고, 후보만 전체 정밀도 벡터로 다시 점수 계산
+"""
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+class NumpyVectorStore(VectorStore):
+    """.npy 행렬 + JSONL 문서 파일로 저장되는 벡터 스토어 (Chroma 대체용)"""
+
+    EMBEDDINGS_FILE = "embeddings.npy"
+    DOCUMENTS_FILE = "documents.jsonl"
+    SEARCH_INDEX_FILE = "search_index.npz"
+
+    QUANTIZATIONS = ("none", "int8", "binary")
+
+    # float16 행렬은 BLAS를 쓰기 위해 이 행 수만큼씩 float32로 변환하여 계산
+    _BLOCK_ROWS = 8192
+
+    # 바이트별 1비트 개수 (이진 벡터 해밍 거리 계산용)
+    _POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def __init__(self, embedding_function: Embeddings, persist_directory: Optional[str] = None,
+                 dtype: str = "float32", search_dimensions: Optional[int] = None,
+                 quantization: str = "none", rescore_factor: int = 4):
+        """
+        Args:
+            embedding_function: 쿼리/문서 임베딩 객체
+            persist_directory: 저장 디렉토리 (있으면 기존 인덱스를 메모리 매핑으로 로드)
+            dtype: 임베딩 저장 타입 (float32 또는 float16)
+            search_dimensions: 1차 검색에 사용할 앞쪽 차원 수 (예: 256/512/1024, 생략 시 전체 차원)
+            quantization: 1차 검색 벡터 양자화 ("none", "int8", "binary")
+                - int8: 1차 인덱스 메모리를 1/4로 줄이는 메모리 절약 모드 (NumPy에는 int8 BLAS가 없어
+                  검색 때마다 float32로 변환하므로 "none"보다 느림, 속도가 목적이면 search_dimensions 사용)
+                - binary: 메모리 1/32 + 해밍 거리로 빠른 1차 검색 (OpenAI 임베딩 같은 밀집 벡터용)
+            rescore_factor: 1차 검색에서 k × rescore_factor개 후보를 골라 전체 정밀도로 재계산
+        """
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantization}")
+        self._embedding_function = embedding_function
+        self.persist_directory = Path(persist_directory) if persist_directory else None
+        self.dtype = np.dtype(dtype)
+        self.search_dimensions = search_dimensions
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        # 1차 검색용 {"codes", "scale"} (행렬이 바뀌면 None으로 두고 검색 시 다시 만듦)
+        self._search_index: Optional[Dict[str, np.ndarray]] = None
+
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._id_to_index: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        # 행 추가용 버퍼 (_matrix는 앞쪽 행의 뷰, 용량을 두 배씩 늘려 배치마다 전체 행렬을 복사하지 않음)
+        self._buffer: Optional[np.ndarray] = None
+
+        if self.persist_directory and (self.persist_directory / self.EMBEDDINGS_FILE).exists():
+            self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+
+    def _load(self):
+        """저장된 인덱스 로드 (임베딩 행렬은 메모리 매핑)"""
+        self._matrix = np.load(self.persist_directory / self.EMBEDDINGS_FILE, mmap_mode="r")
+        self.dtype = self._matrix.dtype
+
+        with open(self.persist_directory / self.DOCUMENTS_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                self._ids.append(record["id"])
+                self._texts.append(record["page_content"])
+                self._metadatas.append(record["metadata"])
+
+        self._id_to_index = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._load_search_index()
+
+    def persist(self):
+        """인덱스를 디스크에 저장 (임시 파일에 쓴 뒤 교체)"""
+        if self.persist_directory is None:
+            return
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+
+        matrix = self._matrix if self._matrix is not None else np.zeros((0, 0), dtype=self.dtype)
+        embeddings_tmp = self.persist_directory / (self.EMBEDDINGS_FILE + ".tmp")
+        with open(embeddings_tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=self.dtype))
+
+        documents_tmp = self.persist_directory / (self.DOCUMENTS_FILE + ".tmp")
+        with open(documents_tmp, 'w', encoding='utf-8') as f:
+            for doc_id, text, metadata in zip(self._ids, self._texts, self._metadatas):
+                f.write(json.dumps({"id": doc_id, "page_content": text, "metadata": metadata},
+                                   ensure_ascii=False) + "\n")
+
+        os.replace(embeddings_tmp, self.persist_directory / self.EMBEDDINGS_FILE)
+        os.replace(documents_tmp, self.persist_directory / self.DOCUMENTS_FILE)
+
+        # 시작 시 다시 계산하지 않도록 1차 검색 인덱스도 저장
+        if self._uses_search_index() and self._matrix is not None and self._matrix.size:
+            search_index = self._get_search_index()
+            search_index_tmp = self.persist_directory / (self.SEARCH_INDEX_FILE + ".tmp")
+            with open(search_index_tmp, 'wb') as f:
+                np.savez(f, **search_index)
+            os.replace(search_index_tmp, self.persist_directory / self.SEARCH_INDEX_FILE)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add_embeddings(self, texts: List[str], embeddings: List[List[float]],
+                       metadatas: Optional[List[Dict[str, Any]]] = None,
+                       ids: Optional[List[str]] = None) -> List[str]:
+        """미리 계산된 임베딩 추가 (같은 ID가 있으면 교체)"""
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32)).astype(self.dtype)
+
+        count = len(self._ids)
+        new_ids = {doc_id for doc_id in ids if doc_id not in self._id_to_index}
+        matrix = self._reserve_rows(count + len(new_ids), vectors.shape[1])
+        for doc_id, text, metadata, vector in zip(ids, texts, metadatas, vectors):
+            if doc_id in self._id_to_index:
+                index = self._id_to_index[doc_id]
+                self._texts[index] = text
+                self._metadatas[index] = metadata
+            else:
+                index = len(self._ids)
+                self._id_to_index[doc_id] = index
+                self._ids.append(doc_id)
+                self._texts.append(text)
+                self._metadatas.append(metadata)
+            matrix[index] = vector
+
+        self._matrix = matrix[:len(self._ids)]
+        self._search_index = None
+        return list(ids)
+
+    def _reserve_rows(self, rows: int, dimensions: int) -> np.ndarray:
+        """rows개 행을 담을 수 있는 쓰기 가능한 버퍼 반환 (기존 행은 앞쪽에 유지)
+
+        메모리 매핑된 읽기 전용 행렬이거나 용량이 부족할 때만 복사하고,
+        용량은 두 배씩 늘려 배치 단위 추가가 전체적으로 O(N) 복사가 되게 한다.
+        """
+        count = len(self._matrix) if self._matrix is not None and self._matrix.size else 0
+        if self._buffer is not None and self._matrix is not None and self._matrix.base is self._buffer \
+                and len(self._buffer) >= rows:
+            return self._buffer
+        capacity = max(rows, 2 * len(self._buffer) if self._buffer is not None else 0)
+        buffer = np.empty((capacity, dimensions), dtype=self.dtype)
+        if count:
+            buffer[:count] = self._matrix
+        self._buffer = buffer
+        return buffer
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """텍스트 임베딩 후 추가"""
+        texts = list(texts)
+        embeddings = self._embedding_function.embed_documents(texts)
+        return self.add_embeddings(texts, embeddings, metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """ID로 문서 삭제"""
+        if not ids or self._matrix is None:
+            return True
+        remove = {self._id_to_index[doc_id] for doc_id in ids if doc_id in self._id_to_index}
+        if not remove:
+            return True
+
+        keep = [i for i in range(len(self._ids)) if i not in remove]
+        self._matrix = np.array(self._matrix[keep])
+        self._buffer = None
+        self._search_index = None
+        self._ids = [self._ids[i] for i in keep]
+        self._texts = [self._texts[i] for i in keep]
+        self._metadatas = [self._metadatas[i] for i in keep]
+        self._id_to_index = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        return True
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Chroma.get과 같은 형태로 저장된 항목 반환"""
+        include = ["documents", "metadatas"] if include is None else include
+        indices = range(len(self._ids)) if ids is None else [
+            self._id_to_index[doc_id] for doc_id in ids if doc_id in self._id_to_index
+        ]
+        indices = list(indices)
+
+        result: Dict[str, Any] = {"ids": [self._ids[i] for i in indices]}
+        if "documents" in include:
+            result["documents"] = [self._texts[i] for i in indices]
+        if "metadatas" in include:
+            result["metadatas"] = [self._metadatas[i] for i in indices]
+        if "embeddings" in include:
+            result["embeddings"] = (
+                np.asarray(self._matrix[indices], dtype=np.float32)
+                if self._matrix is not None and indices else np.zeros((0, 0), dtype=np.float32)
+            )
+        return result
+
+    def _scores(self, query_vector: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """문서와의 코사인 유사도 (rows가 있으면 해당 행만 계산)"""
+        if rows is not None:
+            return np.asarray(self._matrix[rows], dtype=np.float32) @ query_vector
+        if self.dtype == np.float32:
+            return self._matrix @ query_vector
+
+        scores = np.empty(self._matrix.shape[0], dtype=np.float32)
+        for start in range(0, self._matrix.shape[0], self._BLOCK_ROWS):
+            block = np.asarray(self._matrix[start:start + self._BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + block.shape[0]] = block @ query_vector
+        return scores
+
+    def _uses_search_index(self) -> bool:
+        """전체 정밀도 행렬과 별도의 1차 검색 인덱스를 쓰는지 여부"""
+        if self.quantization != "none":
+            return True
+        return self.search_dimensions is not None and self._matrix is not None \
+            and self.search_dimensions < self._matrix.shape[1]
+
+    def _search_config(self) -> np.ndarray:
+        """저장된 1차 검색 인덱스가 현재 설정/행렬로 만든 것인지 확인하는 값 (차원, 양자화, 행 수)"""
+        return np.array([self._search_dims(), self.QUANTIZATIONS.index(self.quantization),
+                         self._matrix.shape[0]], dtype=np.int64)
+
+    def _search_dims(self) -> int:
+        full = self._matrix.shape[1]
+        return min(self.search_dimensions or full, full)
+
+    def _truncate(self, vectors: np.ndarray) -> np.ndarray:
+        """앞쪽 차원만 남기고 다시 정규화 (Matryoshka 임베딩은 앞쪽 차원에 정보가 몰려 있음)"""
+        return self._normalize(np.asarray(vectors[..., :self._search_dims()], dtype=np.float32))
+
+    def _load_search_index(self):
+        path = self.persist_directory / self.SEARCH_INDEX_FILE
+        if not self._uses_search_index() or not path.exists():
+            return
+        with np.load(path) as data:
+            search_index = {name: data[name] for name in data.files}
+        if np.array_equal(search_index.get("config"), self._search_config()):
+            self._search_index = search_index
+
+    def _get_search_index(self) -> Dict[str, np.ndarray]:
+        """1차 검색 인덱스 (없으면 전체 정밀도 행렬에서 블록 단위로 만듦)"""
+        if self._search_index is not None:
+            return self._search_index
+
+        rows = self._matrix.shape[0]
+        blocks = range(0, rows, self._BLOCK_ROWS)
+        scale = np.ones(self._search_dims(), dtype=np.float32)
+        center = np.zeros(self._search_dims(), dtype=np.float32)
+
+        if self.quantization == "binary":
+            # 차원별 평균을 기준으로 이진화 (OpenAI 임베딩처럼 0 중심이면 부호 비트와 같고,
+            # 로컬 TF-IDF처럼 음수가 없는 벡터도 구분력이 남음)
+            for start in blocks:
+                center += self._truncate(self._matrix[start:start + self._BLOCK_ROWS]).sum(axis=0)
+            center /= max(rows, 1)
+
+        if self.quantization == "int8":
+            # 차원별 최대 절댓값을 127에 맞추는 대칭 양자화
+            max_abs = np.zeros(self._search_dims(), dtype=np.float32)
+            for start in blocks:
+                block = self._truncate(self._matrix[start:start + self._BLOCK_ROWS])
+                np.maximum(max_abs, np.abs(block).max(axis=0), out=max_abs)
+            scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+
+        parts = []
+        for start in blocks:
+            block = self._truncate(self._matrix[start:start + self._BLOCK_ROWS])
+            if self.quantization == "int8":
+                parts.append(np.clip(np.rint(block / scale), -127, 127).astype(np.int8))
+            elif self.quantization == "binary":
+                parts.append(self._pack_bits(block - center))
+            else:
+                parts.append(block)
+
+        self._search_index = {"codes": np.concatenate(parts), "scale": scale, "center": center,
+                              "config": self._search_config()}
+        return self._search_index
+
+    @staticmethod
+    def _pack_bits(vectors: np.ndarray) -> np.ndarray:
+        """양수 여부로 이진 양자화 (64비트 단위로 비교할 수 있게 8바이트 배수로 0 패딩)"""
+        bits = np.packbits(vectors > 0, axis=-1)
+        padding = -bits.shape[-1] % 8
+        if padding:
+            bits = np.pad(bits, [(0, 0)] * (bits.ndim - 1) + [(0, padding)])
+        return np.ascontiguousarray(bits)
+
+    def _hamming_distances(self, codes: np.ndarray, query_bits: np.ndarray) -> np.ndarray:
+        if hasattr(np, "bitwise_count"):
+            # NumPy 2.0+: 64비트 단위 popcount
+            xor = np.bitwise_xor(np.ascontiguousarray(codes).view(np.uint64), query_bits.view(np.uint64))
+            return np.bitwise_count(xor).sum(axis=1, dtype=np.int32)
+        return self._POPCOUNT[np.bitwise_xor(codes, query_bits)].sum(axis=1, dtype=np.int32)
+
+    def _first_pass_scores(self, query_vector: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """1차 검색 점수 (클수록 가까움, 이진 양자화는 음의 해밍 거리)"""
+        search_index = self._get_search_index()
+        codes = search_index["codes"] if rows is None else search_index["codes"][rows]
+        query = self._truncate(query_vector)
+
+        if self.quantization == "binary":
+            query_bits = self._pack_bits(query - search_index["center"])
+            return -self._hamming_distances(codes, query_bits).astype(np.float32)
+        if self.quantization == "int8":
+            # (코드 × 스케일) · 쿼리 = 코드 · (쿼리 × 스케일), int8은 블록 단위로 float32 변환
+            # (정수 행렬곱(int16/int32 누적)은 BLAS를 쓰지 못해 이 방식보다도 느림 → 메모리 절약 전용)
+            scaled_query = query * search_index["scale"]
+            scores = np.empty(codes.shape[0], dtype=np.float32)
+            for start in range(0, codes.shape[0], self._BLOCK_ROWS):
+                block = codes[start:start + self._BLOCK_ROWS].astype(np.float32)
+                scores[start:start + block.shape[0]] = block @ scaled_query
+            return scores
+        return codes @ query
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                               filter_ids: Optional[Iterable[str]] = None,
+                                               **kwargs: Any) -> List[Tuple[Document, float]]:
+        """임베딩 벡터로 top-k 검색 (점수는 코사인 유사도)
+
+        Args:
+            filter_ids: 검색 대상 문서 ID (있으면 이 문서들의 행만 점수 계산)
+        """
+        if self._matrix is None or not self._ids:
+            return []
+
+        rows = None
+        if filter_ids is not None:
+            rows = np.fromiter(
+                (self._id_to_index[doc_id] for doc_id in filter_ids if doc_id in self._id_to_index),
+                dtype=np.int64
+            )
+            if not rows.size:
+                return []
+            # 메모리 매핑된 행렬을 순서대로 읽도록 정렬
+            rows.sort()
+
+        query_vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        if self._uses_search_index():
+            # 1차: 축소/양자화 벡터로 후보 선택 → 2차: 후보만 전체 정밀도로 재계산
+            first_pass = self._first_pass_scores(query_vector, rows)
+            candidates = min(first_pass.shape[0], k * self.rescore_factor)
+            selected = np.argpartition(-first_pass, candidates - 1)[:candidates]
+            rows = np.sort(rows[selected] if rows is not None else selected)
+        scores = self._scores(query_vector, rows)
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        indices = rows[top] if rows is not None else top
+
+        return [
+            (Document(page_content=self._texts[i], metadata=dict(self._metadatas[i])), float(score))
+            for i, score in zip(indices, scores[top])
+        ]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        embedding = self._embedding_function.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # 점수가 이미 코사인 유사도이므로 그대로 관련도 점수로 사용
+        return lambda score: score
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, persist_directory: Optional[str] = None,
+                   dtype: str = "float32", **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(embedding, persist_directory=persist_directory, dtype=dtype)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        store.persist()
+        return store
+
+    def __len__(self) -> int:
+        return len(self._ids)
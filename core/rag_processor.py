@@ -2,38 +2,204 @@
 RAG (Retrieval-Augmented Generation) 프로세서
 벡터 DB를 사용한 문서 검색 및 응답 생성
 """
+import asyncio
+import hashlib
 import json
+import os
+import random
+import shutil
+import threading
 import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import AbstractSet, Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 
+from .semantic_cache import SemanticCache
+from .embedding_cache import SQLiteEmbeddingCache
+from .sparse_index import BM25Index
+from .metadata_index import MetadataIndex, parse_price
+from .numpy_vector_store import NumpyVectorStore
+from .ingestion import ParallelIngestor
+from .document_loader import iter_json_array
+from .context_packer import ContextPacker
+from .local_embeddings import HashedNgramEmbeddings
+from . import index_snapshot
+from .index_versions import IndexVersionStore, corpus_hash
+
 load_dotenv()
 
+NO_RESULT_RESPONSE = "죄송합니다. 관련된 정보를 찾을 수 없습니다. 고객센터(1588-1234)로 문의해주시면 더 자세한 도움을 받으실 수 있습니다."
+ERROR_RESPONSE = "죄송합니다. 현재 시스템에 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
+
+# 응답 생성 기본 모델 (RAGRegistry도 같은 값으로 공유 LLM 클라이언트를 만듦)
+DEFAULT_MODEL_NAME = "gpt-4o-mini"
+
 
 class RAGProcessor:
     """RAG 기반 문서 검색 및 응답 생성 클래스"""
     
-    def __init__(self, model_name: str = "gpt-4o-mini"):
+    # 임베딩 백엔드별 관련도 기준 기본값 (로컬 n-gram 임베딩은 점수 분포가 전체적으로 낮음)
+    SCORE_DEFAULTS = {
+        "openai": {"min_relevance_score": 0.3, "faq_direct_threshold": 0.8},
+        "local": {"min_relevance_score": 0.15, "faq_direct_threshold": 0.5},
+    }
+    
+    # 새 인덱스 검색 검증: 무작위로 고른 청크 수, 자기 자신 검색 시 1위 관련도와 1의 허용 오차 (float16 저장 고려)
+    INDEX_PROBE_COUNT = 3
+    INDEX_PROBE_TOLERANCE = 1e-2
+    
+    # 알려진 임베딩 모델의 출력 차원 (인덱스와 설정 모델이 맞는지 확인할 때 사용)
+    EMBEDDING_DIMENSIONS = {
+        "text-embedding-3-large": 3072,
+        "text-embedding-3-small": 1536,
+        "text-embedding-ada-002": 1536,
+    }
+    
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, use_semantic_cache: bool = True,
+                 cache_similarity_threshold: float = 0.95, cache_ttl_seconds: float = 3600,
+                 cache_max_entries: int = 512, embedding_model: str = "text-embedding-3-large",
+                 use_embedding_cache: bool = True, use_hybrid_search: bool = True,
+                 hybrid_candidates: int = 10, vector_backend: str = "chroma",
+                 numpy_dtype: str = "float32", max_concurrency: int = 8,
+                 ingest_workers: int = 4, ingest_batch_size: int = 100,
+                 min_relevance_score: Optional[float] = None, use_faq_fast_path: bool = True,
+                 faq_direct_threshold: Optional[float] = None, faq_direct_margin: float = 0.05,
+                 faq_answer_template: str = "{answer}", max_context_tokens: int = 1500,
+                 context_dedup_threshold: float = 0.85, embedding_backend: str = "openai",
+                 local_embedding_dimensions: int = 2048, keep_index_versions: int = 2,
+                 numpy_search_dimensions: Optional[int] = None, numpy_quantization: str = "none",
+                 numpy_rescore_factor: int = 4, llm: Optional[ChatOpenAI] = None):
+        """
+        Args:
+            model_name: 응답 생성에 사용할 LLM 모델명
+            use_semantic_cache: 유사 질문 응답 캐시 사용 여부
+            cache_similarity_threshold: 캐시 적중으로 볼 최소 코사인 유사도
+            cache_ttl_seconds: 캐시 항목 유효 시간 (초)
+            cache_max_entries: 캐시 최대 항목 수 (LRU 제거)
+            embedding_model: 임베딩 모델명
+            use_embedding_cache: 임베딩 디스크 캐시 사용 여부
+            use_hybrid_search: BM25 + 벡터 하이브리드 검색 사용 여부
+            hybrid_candidates: 하이브리드 검색 시 각 검색기에서 가져올 후보 수
+            vector_backend: 벡터 스토어 백엔드 ("chroma" 또는 "numpy")
+            numpy_dtype: numpy 백엔드의 임베딩 저장 타입 ("float32" 또는 "float16")
+            max_concurrency: 비동기/배치 처리 시 동시에 진행할 최대 쿼리 수
+            ingest_workers: 벡터 스토어 적재 시 동시에 보낼 최대 임베딩 요청 수
+            ingest_batch_size: 임베딩 요청 1회당 청크 수
+            min_relevance_score: 검색 결과로 인정할 최소 관련도 (코사인 유사도).
+                가장 관련도 높은 문서도 이보다 낮으면 LLM 호출 없이 안내 문구 반환
+                (생략 시 임베딩 백엔드별 기본값)
+            use_faq_fast_path: FAQ가 확실히 일치하면 LLM 없이 저장된 답변을 바로 반환할지 여부
+            faq_direct_threshold: FAQ 직접 응답에 필요한 최소 관련도 (생략 시 임베딩 백엔드별 기본값)
+            faq_direct_margin: FAQ 직접 응답 시 1위와 2위(다른 문서) 관련도의 최소 차이
+            faq_answer_template: FAQ 직접 응답 템플릿 ({question}, {answer} 사용 가능)
+            max_context_tokens: 프롬프트에 넣을 검색 문서 컨텍스트의 최대 토큰 수
+            context_dedup_threshold: 컨텍스트 조립 시 중복으로 보고 제외할 청크 유사도
+            embedding_backend: 임베딩 백엔드 ("openai" 또는 네트워크 없이 동작하는 "local").
+                local은 별도 인덱스 디렉토리를 사용하며 embedding_model/use_embedding_cache는 무시
+            local_embedding_dimensions: local 임베딩 차원
+            keep_index_versions: 새 인덱스 버전 게시 후 남겨 둘 버전 수 (현재 버전 포함, 롤백용)
+            numpy_search_dimensions: numpy 백엔드 1차 검색에 쓸 앞쪽 차원 수 (예: 256/512/1024, 생략 시 전체)
+            numpy_quantization: numpy 백엔드 1차 검색 벡터 양자화 ("none", "int8", "binary")
+                (int8은 메모리 절약 전용으로 검색은 "none"보다 느림)
+            numpy_rescore_factor: 1차 검색 후보 수 배수 (k × 배수개를 전체 정밀도로 재계산)
+            llm: 응답 생성에 사용할 LLM 클라이언트 (생략 시 model_name으로 새로 생성, 레지스트리는 공유 클라이언트 전달)
+        """
+        if vector_backend not in ("chroma", "numpy"):
+            raise ValueError(f"지원하지 않는 벡터 스토어 백엔드입니다: {vector_backend}")
+        if embedding_backend not in ("openai", "local"):
+            raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {embedding_backend}")
+        if vector_backend != "numpy" and (numpy_search_dimensions or numpy_quantization != "none"):
+            raise ValueError("차원 축소/양자화 검색 인덱스는 numpy 벡터 스토어 백엔드에서만 지원합니다.")
+        
         self.model_name = model_name
-        self.llm = ChatOpenAI(model=model_name, temperature=0.1)
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+        self.llm = llm if llm is not None else ChatOpenAI(model=model_name, temperature=0.1)
+        self.embedding_backend = embedding_backend
+        self.vector_backend = vector_backend
+        self.numpy_dtype = numpy_dtype
+        self.numpy_search_dimensions = numpy_search_dimensions
+        self.numpy_quantization = numpy_quantization
+        self.numpy_rescore_factor = numpy_rescore_factor
+        self.max_concurrency = max_concurrency
+        self.ingest_workers = ingest_workers
+        self.ingest_batch_size = ingest_batch_size
+        # 이벤트 루프별 세마포어 (asyncio.Semaphore는 처음 사용한 루프에 묶이므로,
+        # 레지스트리로 공유되는 프로세서를 여러 루프/스레드에서 써도 되도록 루프마다 따로 둔다)
+        self._async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        self._async_semaphores_lock = threading.Lock()
         self.vectorstore = None
         self.retriever = None
         self.rag_chain = None
         
         # 프로젝트 루트 경로 설정
         self.project_root = Path(__file__).parent.parent
-        self.vector_db_path = self.project_root / "data" / "vectordb_chroma"
+        # 임베딩 공간이 다른 인덱스는 섞이지 않도록 디렉토리를 분리
+        index_suffix = "_local" if embedding_backend == "local" else ""
+        # 인덱스는 버전별 디렉토리에 만들고 CURRENT 포인터로 서비스 버전을 선택 (블루/그린 재구축)
+        self.index_versions = IndexVersionStore(self.project_root / "data" / f"vectordb_{vector_backend}{index_suffix}")
+        self.keep_index_versions = keep_index_versions
+        self._resolve_index_path()
         self.raw_docs_path = self.project_root / "data" / "raw_docs"
+        self.embedding_cache_path = self.project_root / "data" / "embedding_cache.sqlite"
+        
+        # 임베딩 (변경되지 않은 텍스트는 디스크 캐시에서 재사용)
+        if embedding_backend == "local":
+            # 로컬 계산이 캐시 조회보다 빠르므로 디스크 캐시는 사용하지 않음
+            self.embeddings = HashedNgramEmbeddings(dimensions=local_embedding_dimensions)
+            self.embedding_model = self.embeddings.model_name
+        else:
+            self.embeddings = OpenAIEmbeddings(model=embedding_model)
+            self.embedding_model = embedding_model
+            if use_embedding_cache:
+                self.embeddings = SQLiteEmbeddingCache(self.embeddings, embedding_model, self.embedding_cache_path)
+        
+        # 의미 기반 응답 캐시
+        self.semantic_cache = SemanticCache(
+            similarity_threshold=cache_similarity_threshold,
+            ttl_seconds=cache_ttl_seconds,
+            max_entries=cache_max_entries
+        ) if use_semantic_cache else None
+        
+        # 하이브리드 검색용 BM25 인덱스 (벡터 스토어 초기화 시 구성)
+        self.use_hybrid_search = use_hybrid_search
+        self.hybrid_candidates = hybrid_candidates
+        self.sparse_index = None
+        # 검색 필터(출처/카테고리/가격/상품 ID)용 후보 집합 인덱스
+        self.metadata_index = MetadataIndex()
+        score_defaults = self.SCORE_DEFAULTS[embedding_backend]
+        self.min_relevance_score = (
+            score_defaults["min_relevance_score"] if min_relevance_score is None else min_relevance_score
+        )
+        
+        # FAQ 직접 응답 (LLM 생략) 설정
+        self.use_faq_fast_path = use_faq_fast_path
+        self.faq_direct_threshold = (
+            score_defaults["faq_direct_threshold"] if faq_direct_threshold is None else faq_direct_threshold
+        )
+        self.faq_direct_margin = faq_direct_margin
+        self.faq_answer_template = faq_answer_template
+        
+        # 검색 결과 → 프롬프트 컨텍스트 조립 (청크 병합/중복 제거/토큰 예산)
+        self.context_packer = ContextPacker(
+            max_tokens=max_context_tokens,
+            dedup_threshold=context_dedup_threshold,
+            model_name=model_name
+        )
+        
+        # 응답 유형별 처리 건수 (캐시 / FAQ 직접 응답 / LLM 생성 / 결과 없음)
+        self._stats_lock = threading.Lock()
+        self._query_stats = {"cached": 0, "faq_direct": 0, "llm": 0, "no_result": 0}
         
         # 텍스트 분할기 설정
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -62,20 +228,42 @@ class RAGProcessor:
             ("human", "{question}")
         ])
     
-    def initialize_vector_store(self):
-        """벡터 스토어 초기화 및 RAG Chain 구성"""
+    def initialize_vector_store(self, sync: bool = False):
+        """벡터 스토어 초기화 및 RAG Chain 구성
+
+        Args:
+            sync: 기존 벡터 스토어를 원본 문서와 증분 동기화할지 여부
+        """
         try:
-            if self.vector_db_path.exists():
-                # 기존 벡터 스토어 로드
-                self.vectorstore = Chroma(
-                    persist_directory=str(self.vector_db_path),
-                    embedding_function=self.embeddings
-                )
+            # 다른 프로세스가 그 사이 새 버전을 게시했을 수 있으므로 CURRENT를 다시 읽음
+            self._resolve_index_path()
+            has_index = self._has_index()
+            problem = self._index_compatibility_error() if has_index else None
+            
+            if has_index and not sync:
+                # 다른 임베딩 모델로 만든 인덱스는 검색 결과가 무의미하므로 로드 거부
+                if problem:
+                    raise ValueError(f"{problem} scripts/simple_embed.py로 인덱스를 다시 만들어 주세요.")
+                self.vectorstore = self._open_vector_store()
                 print(f"벡터 스토어 로드 완료: {self.vector_db_path}")
+            elif has_index and not problem and self._corpus_unchanged():
+                self.vectorstore = self._open_vector_store()
+                print(f"원본 문서 변경 없음, 벡터 스토어 로드 완료: {self.vector_db_path}")
             else:
-                # 새로운 벡터 스토어 생성
-                print("벡터 스토어가 없습니다. 새로 생성합니다...")
-                self._create_vector_store()
+                # 새 버전을 옆에 만들어 검증한 뒤 게시 (서비스 중인 버전은 건드리지 않음)
+                if problem:
+                    print(f"{problem} 새 인덱스 버전을 처음부터 만듭니다.")
+                elif not has_index:
+                    print("벡터 스토어가 없습니다. 새로 생성합니다...")
+                self._build_index_version(seed=has_index and not problem)
+            
+            # 인덱스가 바뀌었으므로 이전 답변 캐시 무효화
+            self.invalidate_cache()
+            
+            # 벡터 스토어와 같은 청크로 메타데이터 필터/BM25 인덱스 구성
+            self._build_metadata_index()
+            if self.use_hybrid_search:
+                self._build_sparse_index()
             
             # 리트리버 설정
             self.retriever = self.vectorstore.as_retriever(
@@ -92,12 +280,17 @@ class RAGProcessor:
     
     def _setup_rag_chain(self):
         """RAG Chain 구성"""
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
+        def format_docs(inputs):
+            context, report = self.context_packer.pack(inputs["docs"])
+            print(f"컨텍스트 패킹: {report['tokens_before']} → {report['tokens_after']} 토큰 "
+                  f"({report['tokens_saved']} 절약, 중복 제외 {report['dropped_duplicates']}개)")
+            return context
         
-        # RAG Chain 구성: 검색 → 포맷팅 → 프롬프트 → LLM → 파싱
+        # RAG Chain 구성: (검색된 문서) → 컨텍스트 패킹 → 프롬프트 → LLM → 파싱
+        # 검색은 체인 밖에서 한 번만 수행하고, 그 결과를 {"question", "docs"}로 전달받는다
+        # (docs는 Document 또는 (Document, 관련도) 목록)
         self.rag_chain = (
-            {"context": self.retriever | format_docs, "question": RunnablePassthrough()}
+            {"context": RunnableLambda(format_docs), "question": RunnableLambda(lambda x: x["question"])}
             | self.rag_prompt
             | self.llm
             | StrOutputParser()
@@ -105,63 +298,522 @@ class RAGProcessor:
         print("RAG Chain 구성 완료")
     
     def _create_vector_store(self):
-        """벡터 스토어 생성"""
-        documents = self._load_documents()
+        """벡터 스토어 생성 (문서 로드 → 분할 → 임베딩을 스트리밍으로 처리)"""
+        # 벡터 스토어 생성
+        self.vector_db_path.mkdir(parents=True, exist_ok=True)
+        self.vectorstore = self._open_vector_store()
+        
+        # 청크 ID → 해시만 모아 두고 청크 자체는 적재 단계로 바로 흘려보냄
+        chunk_hashes = {}
+        
+        def track(chunks):
+            for chunk_id, chunk in chunks:
+                chunk_hashes[chunk_id] = self._chunk_hash(chunk)
+                yield chunk_id, chunk
+        
+        # 문서 추가
+        failed_ids = self._add_chunks(track(self._iter_chunks(self._iter_documents())))
         
-        if not documents:
+        if not chunk_hashes:
             raise ValueError("로드할 문서가 없습니다.")
+        print(f"{len(chunk_hashes)}개 문서 청크 적재")
         
-        # 문서 분할
-        split_docs = self.text_splitter.split_documents(documents)
-        print(f"{len(split_docs)}개 문서 청크 생성")
+        self._persist_vector_store()
         
-        # 벡터 스토어 생성
-        self.vector_db_path.mkdir(parents=True, exist_ok=True)
-        self.vectorstore = Chroma(
+        # 동기화 매니페스트 저장 (실패한 청크는 다음 동기화 때 다시 추가)
+        self._save_manifest({
+            chunk_id: chunk_hash
+            for chunk_id, chunk_hash in chunk_hashes.items()
+            if chunk_id not in failed_ids
+        })
+        self.ingest_checkpoint_path.unlink(missing_ok=True)
+        
+        print(f"벡터 스토어 생성 완료: {self.vector_db_path}")
+    
+    def _resolve_index_path(self):
+        """현재 게시된 인덱스 버전 디렉토리로 vector_db_path 설정
+
+        게시된 버전이 없으면 버전 관리 이전 구조(루트 디렉토리에 바로 저장된 인덱스)를 사용하며,
+        다음 재구축 때 새 버전으로 옮겨진다.
+        """
+        self.index_version = self.index_versions.current()
+        if self.index_version is not None:
+            self.vector_db_path = self.index_versions.path(self.index_version)
+        else:
+            self.vector_db_path = self.index_versions.root
+    
+    def _has_index(self) -> bool:
+        """서비스할 인덱스가 있는지 여부"""
+        if self.index_version is not None:
+            return True
+        root = self.index_versions.root
+        reserved = {IndexVersionStore.VERSIONS_DIR, IndexVersionStore.CURRENT_FILE, self.ingest_checkpoint_path.name}
+        return root.exists() and any(path.name not in reserved for path in root.iterdir())
+    
+    def _expected_dimensions(self) -> Optional[int]:
+        if isinstance(self.embeddings, HashedNgramEmbeddings):
+            return self.embeddings.dimensions
+        return self.EMBEDDING_DIMENSIONS.get(self.embedding_model)
+    
+    def _index_compatibility_error(self) -> Optional[str]:
+        """현재 인덱스가 설정된 임베딩 모델로 만든 것인지 확인 (문제가 있으면 설명 문자열)"""
+        manifest = self.index_versions.read_manifest(self.vector_db_path)
+        if manifest is not None:
+            model, dimensions = manifest.get("embedding_model"), manifest.get("dimensions")
+        else:
+            # 버전 관리 이전 인덱스: 동기화 매니페스트의 모델명과 저장된 벡터 차원으로 확인
+            model, dimensions = None, None
+            if self.manifest_path.exists():
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    model = json.load(f).get("embedding_model")
+            vectorstore = self._open_vector_store()
+            ids = vectorstore.get(include=[])["ids"][:1]
+            if ids:
+                dimensions = len(vectorstore.get(ids=ids, include=["embeddings"])["embeddings"][0])
+        
+        if model is not None and model != self.embedding_model:
+            return f"인덱스 임베딩 모델({model})이 현재 설정({self.embedding_model})과 다릅니다."
+        expected = self._expected_dimensions()
+        if dimensions and expected and dimensions != expected:
+            return f"인덱스 임베딩 차원({dimensions})이 현재 모델의 차원({expected})과 다릅니다."
+        return None
+    
+    def _corpus_unchanged(self) -> bool:
+        """원본 문서의 청크가 현재 인덱스의 동기화 매니페스트와 완전히 같은지 여부 (임베딩 호출 없음)"""
+        previous = self._load_manifest()
+        if previous is None:
+            return False
+        current = {chunk_id: self._chunk_hash(chunk) for chunk_id, chunk in self._iter_chunks(self._iter_documents())}
+        return bool(current) and current == previous
+    
+    def _build_index_version(self, seed: bool):
+        """새 인덱스 버전을 만들고 검증한 뒤 게시
+
+        Args:
+            seed: 현재 버전의 벡터를 복사한 뒤 바뀐 청크만 임베딩할지 여부 (False면 전체 임베딩)
+        """
+        source_dir = self.vector_db_path if seed else None
+        
+        version = self.index_versions.pending_version(self.ingest_checkpoint_path.name)
+        if version is not None:
+            # 중단된 빌드 재개 (체크포인트에 기록된 청크는 건너뜀)
+            print(f"중단된 인덱스 버전 {version} 적재를 이어서 진행합니다...")
+        else:
+            version = self.index_versions.new_version()
+        self.vector_db_path = self.index_versions.path(version)
+        self.vectorstore = None
+        
+        try:
+            if self.ingest_checkpoint_path.exists() and self._load_manifest() is not None:
+                self.vectorstore = self._open_vector_store()
+                self.sync_vector_store()
+            elif self.ingest_checkpoint_path.exists() or source_dir is None:
+                self._create_vector_store()
+            else:
+                self._seed_from(source_dir)
+                self.sync_vector_store()
+            self._publish_index_version(version)
+        except Exception:
+            if not self.ingest_checkpoint_path.exists():
+                # 재개할 수 없는 빌드는 삭제 (서비스 중인 버전은 그대로)
+                self.vectorstore = None
+                shutil.rmtree(self.vector_db_path, ignore_errors=True)
+            raise
+    
+    def _seed_from(self, source_dir: Path):
+        """다른 인덱스 디렉토리의 벡터와 동기화 매니페스트를 현재 디렉토리로 복사 (임베딩 호출 없음)"""
+        if isinstance(self.embeddings, HashedNgramEmbeddings):
+            # 같은 IDF를 써야 복사한 벡터와 새로 임베딩한 벡터가 같은 공간에 있음
+            shutil.copyfile(source_dir / HashedNgramEmbeddings.IDF_FILE,
+                            self.vector_db_path / HashedNgramEmbeddings.IDF_FILE)
+        self.vectorstore = self._open_vector_store()
+        
+        data = self._open_vector_store(source_dir).get(include=["documents", "metadatas", "embeddings"])
+        self._write_vectors(data["ids"], data["documents"], data["metadatas"], data["embeddings"])
+        self._persist_vector_store()
+        
+        source_manifest = source_dir / self.manifest_path.name
+        if source_manifest.exists():
+            shutil.copyfile(source_manifest, self.manifest_path)
+        print(f"기존 인덱스에서 {len(data['ids'])}개 청크 복사")
+    
+    def _write_vectors(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]], embeddings):
+        """미리 계산된 벡터를 현재 벡터 스토어에 추가"""
+        # numpy 백엔드는 한 번에 추가 (배치마다 행렬을 다시 쌓지 않도록)
+        batch_size = max(len(ids), 1) if isinstance(self.vectorstore, NumpyVectorStore) else 500
+        for i in range(0, len(ids), batch_size):
+            chunks = [
+                Document(page_content=text, metadata=metadata)
+                for text, metadata in zip(texts[i:i+batch_size], metadatas[i:i+batch_size])
+            ]
+            vectors = np.asarray(embeddings[i:i+batch_size], dtype=np.float32).tolist()
+            self._write_embedded_chunks(ids[i:i+batch_size], chunks, vectors)
+    
+    def _validate_index(self) -> int:
+        """새로 만든 인덱스 검증 후 임베딩 차원 반환
+
+        Raises:
+            ValueError: 비어 있거나, 매니페스트와 청크가 다르거나, 차원이 맞지 않거나, 검색이 되지 않는 경우
+        """
+        ids = self.vectorstore.get(include=[])["ids"]
+        if not ids:
+            raise ValueError("새 인덱스가 비어 있습니다.")
+        manifest = self._load_manifest()
+        if manifest is None or set(manifest) != set(ids):
+            raise ValueError("새 인덱스의 청크가 동기화 매니페스트와 일치하지 않습니다.")
+        
+        probe_ids = random.sample(ids, min(self.INDEX_PROBE_COUNT, len(ids)))
+        probes = self.vectorstore.get(ids=probe_ids, include=["embeddings"])["embeddings"]
+        dimensions = len(probes[0])
+        expected = self._expected_dimensions()
+        if expected and dimensions != expected:
+            raise ValueError(f"새 인덱스 임베딩 차원({dimensions})이 모델 차원({expected})과 다릅니다.")
+        
+        # 저장된 벡터로 검색하면 1위 관련도가 1에 가까워야 함
+        # (같은 내용의 청크가 여럿이면 동점이 많아 1위가 다른 ID일 수 있으므로 ID가 아닌 점수로 확인)
+        for probe in probes:
+            vector = np.asarray(probe, dtype=np.float32)
+            if not vector.any():
+                continue  # 영벡터는 코사인 유사도가 정의되지 않음
+            found = self._dense_search("", 1, query_embedding=vector.tolist())
+            if not found or abs(found[0][1] - 1.0) > self.INDEX_PROBE_TOLERANCE:
+                raise ValueError("새 인덱스 검색 검증에 실패했습니다.")
+        return dimensions
+    
+    def _publish_index_version(self, version: str):
+        """인덱스 검증 → 인덱스 매니페스트 기록 → CURRENT 교체 → 오래된 버전 정리"""
+        dimensions = self._validate_index()
+        chunk_hashes = self._load_manifest()
+        self.index_versions.write_manifest(version, {
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "embedding_backend": self.embedding_backend,
+            "embedding_model": self.embedding_model,
+            "dimensions": dimensions,
+            "vector_backend": self.vector_backend,
+            "count": len(chunk_hashes),
+            "corpus_hash": corpus_hash(chunk_hashes)
+        })
+        self.index_versions.publish(version)
+        self.index_version = version
+        self.index_versions.prune(keep=self.keep_index_versions)
+        print(f"인덱스 버전 게시: {version} ({len(chunk_hashes)}개 청크, {dimensions}차원)")
+    
+    def _prepare_local_embeddings(self):
+        """로컬 임베딩의 IDF 로드 (인덱스에 없으면 원본 문서로 계산하여 저장)
+
+        IDF는 인덱스를 처음 만들 때 고정되며, 이후 증분 동기화에서는 그대로 사용한다.
+        """
+        if self.embeddings.load(self.vector_db_path):
+            return
+        print("로컬 임베딩 IDF 계산 중...")
+        self.embeddings.fit(chunk.page_content for _, chunk in self._iter_chunks(self._iter_documents()))
+        self.embeddings.save(self.vector_db_path)
+    
+    def _open_vector_store(self, directory: Optional[Path] = None):
+        """설정된 백엔드의 벡터 스토어 열기 (없으면 빈 스토어 생성)
+
+        Args:
+            directory: 인덱스 디렉토리 (생략 시 vector_db_path)
+        """
+        if directory is None:
+            directory = self.vector_db_path
+            if isinstance(self.embeddings, HashedNgramEmbeddings):
+                self._prepare_local_embeddings()
+        
+        if self.vector_backend == "numpy":
+            return NumpyVectorStore(
+                embedding_function=self.embeddings,
+                persist_directory=str(directory),
+                dtype=self.numpy_dtype,
+                search_dimensions=self.numpy_search_dimensions,
+                quantization=self.numpy_quantization,
+                rescore_factor=self.numpy_rescore_factor
+            )
+        return Chroma(
             embedding_function=self.embeddings,
-            persist_directory=str(self.vector_db_path)
+            persist_directory=str(directory),
+            # 기본 l2 공간의 거리는 정규화된 임베딩 간 제곱 유클리드 거리이므로
+            # 코사인 유사도(1 - d/2)로 변환하여 numpy 백엔드와 같은 척도로 맞춤
+            relevance_score_fn=lambda distance: max(0.0, 1.0 - distance / 2.0)
         )
+    
+    def _persist_vector_store(self):
+        """변경 내용 저장 (Chroma는 자동 저장되므로 numpy 백엔드만 해당)"""
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            self.vectorstore.persist()
+    
+    @property
+    def ingest_checkpoint_path(self) -> Path:
+        return self.vector_db_path / "ingest_checkpoint.jsonl"
+    
+    def _write_embedded_chunks(self, chunk_ids: List[str], chunks: List[Document],
+                               embeddings: List[List[float]]):
+        """미리 계산된 임베딩으로 청크 upsert"""
+        texts = [chunk.page_content for chunk in chunks]
+        metadatas = [chunk.metadata for chunk in chunks]
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            self.vectorstore.add_embeddings(texts, embeddings, metadatas, chunk_ids)
+        else:
+            self.vectorstore._collection.upsert(
+                ids=chunk_ids, embeddings=embeddings, metadatas=metadatas, documents=texts
+            )
+    
+    def _add_chunks(self, chunks: Iterable[Tuple[str, Document]]) -> set:
+        """(청크 ID, 청크)를 병렬로 임베딩하여 upsert하고 실패한 청크 ID 반환"""
+        is_numpy = isinstance(self.vectorstore, NumpyVectorStore)
+        ingestor = ParallelIngestor(
+            embeddings=self.embeddings,
+            write_fn=self._write_embedded_chunks,
+            batch_size=self.ingest_batch_size,
+            max_workers=self.ingest_workers,
+            checkpoint_path=self.ingest_checkpoint_path,
+            hash_fn=self._chunk_hash,
+            # numpy 백엔드는 메모리에만 반영되므로 디스크에 저장한 뒤 체크포인트 기록
+            flush_fn=self._persist_vector_store if is_numpy else None,
+            checkpoint_every=10 if is_numpy else 1
+        )
+        stats = ingestor.ingest(chunks)
+        return stats["failed_ids"]
+    
+    def sync_vector_store(self) -> Dict[str, int]:
+        """원본 문서와 벡터 스토어 증분 동기화
 
-        # 문서 추가
+        매니페스트(청크 ID → 내용 해시)와 현재 원본 문서를 비교하여
+        새로 생기거나 바뀐 청크만 upsert하고 사라진 청크는 삭제한다.
+        현재 인덱스 버전을 직접 수정하므로, 서비스 중에는 initialize_vector_store(sync=True)로
+        새 버전을 만들어 교체하는 것이 안전하다.
+        """
+        previous = self._load_manifest()
+        if previous is None:
+            # 매니페스트 없이 생성된 기존 스토어: 기존 청크를 모두 교체
+            print("동기화 매니페스트가 없습니다. 기존 청크를 모두 교체합니다.")
+            existing_ids = self.vectorstore.get(include=[])["ids"]
+            previous = {}
+        else:
+            existing_ids = list(previous)
+        
+        # 문서를 한 번만 순회하면서 현재 해시를 모으고 바뀐 청크만 적재 단계로 전달
+        current = {}
+        added_ids = set()
+        updated_ids = set()
+        
+        def changed_chunks():
+            for chunk_id, chunk in self._iter_chunks(self._iter_documents()):
+                current[chunk_id] = self._chunk_hash(chunk)
+                if previous.get(chunk_id) == current[chunk_id]:
+                    continue
+                (updated_ids if chunk_id in previous else added_ids).add(chunk_id)
+                yield chunk_id, chunk
+        
+        failed_ids = self._add_chunks(changed_chunks())
+        
+        if not current:
+            self.ingest_checkpoint_path.unlink(missing_ok=True)
+            print("로드할 문서가 없어 동기화를 건너뜁니다.")
+            return {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0, "failed": 0}
+        
+        # 삭제된 청크 제거
+        stale_ids = [chunk_id for chunk_id in existing_ids if chunk_id not in current]
         BATCH_SIZE = 500
-        for i in range(0, len(split_docs), BATCH_SIZE):
-            try:
-                self.vectorstore.add_documents(split_docs[i:i+BATCH_SIZE])
-            except Exception as e:
-                print(f"{i}번 째 Document Batch 추가 실패: {e}")
-                continue
-                    
-        print(f"벡터 스토어 생성 완료: {self.vector_db_path}")
+        for i in range(0, len(stale_ids), BATCH_SIZE):
+            self.vectorstore.delete(ids=stale_ids[i:i+BATCH_SIZE])
+        
+        self._persist_vector_store()
+        
+        # 실패한 청크는 이전 해시를 유지하여 다음 동기화 때 재시도
+        manifest = {
+            chunk_id: (previous[chunk_id] if chunk_id in failed_ids else chunk_hash)
+            for chunk_id, chunk_hash in current.items()
+            if chunk_id not in failed_ids or chunk_id in previous
+        }
+        self._save_manifest(manifest)
+        self.ingest_checkpoint_path.unlink(missing_ok=True)
+        
+        # 인덱스 내용이 바뀌었으면 캐시/BM25 인덱스도 갱신
+        changed = len(added_ids) + len(updated_ids)
+        if changed or stale_ids:
+            self.invalidate_cache()
+            self._build_metadata_index()
+            if self.sparse_index is not None:
+                self._build_sparse_index()
+        
+        stats = {
+            "added": len(added_ids),
+            "updated": len(updated_ids),
+            "deleted": len(stale_ids),
+            "unchanged": len(current) - changed,
+            "failed": len(failed_ids)
+        }
+        print(f"벡터 스토어 동기화 완료: {stats}")
+        return stats
+    
+    def _iter_chunks(self, documents: Iterable[Document]) -> Iterator[Tuple[str, Document]]:
+        """문서를 청크로 분할하며 '{문서 ID}#{청크 순번}' 형태의 고정 ID와 함께 반환"""
+        seen_doc_ids = {}
+        
+        for doc in documents:
+            doc_id = doc.metadata.get("doc_id") or self._content_hash(doc.page_content)[:16]
+            
+            # 같은 ID의 문서가 여러 개인 경우 순번을 붙여 구분
+            if doc_id in seen_doc_ids:
+                seen_doc_ids[doc_id] += 1
+                doc_id = f"{doc_id}-{seen_doc_ids[doc_id]}"
+            else:
+                seen_doc_ids[doc_id] = 0
+            
+            for index, chunk in enumerate(self.text_splitter.split_documents([doc])):
+                chunk_id = f"{doc_id}#{index}"
+                chunk.metadata["doc_id"] = doc_id
+                chunk.metadata["chunk_id"] = chunk_id
+                yield chunk_id, chunk
+    
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        """텍스트 SHA-256 해시"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def _chunk_hash(self, chunk: Document) -> str:
+        """청크 내용 + 메타데이터 해시"""
+        metadata = json.dumps(chunk.metadata, sort_keys=True, ensure_ascii=False, default=str)
+        return self._content_hash(f"{chunk.page_content}\n{metadata}")
+    
+    @property
+    def manifest_path(self) -> Path:
+        return self.vector_db_path / "sync_manifest.json"
+    
+    def _load_manifest(self) -> Optional[Dict[str, str]]:
+        """동기화 매니페스트 로드 (없거나 임베딩 모델이 다르면 None)"""
+        if not self.manifest_path.exists():
+            return None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("embedding_model") != self.embedding_model:
+                return None
+            return manifest.get("chunks", {})
+        except Exception as e:
+            print(f"동기화 매니페스트 로드 실패: {e}")
+            return None
     
-    def _load_documents(self) -> List[Document]:
-        """문서 로드 및 Document 객체 변환"""
-        documents = []
+    def _save_manifest(self, chunk_hashes: Dict[str, str]):
+        """동기화 매니페스트 저장 (임시 파일에 쓴 뒤 교체)"""
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"embedding_model": self.embedding_model, "chunks": chunk_hashes}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def export_snapshot(self, snapshot_dir: Union[str, Path]) -> Dict[str, Any]:
+        """현재 벡터 인덱스를 이식 가능한 스냅샷으로 내보내기 (임베딩 API 호출 없음)
+
+        Args:
+            snapshot_dir: 스냅샷을 저장할 디렉토리
+
+        Returns:
+            스냅샷 매니페스트
+        """
+        if self.vectorstore is None:
+            self._resolve_index_path()
+            if not self._has_index():
+                raise ValueError(f"내보낼 벡터 스토어가 없습니다: {self.vector_db_path}")
+            self.vectorstore = self._open_vector_store()
+        
+        data = self.vectorstore.get(include=["documents", "metadatas", "embeddings"])
+        if not data["ids"]:
+            raise ValueError("벡터 스토어가 비어 있습니다.")
+        
+        extra_files = {}
+        if isinstance(self.embeddings, HashedNgramEmbeddings):
+            # 로컬 임베딩은 IDF가 있어야 같은 쿼리 벡터를 만들 수 있음
+            extra_files[HashedNgramEmbeddings.IDF_FILE] = self.vector_db_path / HashedNgramEmbeddings.IDF_FILE
+        
+        manifest = index_snapshot.write_snapshot(
+            snapshot_dir,
+            ids=data["ids"],
+            texts=data["documents"],
+            metadatas=data["metadatas"],
+            embeddings=np.asarray(data["embeddings"], dtype=np.float32),
+            embedding_model=self.embedding_model,
+            chunk_hashes=self._load_manifest(),
+            extra_files=extra_files
+        )
+        print(f"스냅샷 내보내기 완료: {snapshot_dir} ({manifest['count']}개 청크, {manifest['dimensions']}차원)")
+        return manifest
+    
+    def import_snapshot(self, snapshot_dir: Union[str, Path]) -> Dict[str, Any]:
+        """스냅샷으로 새 인덱스 버전을 만들어 게시하고 RAG Chain까지 초기화 (임베딩 API 호출 없음)
+
+        Args:
+            snapshot_dir: export_snapshot으로 만든 스냅샷 디렉토리
+
+        Returns:
+            {"version", "count", "dimensions", "elapsed"}
+
+        Raises:
+            ValueError: 스냅샷이 손상되었거나 임베딩 모델이 현재 설정과 다른 경우
+        """
+        start_time = time.time()
+        snapshot_dir = Path(snapshot_dir)
+        snapshot = index_snapshot.load_snapshot(snapshot_dir)
+        manifest = snapshot["manifest"]
+        
+        # 다른 임베딩 공간의 벡터로는 쿼리 임베딩과 비교할 수 없음
+        if manifest["embedding_model"] != self.embedding_model:
+            raise ValueError(f"스냅샷 임베딩 모델({manifest['embedding_model']})이 "
+                             f"현재 설정({self.embedding_model})과 다릅니다.")
         
-        # FAQ 문서 처리
-        faq_documents = self._process_faq_documents()
-        documents.extend(faq_documents)
+        version = self.index_versions.new_version()
+        self.vector_db_path = self.index_versions.path(version)
+        self.vectorstore = None
+        try:
+            if isinstance(self.embeddings, HashedNgramEmbeddings):
+                idf_path = snapshot_dir / HashedNgramEmbeddings.IDF_FILE
+                if not idf_path.exists():
+                    raise ValueError("로컬 임베딩 스냅샷에 IDF 파일이 없습니다.")
+                shutil.copyfile(idf_path, self.vector_db_path / HashedNgramEmbeddings.IDF_FILE)
+            
+            self.vectorstore = self._open_vector_store()
+            self._write_vectors(snapshot["ids"], snapshot["texts"], snapshot["metadatas"], snapshot["embeddings"])
+            self._persist_vector_store()
+            
+            # 청크 해시를 동기화 매니페스트로 복원하여 이후 증분 동기화가 바뀐 청크만 처리하도록 함
+            # (매니페스트 없이 만든 인덱스의 스냅샷이면 저장된 내용으로 계산)
+            self._save_manifest(manifest["chunks"] or {
+                chunk_id: self._chunk_hash(Document(page_content=text, metadata=metadata))
+                for chunk_id, text, metadata in zip(snapshot["ids"], snapshot["texts"], snapshot["metadatas"])
+            })
+            self._publish_index_version(version)
+        except Exception:
+            self.vectorstore = None
+            shutil.rmtree(self.vector_db_path, ignore_errors=True)
+            raise
         
-        # 제품 정보 문서 처리
-        product_documents = self._process_product_documents()
-        documents.extend(product_documents)
+        self.initialize_vector_store()
         
-        print(f"총 {len(documents)}개 문서 로드")
-        return documents
+        stats = {"version": version, "count": manifest["count"], "dimensions": manifest["dimensions"],
+                 "elapsed": time.time() - start_time}
+        print(f"스냅샷 가져오기 완료: {stats['count']}개 청크 ({stats['elapsed']:.2f}초)")
+        return stats
+    
+    def _iter_documents(self) -> Iterator[Document]:
+        """FAQ/제품 원본 파일을 레코드 단위로 읽어 Document로 변환 (전체를 메모리에 올리지 않음)"""
+        yield from self._iter_faq_documents()
+        # 크롤링한 FAQ 페이지를 정제한 파일 (scripts/clean_documents.py로 생성)
+        if (self.raw_docs_path / "faq_pages.json").exists():
+            yield from self._iter_faq_documents("faq_pages.json")
+        yield from self._iter_product_documents()
     
-    def _process_faq_documents(self) -> List[Document]:
+    def _iter_faq_documents(self, file_name: str = "faq_data.json") -> Iterator[Document]:
         """FAQ 문서 처리"""
-        documents = []
-        faq_file = self.raw_docs_path / "faq_data.json"
+        faq_file = self.raw_docs_path / file_name
         
         if not faq_file.exists():
             print(f"FAQ 파일이 없습니다: {faq_file}")
-            return documents
+            return
         
+        count = 0
         try:
-            with open(faq_file, 'r', encoding='utf-8') as f:
-                faq_data = json.load(f)
-            
-            for faq in faq_data:
+            for faq in iter_json_array(faq_file):
                 # 특징 정보 포맷팅
                 feats = faq.get('features', [])
                 feature_text = "\n".join(feats) if isinstance(feats, list) else str(feats)
@@ -170,37 +822,39 @@ class RAGProcessor:
                 keywords = faq.get('keywords', [])
                 keywords_text = ", ".join(keywords) if isinstance(keywords, list) else str(keywords)
                 
-                doc = Document(
+                metadata = {
+                    "source": "faq",
+                    "doc_id": f"faq-{self._content_hash(faq['question'] or faq.get('id', faq['answer']))[:16]}",
+                    "question": faq['question'],
+                    "answer": faq['answer'],
+                    "features": feature_text,
+                    "keywords": keywords_text
+                }
+                if faq.get('category'):
+                    metadata["category"] = faq['category']
+                
+                yield Document(
                     page_content=f"질문: {faq['question']}\n답변: {faq['answer']}\n키워드: {keywords_text}",
-                    metadata={
-                        "source": "faq",
-                        "features": feature_text,
-                        "keywords": keywords_text
-                    }
+                    metadata=metadata
                 )
-                documents.append(doc)
+                count += 1
             
-            print(f"FAQ 문서 {len(documents)}개 처리 완료")
+            print(f"FAQ 문서 {count}개 처리 완료 ({file_name})")
             
         except Exception as e:
             print(f"FAQ 문서 처리 실패: {e}")
-        
-        return documents
     
-    def _process_product_documents(self) -> List[Document]:
+    def _iter_product_documents(self) -> Iterator[Document]:
         """제품 정보 문서 처리"""
-        documents = []
         product_file = self.raw_docs_path / "product_info.json"
         
         if not product_file.exists():
             print(f"제품 정보 파일이 없습니다: {product_file}")
-            return documents
+            return
         
+        count = 0
         try:
-            with open(product_file, 'r', encoding='utf-8') as f:
-                product_data = json.load(f)
-            
-            for product in product_data:
+            for product in iter_json_array(product_file):
                 # 사양 정보 포맷팅
                 specs = product.get('specifications', {})
                 # specs_text = ", ".join([f"{k}: {v}" for k, v in specs.items()]) if isinstance(specs, dict) else str(specs)
@@ -211,74 +865,473 @@ class RAGProcessor:
                 # features_text = ", ".join(features) if isinstance(features, list) else str(features)
                 features_text = "\n".join(features) if isinstance(features, list) else str(features)
                 
-                doc = Document(
+                metadata = {
+                    "source": "product",
+                    "doc_id": f"product-{product.get('product_id') or self._content_hash(product['name'])[:16]}",
+                    "product_id": product.get('product_id', ''),
+                    "category": product.get('category', '기타'),
+                    "keywords": str(product.get('keywords', ''))
+                }
+                # 가격은 숫자로 저장 ("39,000" 같은 문자열은 Chroma의 $gte/$lte 비교에 걸리지 않음)
+                price = parse_price(product.get('price', 0))
+                if price is not None:
+                    metadata["price"] = int(price)
+                
+                yield Document(
                     page_content=f"상품명: {product['name']}\n카테고리: {product['category']}\n키워드: {product['keywords']}\n설명: {product['description']}\n특징: {features_text}\n가격: {product['price']}원",
-                    metadata={
-                        "source": "product",
-                        "product_id": product.get('product_id', ''),
-                        "price": product.get('price', 0),
-                        "category": product.get('category', '기타'),
-                        "keywords": str(product.get('keywords', ''))
-                    }
+                    metadata=metadata
                 )
-                documents.append(doc)
+                count += 1
             
-            print(f"제품 문서 {len(documents)}개 처리 완료")
+            print(f"제품 문서 {count}개 처리 완료")
             
         except Exception as e:
             print(f"제품 문서 처리 실패: {e}")
+    
+    def _build_metadata_index(self):
+        """벡터 스토어에 저장된 청크 메타데이터로 검색 필터 인덱스 구성"""
+        try:
+            data = self.vectorstore.get(include=["metadatas"])
+            metadata_index = MetadataIndex()
+            metadata_index.build(data["ids"], data["metadatas"])
+            self.metadata_index = metadata_index
+        except Exception as e:
+            print(f"메타데이터 필터 인덱스 구성 실패: {e}")
+            self.metadata_index = MetadataIndex()
+    
+    def _build_sparse_index(self):
+        """벡터 스토어에 저장된 청크로 BM25 인덱스 구성"""
+        try:
+            data = self.vectorstore.get(include=["documents", "metadatas"])
+            documents = [
+                Document(page_content=text or "", metadata=metadata or {})
+                for text, metadata in zip(data["documents"], data["metadatas"])
+            ]
+            
+            self.sparse_index = BM25Index()
+            self.sparse_index.build(documents)
+            print(f"BM25 인덱스 구성 완료: {len(documents)}개 청크")
+        except Exception as e:
+            print(f"BM25 인덱스 구성 실패 (벡터 검색만 사용): {e}")
+            self.sparse_index = None
+    
+    def _dense_search(self, query: str, k: int,
+                      query_embedding: Optional[List[float]] = None,
+                      filters: Optional[Dict[str, Any]] = None,
+                      candidate_ids: Optional[AbstractSet[str]] = None) -> List[Tuple[Document, float]]:
+        """벡터 검색 (관련도 점수 포함, 높을수록 관련)
+
+        Args:
+            filters: 검색 필터 (Chroma는 where 절로 변환하여 사전 필터링)
+            candidate_ids: 필터에 맞는 청크 ID (numpy 백엔드는 이 행만 점수 계산)
+        """
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            search_kwargs = {"filter_ids": candidate_ids} if candidate_ids is not None else {}
+        else:
+            where = MetadataIndex.to_chroma_where(filters)
+            search_kwargs = {"filter": where} if where else {}
+        
+        if query_embedding is None:
+            return self.vectorstore.similarity_search_with_relevance_scores(query, k=k, **search_kwargs)
         
-        return documents
+        # 이미 계산된 임베딩으로 검색하고 거리를 관련도 점수로 변환
+        relevance_fn = self.vectorstore._select_relevance_score_fn()
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            results = self.vectorstore.similarity_search_with_score_by_vector(query_embedding, k=k, **search_kwargs)
+        else:
+            results = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                query_embedding, k=k, **search_kwargs
+            )
+        return [(doc, relevance_fn(score)) for doc, score in results]
     
-    def search_documents(self, query: str, k: int = 3) -> List[Document]:
-        """문서 검색"""
+    def search_documents_with_scores(self, query: str, k: int = 3,
+                                     query_embedding: Optional[List[float]] = None,
+                                     filters: Optional[Dict[str, Any]] = None
+                                     ) -> List[Tuple[Document, Optional[float]]]:
+        """관련도 점수와 함께 문서 검색 (BM25 인덱스가 있으면 벡터 검색과 RRF로 결합)
+
+        점수는 벡터 검색의 관련도이며, BM25에서만 찾은 문서는 None
+        min_relevance_score 미만인 결과는 제외하고, 남는 벡터 검색 결과가 없으면 빈 목록 반환
+
+        Args:
+            query: 검색 질의
+            k: 반환할 문서 수
+            query_embedding: 이미 계산된 쿼리 임베딩 (있으면 임베딩 호출 생략)
+            filters: 검색 전에 적용할 메타데이터 필터
+                ({"source", "category", "min_price", "max_price", "product_ids"}, core/metadata_index.py 참고)
+        """
         if not self.retriever:
             print("리트리버가 초기화되지 않았습니다.")
             return []
         
+        # 필터에 맞는 후보 청크만 검색 (미리 만든 출처/카테고리별 집합의 교집합)
+        # 잘못된 필터 키는 검색 실패가 아닌 호출 오류이므로 ValueError를 그대로 전달
+        candidate_ids = self.metadata_index.candidates(filters)
+        if candidate_ids is not None and not candidate_ids:
+            return []
+        
         try:
-            results = self.retriever.invoke(query)
-            return results[:k]
+            if self.sparse_index is None:
+                scored = self._dense_search(query, k, query_embedding, filters, candidate_ids)
+            else:
+                # 하이브리드 검색: 벡터/BM25 후보를 같은 수만큼 가져와 순위 결합
+                candidates = max(k, self.hybrid_candidates)
+                dense = self._dense_search(query, candidates, query_embedding, filters, candidate_ids)
+                sparse_docs = [
+                    doc for doc, _ in self.sparse_index.search(query, k=candidates, filter_ids=candidate_ids)
+                ]
+                
+                dense_scores = {self._doc_key(doc): score for doc, score in dense}
+                fused = self._reciprocal_rank_fusion([[doc for doc, _ in dense], sparse_docs], k)
+                scored = [(doc, dense_scores.get(self._doc_key(doc))) for doc in fused]
         except Exception as e:
             print(f"문서 검색 실패: {e}")
             return []
+        
+        # 가장 가까운 문서조차 관련도가 낮으면 관련 정보가 없는 질문으로 판단
+        scores = [score for _, score in scored if score is not None]
+        if not scores or max(scores) < self.min_relevance_score:
+            return []
+        return [(doc, score) for doc, score in scored if score is None or score >= self.min_relevance_score]
+    
+    def search_documents(self, query: str, k: int = 3,
+                         query_embedding: Optional[List[float]] = None,
+                         filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """문서 검색 (search_documents_with_scores에서 점수를 뺀 결과)
+
+        예: search_documents("셔츠 추천", filters={"source": "product", "category": "셔츠", "max_price": 50000})
+        """
+        return [doc for doc, _ in self.search_documents_with_scores(query, k, query_embedding, filters)]
+    
+    @staticmethod
+    def _doc_key(doc: Document) -> str:
+        """검색 결과 병합용 청크 식별자"""
+        return doc.metadata.get("chunk_id") or doc.page_content
+    
+    def _reciprocal_rank_fusion(self, result_lists: List[List[Document]], k: int,
+                                rrf_k: int = 60) -> List[Document]:
+        """여러 검색 결과를 RRF(Reciprocal Rank Fusion)로 결합하여 상위 k개 반환"""
+        scores: Dict[str, float] = {}
+        docs: Dict[str, Document] = {}
+        
+        for results in result_lists:
+            for rank, doc in enumerate(results):
+                key = self._doc_key(doc)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+                docs.setdefault(key, doc)
+        
+        ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [docs[key] for key in ranked]
     
-    def generate_response(self, query: str) -> str:
-        """RAG Chain을 사용한 응답 생성"""
+    def generate_response(self, query: str,
+                          docs: Optional[List[Union[Document, Tuple[Document, Optional[float]]]]] = None) -> str:
+        """RAG Chain을 사용한 응답 생성
+
+        Args:
+            query: 사용자 질문
+            docs: 이미 검색된 문서 (없으면 여기서 한 번 검색)
+        """
         if not self.rag_chain:
             return "죄송합니다. 시스템이 초기화되지 않았습니다."
         
+        if docs is None:
+            docs = self.search_documents_with_scores(query)
+        
         try:
-            response = self.rag_chain.invoke(query)
+            response = self.rag_chain.invoke({"question": query, "docs": docs})
             return response
         except Exception as e:
             print(f"응답 생성 실패: {e}")
-            return "죄송합니다. 현재 시스템에 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
+            return ERROR_RESPONSE
+    
+    def _lookup_cache(self, query: str) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """의미 기반 캐시 조회 (캐시 결과, 검색에 재사용할 쿼리 임베딩) 반환"""
+        if self.semantic_cache is None:
+            return None, None
+        
+        try:
+            query_embedding = self.embeddings.embed_query(query)
+            cached = self.semantic_cache.lookup(query_embedding)
+            if cached:
+                cached["cached"] = True
+            return cached, query_embedding
+        except Exception as e:
+            print(f"캐시 조회 실패: {e}")
+            return None, None
+    
+    def _store_in_cache(self, query: str, query_embedding: Optional[List[float]], result: Dict[str, Any]):
+        """정상 생성된 답변만 캐시에 저장"""
+        if self.semantic_cache is None or query_embedding is None:
+            return
+        if result["response"] == ERROR_RESPONSE:
+            return
+        self.semantic_cache.store(query, query_embedding, result)
+    
+    @staticmethod
+    def _parse_faq_answer(content: str) -> str:
+        """'질문: ...\n답변: ...\n키워드: ...' 형태의 청크에서 답변 부분 추출"""
+        if "답변:" not in content:
+            return ""
+        answer = content.split("답변:", 1)[1]
+        return answer.split("\n키워드:", 1)[0].strip()
+    
+    def _faq_direct_answer(self, scored_docs: List[Tuple[Document, Optional[float]]]) -> Optional[str]:
+        """FAQ가 확실히 일치하면 저장된 답변 반환 (아니면 None → LLM 생성)
+
+        관련도 1위 문서가 FAQ이고, 점수가 faq_direct_threshold 이상이며,
+        다른 문서 중 2위와의 차이가 faq_direct_margin 이상일 때만 직접 응답한다.
+        """
+        if not self.use_faq_fast_path:
+            return None
+        
+        dense = sorted(
+            [(doc, score) for doc, score in scored_docs if score is not None],
+            key=lambda item: item[1], reverse=True
+        )
+        if not dense:
+            return None
+        
+        top_doc, top_score = dense[0]
+        if top_doc.metadata.get("source") != "faq" or top_score < self.faq_direct_threshold:
+            return None
+        
+        # 같은 FAQ에서 나온 다른 청크는 경쟁 후보로 보지 않음
+        runner_up = next(
+            (score for doc, score in dense[1:] if doc.metadata.get("doc_id") != top_doc.metadata.get("doc_id")),
+            None
+        )
+        if runner_up is not None and top_score - runner_up < self.faq_direct_margin:
+            return None
+        
+        # 답변 메타데이터가 없는 이전 인덱스는 청크 본문에서 추출
+        answer = top_doc.metadata.get("answer") or self._parse_faq_answer(top_doc.page_content)
+        if not answer:
+            return None
+        return self.faq_answer_template.format(question=top_doc.metadata.get("question", ""), answer=answer)
+    
+    def _count(self, answer_type: str):
+        with self._stats_lock:
+            self._query_stats[answer_type] += 1
+    
+    def _cached_result(self, cached: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        self._count("cached")
+        cached["response_time"] = time.time() - start_time
+        return cached
+    
+    @staticmethod
+    def _confidence(scored_docs: List[Tuple[Document, Optional[float]]]) -> float:
+        """가장 관련도 높은 문서의 점수를 신뢰도로 사용 (0~1)"""
+        scores = [score for _, score in scored_docs if score is not None]
+        return round(min(1.0, max(scores)), 4) if scores else 0.0
+    
+    def _build_result(self, query: str, query_embedding: Optional[List[float]],
+                      scored_docs: List[Tuple[Document, Optional[float]]], response: str,
+                      start_time: float, answer_type: str = "llm") -> Dict[str, Any]:
+        """응답 딕셔너리 구성 및 캐시 저장"""
+        self._count(answer_type)
+        result = {
+            "response": response,
+            "sources": self._extract_sources(scored_docs),
+            "confidence": self._confidence(scored_docs),
+            "answer_type": answer_type
+        }
+        self._store_in_cache(query, query_embedding, result)
+        
+        result["response_time"] = time.time() - start_time
+        return result
+    
+    def _no_result(self, start_time: float) -> Dict[str, Any]:
+        self._count("no_result")
+        return {
+            "response": NO_RESULT_RESPONSE,
+            "sources": [],
+            "confidence": 0.0,
+            "response_time": time.time() - start_time
+        }
     
     def process_query(self, query: str) -> Dict[str, Any]:
         """쿼리 처리 (검색 + 응답 생성)"""
         start_time = time.time()
         
-        # 문서 검색
-        relevant_docs = self.search_documents(query)
+        # 의미 기반 캐시 조회 (쿼리 임베딩은 검색에도 재사용)
+        cached, query_embedding = self._lookup_cache(query)
+        if cached:
+            return self._cached_result(cached, start_time)
         
-        if not relevant_docs:
-            return {
-                "response": "죄송합니다. 관련된 정보를 찾을 수 없습니다. 고객센터(1588-1234)로 문의해주시면 더 자세한 도움을 받으실 수 있습니다.",
-                "sources": [],
-                "confidence": 0.0,
-                "response_time": time.time() - start_time
-            }
+        # 문서 검색 (관련도가 기준 미만이면 LLM 호출 없이 안내 문구 반환)
+        scored_docs = self.search_documents_with_scores(query, query_embedding=query_embedding)
+        
+        if not scored_docs:
+            return self._no_result(start_time)
         
-        # RAG Chain을 사용한 응답 생성
-        response = self.generate_response(query)
+        # FAQ가 확실히 일치하면 저장된 답변으로 바로 응답
+        faq_answer = self._faq_direct_answer(scored_docs)
+        if faq_answer:
+            return self._build_result(query, query_embedding, scored_docs, faq_answer, start_time, "faq_direct")
+        
+        # RAG Chain을 사용한 응답 생성 (검색 결과 재사용 - 임베딩/검색 1회)
+        response = self.generate_response(query, scored_docs)
+        
+        return self._build_result(query, query_embedding, scored_docs, response, start_time)
+    
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """현재 실행 중인 이벤트 루프의 동시 실행 제한 세마포어 (루프가 사라지면 함께 정리)"""
+        loop = asyncio.get_running_loop()
+        with self._async_semaphores_lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._async_semaphores[loop] = semaphore
+            return semaphore
+
+    async def aprocess_query(self, query: str, query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        """비동기 쿼리 처리 (이벤트 루프마다 max_concurrency 개까지 동시 실행)
+
+        Args:
+            query: 사용자 질문
+            query_embedding: 이미 계산된 쿼리 임베딩 (있으면 임베딩 호출 생략)
+        """
+        async with self._get_async_semaphore():
+            start_time = time.time()
+            
+            # 임베딩은 비동기 API로 계산하고 캐시 조회/검색에 함께 사용
+            if query_embedding is None:
+                try:
+                    query_embedding = await self.embeddings.aembed_query(query)
+                except Exception as e:
+                    print(f"쿼리 임베딩 실패: {e}")
+            
+            if self.semantic_cache is not None and query_embedding is not None:
+                cached = self.semantic_cache.lookup(query_embedding)
+                if cached:
+                    cached["cached"] = True
+                    return self._cached_result(cached, start_time)
+            
+            # 벡터 검색은 동기 API뿐이므로 스레드에서 실행
+            scored_docs = await asyncio.to_thread(
+                self.search_documents_with_scores, query, query_embedding=query_embedding
+            )
+            if not scored_docs:
+                return self._no_result(start_time)
+            
+            faq_answer = self._faq_direct_answer(scored_docs)
+            if faq_answer:
+                return self._build_result(query, query_embedding, scored_docs, faq_answer, start_time, "faq_direct")
+            
+            if not self.rag_chain:
+                response = "죄송합니다. 시스템이 초기화되지 않았습니다."
+            else:
+                try:
+                    response = await self.rag_chain.ainvoke(
+                        {"question": query, "docs": scored_docs}
+                    )
+                except Exception as e:
+                    print(f"응답 생성 실패: {e}")
+                    response = ERROR_RESPONSE
+            
+            return self._build_result(query, query_embedding, scored_docs, response, start_time)
+    
+    async def aprocess_queries(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """여러 쿼리 비동기 배치 처리
+
+        쿼리 임베딩은 aembed_documents 한 번으로 계산하고,
+        각 쿼리는 aprocess_query로 동시에 처리한다 (이벤트 루프별 세마포어로 max_concurrency 개까지).
+        """
+        if not queries:
+            return []
         
-        # 소스 정보 추출
+        try:
+            embeddings = await self.embeddings.aembed_documents(list(queries))
+        except Exception as e:
+            print(f"쿼리 임베딩 실패: {e}")
+            embeddings = [None] * len(queries)
+        
+        return list(await asyncio.gather(*(
+            self.aprocess_query(query, query_embedding=query_embedding)
+            for query, query_embedding in zip(queries, embeddings)
+        )))
+    
+    def process_queries(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """여러 쿼리 배치 처리 (aprocess_queries를 새 이벤트 루프에서 실행)
+
+        이미 이벤트 루프가 실행 중인 스레드(노트북 등)에서는 별도 스레드의 루프에서 실행한다.
+        비동기 코드에서는 aprocess_queries를 직접 await한다.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aprocess_queries(queries))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.aprocess_queries(queries)).result()
+    
+    def stream_response(self, query: str) -> Iterator[str]:
+        """답변을 토큰 단위로 생성하는 제너레이터 (검색/캐시는 process_query와 동일)"""
+        start_time = time.time()
+        cached, query_embedding = self._lookup_cache(query)
+        if cached:
+            yield self._cached_result(cached, start_time)["response"]
+            return
+        
+        scored_docs = self.search_documents_with_scores(query, query_embedding=query_embedding)
+        if not scored_docs:
+            yield self._no_result(start_time)["response"]
+            return
+        
+        faq_answer = self._faq_direct_answer(scored_docs)
+        if faq_answer:
+            yield self._build_result(query, query_embedding, scored_docs, faq_answer, start_time, "faq_direct")["response"]
+            return
+        
+        if not self.rag_chain:
+            yield "죄송합니다. 시스템이 초기화되지 않았습니다."
+            return
+        
+        chunks = []
+        try:
+            for chunk in self.rag_chain.stream({"question": query, "docs": scored_docs}):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            print(f"응답 생성 실패: {e}")
+            if not chunks:
+                yield ERROR_RESPONSE
+            return
+        
+        self._build_result(query, query_embedding, scored_docs, "".join(chunks), start_time)
+    
+    def invalidate_cache(self):
+        """응답 캐시 무효화"""
+        if self.semantic_cache is not None:
+            self.semantic_cache.invalidate()
+    
+    def get_query_stats(self) -> Dict[str, Any]:
+        """응답 유형별 처리 건수와 비율 (FAQ 직접 응답 비중 확인용)"""
+        with self._stats_lock:
+            stats = dict(self._query_stats)
+        total = sum(stats.values())
+        stats["total"] = total
+        for answer_type in ("cached", "faq_direct", "llm", "no_result"):
+            stats[f"{answer_type}_ratio"] = stats[answer_type] / total if total else 0.0
+        return stats
+    
+    def get_context_stats(self) -> Dict[str, Any]:
+        """컨텍스트 패킹 누적 통계 (절약한 프롬프트 토큰 수 등)"""
+        return self.context_packer.get_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """응답 캐시 통계 반환 (적중/미스 횟수 등)"""
+        if self.semantic_cache is None:
+            return {}
+        return self.semantic_cache.get_stats()
+    
+    def _extract_sources(self, scored_docs: List[Tuple[Document, Optional[float]]]) -> List[Dict[str, Any]]:
+        """소스 정보 추출"""
         sources = []
-        for doc in relevant_docs:
+        for doc, score in scored_docs:
             source_info = {
                 "source": doc.metadata.get("source", "unknown"),
-                "content_preview": doc.page_content[:100] + "..." if len(doc.page_content) > 100 else doc.page_content
+                "content_preview": doc.page_content[:100] + "..." if len(doc.page_content) > 100 else doc.page_content,
+                "relevance_score": score
             }
             if doc.metadata.get("source") == "product":
                 source_info["product_id"] = doc.metadata.get("product_id")
@@ -288,12 +1341,7 @@ class RAGProcessor:
             
             sources.append(source_info)
         
-        return {
-            "response": response,
-            "sources": sources,
-            "confidence": len(relevant_docs) / 3.0,
-            "response_time": time.time() - start_time
-        }
+        return sources
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+"""
+프로세스 전역 RAG 리소스 레지스트리
+설정별로 RAGProcessor(벡터 스토어, 임베딩 클라이언트 포함)와 LLM 클라이언트를
+하나씩만 만들어 모든 도구/세션이 공유하도록 관리
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_openai import ChatOpenAI
+
+from .rag_processor import DEFAULT_MODEL_NAME, RAGProcessor
+
+
+ConfigKey = Tuple[Tuple[str, Any], ...]
+
+
+class RAGRegistry:
+    """설정별 RAGProcessor / LLM 클라이언트 공유 레지스트리 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processors: Dict[ConfigKey, RAGProcessor] = {}
+        self._processor_locks: Dict[ConfigKey, threading.Lock] = {}
+        self._llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+        self._reload_hooks: List[Callable[[RAGProcessor], None]] = []
+
+    @staticmethod
+    def _config_key(config: Dict[str, Any]) -> ConfigKey:
+        return tuple(sorted(config.items()))
+
+    def get_llm(self, model_name: str = "gpt-4o-mini", temperature: float = 0.1) -> ChatOpenAI:
+        """(모델명, 온도)별 공유 LLM 클라이언트 반환"""
+        key = (model_name, temperature)
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                llm = ChatOpenAI(model=model_name, temperature=temperature)
+                self._llms[key] = llm
+            return llm
+
+    def _build_processor(self, config: Dict[str, Any], sync: bool = False) -> RAGProcessor:
+        # 응답 생성 LLM도 같은 모델을 쓰는 다른 컴포넌트와 공유 (프로세서가 따로 만들지 않도록 생성 시 전달)
+        llm = self.get_llm(config.get("model_name", DEFAULT_MODEL_NAME), 0.1)
+        processor = RAGProcessor(**config, llm=llm)
+        processor.initialize_vector_store(sync=sync)
+        return processor
+
+    def get_processor(self, **config: Any) -> RAGProcessor:
+        """설정별 공유 RAGProcessor 반환 (처음 요청 시 벡터 스토어까지 초기화)
+
+        Args:
+            **config: RAGProcessor 생성자 인자 (생략 시 기본 설정)
+        """
+        key = self._config_key(config)
+        with self._lock:
+            processor = self._processors.get(key)
+            if processor is not None:
+                return processor
+            processor_lock = self._processor_locks.setdefault(key, threading.Lock())
+
+        # 초기화는 오래 걸리므로 전역 잠금 밖에서, 같은 설정끼리만 한 번 수행
+        with processor_lock:
+            with self._lock:
+                processor = self._processors.get(key)
+            if processor is None:
+                processor = self._build_processor(config)
+                with self._lock:
+                    self._processors[key] = processor
+            return processor
+
+    def reload(self, sync: bool = False, **config: Any) -> Optional[RAGProcessor]:
+        """벡터 스토어를 다시 읽어 공유 RAGProcessor 교체
+
+        새 프로세서를 완전히 초기화한 뒤 교체하므로 진행 중인 요청은 이전 프로세서로 끝까지 처리된다.
+
+        Args:
+            sync: 원본 문서 변경분을 반영한 새 인덱스 버전을 만들어 게시한 뒤 교체할지 여부
+                (검증에 실패하면 기존 프로세서와 인덱스 버전을 그대로 사용)
+            **config: 다시 읽을 프로세서 설정 (아직 생성되지 않은 설정이면 None 반환)
+        """
+        key = self._config_key(config)
+        with self._lock:
+            if key not in self._processors:
+                return None
+            processor_lock = self._processor_locks.setdefault(key, threading.Lock())
+
+        with processor_lock:
+            processor = self._build_processor(config, sync=sync)
+            with self._lock:
+                self._processors[key] = processor
+                hooks = list(self._reload_hooks)
+
+        for hook in hooks:
+            try:
+                hook(processor)
+            except Exception as e:
+                print(f"리로드 훅 실행 실패: {e}")
+        return processor
+
+    def reload_all(self, sync: bool = False):
+        """생성된 모든 설정의 RAGProcessor 다시 읽기"""
+        with self._lock:
+            keys = list(self._processors)
+        for key in keys:
+            self.reload(sync=sync, **dict(key))
+
+    def add_reload_hook(self, hook: Callable[[RAGProcessor], None]):
+        """RAGProcessor가 교체될 때 호출할 함수 등록 (새 프로세서를 인자로 받음)"""
+        with self._lock:
+            self._reload_hooks.append(hook)
+
+    def clear(self):
+        """공유 리소스 모두 해제 (다음 요청 시 새로 생성)"""
+        with self._lock:
+            self._processors.clear()
+            self._processor_locks.clear()
+            self._llms.clear()
+
+
+_registry = RAGRegistry()
+
+
+def get_rag_registry() -> RAGRegistry:
+    """프로세스 전역 레지스트리 반환"""
+    return _registry
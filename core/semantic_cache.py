@@ -0,0 +1,124 @@
+"""
+의미 기반(semantic) 응답 캐시
+쿼리 임베딩의 코사인 유사도로 거의 같은 질문을 찾아 이전 답변을 재사용
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """쿼리 임베딩 → 생성 답변 캐시 (TTL + LRU)"""
+
+    def __init__(self, similarity_threshold: float = 0.95, ttl_seconds: float = 3600,
+                 max_entries: int = 512):
+        """
+        Args:
+            similarity_threshold: 캐시 적중으로 볼 최소 코사인 유사도
+            ttl_seconds: 항목 유효 시간 (초, 0 이하이면 만료 없음)
+            max_entries: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+        # 유사도 계산용 정규화 임베딩 행렬 (항목 변경 시 다시 만든다)
+        self._keys: List[int] = []
+        self._matrix: Optional[np.ndarray] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["created_at"] > self.ttl_seconds
+
+    def _remove_expired(self, now: float):
+        expired = [key for key, entry in self._entries.items() if self._is_expired(entry, now)]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _get_matrix(self) -> Optional[np.ndarray]:
+        if self._matrix is None and self._entries:
+            self._keys = list(self._entries.keys())
+            self._matrix = np.stack([self._entries[key]["embedding"] for key in self._keys])
+        return self._matrix
+
+    def lookup(self, embedding) -> Optional[Dict[str, Any]]:
+        """유사한 질문의 캐시된 결과 조회 (없으면 None)"""
+        query_vector = self._normalize(embedding)
+
+        with self._lock:
+            self._remove_expired(time.time())
+            matrix = self._get_matrix()
+
+            if matrix is None or matrix.shape[1] != query_vector.shape[0]:
+                self.misses += 1
+                return None
+
+            scores = matrix @ query_vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            key = self._keys[best]
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            result = dict(entry["result"])
+            result["cache_similarity"] = float(scores[best])
+            result["cached_query"] = entry["query"]
+            return result
+
+    def store(self, query: str, embedding, result: Dict[str, Any]):
+        """질문 임베딩과 결과 저장"""
+        with self._lock:
+            self._entries[self._next_key] = {
+                "query": query,
+                "embedding": self._normalize(embedding),
+                "result": dict(result),
+                "created_at": time.time()
+            }
+            self._next_key += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+            self._matrix = None
+
+    def invalidate(self):
+        """전체 캐시 무효화 (벡터 스토어 재구성 시 호출)"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._keys = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
@@ -0,0 +1,115 @@
+"""
+BM25 희소(sparse) 검색 인덱스
+한국어 문자 n-gram 토큰화를 사용하여 상품코드, 브랜드명 등 정확한 용어 검색을 보완
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+_WORD_PATTERN = re.compile(r"\w+")
+_ASCII_WORD_PATTERN = re.compile(r"^[0-9a-z_]+$")
+
+
+class BM25Index:
+    """문자 n-gram 토큰 기반 인메모리 BM25 인덱스"""
+
+    def __init__(self, ngram_range: Tuple[int, int] = (2, 3), k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            ngram_range: 한글 단어에 적용할 문자 n-gram 길이 범위 (최소, 최대)
+            k1: BM25 단어 빈도 포화 파라미터
+            b: BM25 문서 길이 정규화 파라미터
+        """
+        self.ngram_range = ngram_range
+        self.k1 = k1
+        self.b = b
+
+        self.documents: List[Document] = []
+        self._positions: Dict[str, int] = {}
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._idf: Dict[str, float] = {}
+        self._doc_lengths: List[int] = []
+        self._avg_doc_length = 0.0
+
+    def tokenize(self, text: str) -> List[str]:
+        """토큰화: 영문/숫자 단어는 그대로, 한글 등은 문자 n-gram으로 분해"""
+        tokens = []
+        min_n, max_n = self.ngram_range
+
+        for word in _WORD_PATTERN.findall(text.lower()):
+            # 상품코드(GM0025032809786), 영문 브랜드명 등은 정확 일치 토큰으로 유지
+            if _ASCII_WORD_PATTERN.match(word) or len(word) < min_n:
+                tokens.append(word)
+                continue
+
+            # 한국어는 띄어쓰기/조사 변화가 많으므로 문자 n-gram으로 분해
+            for n in range(min_n, max_n + 1):
+                if len(word) < n:
+                    break
+                tokens.extend(word[i:i + n] for i in range(len(word) - n + 1))
+
+        return tokens
+
+    def build(self, documents: List[Document]):
+        """문서 목록으로 인덱스 구성"""
+        postings = defaultdict(list)
+        doc_lengths = []
+
+        for doc_index, doc in enumerate(documents):
+            term_counts = Counter(self.tokenize(doc.page_content))
+            doc_lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                postings[term].append((doc_index, count))
+
+        total = len(documents)
+        self.documents = list(documents)
+        self._positions = {
+            doc.metadata["chunk_id"]: doc_index
+            for doc_index, doc in enumerate(self.documents) if doc.metadata.get("chunk_id")
+        }
+        self._postings = dict(postings)
+        self._doc_lengths = doc_lengths
+        self._avg_doc_length = sum(doc_lengths) / total if total else 0.0
+        self._idf = {
+            term: math.log(1 + (total - len(entries) + 0.5) / (len(entries) + 0.5))
+            for term, entries in self._postings.items()
+        }
+
+    def search(self, query: str, k: int = 10,
+               filter_ids: Optional[AbstractSet[str]] = None) -> List[Tuple[Document, float]]:
+        """BM25 점수 상위 k개 문서 반환
+
+        Args:
+            filter_ids: 검색 대상 청크 ID (있으면 이 청크들만 점수 계산)
+        """
+        if not self.documents:
+            return []
+
+        allowed = None
+        if filter_ids is not None:
+            allowed = {self._positions[chunk_id] for chunk_id in filter_ids if chunk_id in self._positions}
+            if not allowed:
+                return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(self.tokenize(query)):
+            entries = self._postings.get(term)
+            if not entries:
+                continue
+
+            idf = self._idf[term]
+            for doc_index, count in entries:
+                if allowed is not None and doc_index not in allowed:
+                    continue
+                length_norm = 1 - self.b + self.b * self._doc_lengths[doc_index] / self._avg_doc_length
+                scores[doc_index] += idf * count * (self.k1 + 1) / (count + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[doc_index], score) for doc_index, score in ranked]
+
+    def __len__(self) -> int:
+        return len(self.documents)
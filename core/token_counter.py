@@ -0,0 +1,56 @@
+"""
+토큰 수 계산 유틸리티
+tiktoken을 쓸 수 있으면 모델 인코딩으로 정확히 세고,
+설치되어 있지 않거나 인코딩 파일을 받을 수 없으면 문자 수 기반으로 추정
+"""
+import re
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+_WHITESPACE_PATTERN = re.compile(r"\s")
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model_name: str):
+    """모델 인코딩 반환 (사용할 수 없으면 None)"""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # 오프라인 환경 등에서 인코딩 파일을 받지 못한 경우
+        print(f"tiktoken 인코딩 로드 실패 (토큰 수를 추정합니다): {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """문자 수 기반 토큰 수 추정 (한글은 음절당 1토큰, 그 외 문자는 4자당 1토큰)"""
+    hangul = len(_HANGUL_PATTERN.findall(text))
+    others = len(_WHITESPACE_PATTERN.sub("", text)) - hangul
+    return hangul + (others + 3) // 4
+
+
+def count_tokens(text: str, model_name: str = "gpt-4o-mini") -> int:
+    """텍스트의 토큰 수 반환"""
+    if not text:
+        return 0
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def token_counter_backend(model_name: str = "gpt-4o-mini") -> Optional[str]:
+    """토큰 수 계산 방식 (tiktoken 인코딩 이름, 추정이면 None)"""
+    encoding = _get_encoding(model_name)
+    return encoding.name if encoding is not None else None
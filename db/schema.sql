@@ -96,6 +96,29 @@ CREATE TABLE IF NOT EXISTS chat_logs (
     FOREIGN KEY (user_id) REFERENCES users(user_id)
 );
 
+-- 상품 전문 검색 테이블 (trigram: 한국어도 3글자 이상 부분 문자열 검색, rowid = products.rowid)
+-- core/db_query_engine.py의 PRODUCT_FTS_SCHEMA와 동일 (기존 DB에는 scripts/migrate_db.py로 생성)
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, description, keywords,
+    tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+    DELETE FROM products_fts WHERE rowid = new.rowid;
+    INSERT INTO products_fts (rowid, name, description, keywords)
+    VALUES (new.rowid, new.name, new.description, new.keywords);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+    DELETE FROM products_fts WHERE rowid = old.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN
+    DELETE FROM products_fts WHERE rowid = old.rowid;
+    INSERT INTO products_fts (rowid, name, description, keywords)
+    VALUES (new.rowid, new.name, new.description, new.keywords);
+END;
+
 -- 인덱스 생성
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders(user_id);
@@ -0,0 +1,118 @@
+"""
+주문 조회 쿼리 벤치마크 스크립트
+주문마다 상품을 따로 조회하던 방식(N+1)과 IN 일괄 조회 방식의 쿼리 수/지연 시간 비교
+
+사용 예:
+    python scripts/benchmark_order_queries.py
+    python scripts/benchmark_order_queries.py --orders 500 --items 5 --repeat 50
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from core.db_query_engine import DatabaseQueryEngine
+
+
+def build_database(db_path: Path, users: int, orders: int, items: int):
+    """스키마를 적용하고 사용자별 주문 orders건 × 상품 items개의 합성 데이터 생성"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript((project_root / "db" / "schema.sql").read_text(encoding="utf-8"))
+    rng = random.Random(0)
+
+    conn.executemany(
+        "INSERT INTO users (user_id, username, email, phone, join_date) VALUES (?, ?, ?, ?, '2024-01-01')",
+        [(u, f"user{u}", f"user{u}@example.com", f"010-0000-{u:04d}") for u in range(1, users + 1)]
+    )
+    order_rows, item_rows = [], []
+    for u in range(1, users + 1):
+        for o in range(orders):
+            order_id = f"ORD{u:04d}{o:06d}"
+            order_rows.append((order_id, u, f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                               "배송완료", 10000 * items, "서울시"))
+            for i in range(items):
+                item_rows.append((order_id, f"P{rng.randint(1, 1000):04d}", f"상품 {i}", 1, 10000))
+    conn.executemany(
+        "INSERT INTO orders (order_id, user_id, order_date, status, total_amount, shipping_address) "
+        "VALUES (?, ?, ?, ?, ?, ?)", order_rows
+    )
+    conn.executemany(
+        "INSERT INTO order_items (order_id, product_id, product_name, quantity, price) VALUES (?, ?, ?, ?, ?)",
+        item_rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_user_orders_n_plus_one(conn: sqlite3.Connection, user_id: int, limit: int):
+    """기존 방식: 주문 목록 조회 후 주문마다 상품 조회"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM orders WHERE user_id = ? ORDER BY order_date DESC LIMIT ?", (user_id, limit))
+    orders = []
+    for row in cursor.fetchall():
+        order = dict(row)
+        cursor.execute("SELECT * FROM order_items WHERE order_id = ?", (order['order_id'],))
+        order['items'] = [dict(item_row) for item_row in cursor.fetchall()]
+        orders.append(order)
+    return orders
+
+
+def measure(fn, conn: sqlite3.Connection, repeat: int):
+    """(평균 ms, 호출당 쿼리 수, 마지막 결과)"""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    result = fn()
+    queries = sum(1 for sql in statements if sql.lstrip().upper().startswith("SELECT"))
+    conn.set_trace_callback(None)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, queries, result
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="주문 + 주문 상품 조회 쿼리 벤치마크")
+    parser.add_argument("--users", type=int, default=5, help="사용자 수")
+    parser.add_argument("--orders", type=int, default=300, help="사용자당 주문 수")
+    parser.add_argument("--items", type=int, default=3, help="주문당 상품 수")
+    parser.add_argument("--repeat", type=int, default=30, help="측정 반복 횟수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "bench.db"
+        print(f"🔧 합성 DB 생성 중... (사용자 {args.users}명 × 주문 {args.orders}건 × 상품 {args.items}개)")
+        build_database(db_path, args.users, args.orders, args.items)
+
+        engine = DatabaseQueryEngine(str(db_path))
+        conn = engine._get_connection()
+
+        print(f"\n📊 사용자 1명의 주문 조회 (반복 {args.repeat}회 평균)")
+        print(f"{'주문 수(limit)':<16}{'N+1 ms':>10}{'N+1 쿼리':>10}{'일괄 ms':>10}{'일괄 쿼리':>10}{'속도 향상':>10}")
+        for limit in sorted({10, 50, args.orders}):
+            old_ms, old_queries, old_result = measure(
+                lambda: get_user_orders_n_plus_one(conn, 1, limit), conn, args.repeat)
+            new_ms, new_queries, new_result = measure(
+                lambda: engine.get_user_orders(1, limit), conn, args.repeat)
+            if old_result != new_result:
+                print(f"❌ 결과 불일치 (limit={limit})")
+                return 1
+            print(f"{limit:<16}{old_ms:>10.2f}{old_queries:>10}{new_ms:>10.2f}{new_queries:>10}"
+                  f"{old_ms / new_ms:>9.1f}x")
+
+        engine.close()
+
+    print("\n✅ 두 방식의 결과가 동일합니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,148 @@
+"""
+벡터 검색 인덱스 벤치마크 스크립트
+차원 축소(Matryoshka)/양자화 검색 모드별 1차 검색 인덱스 메모리, QPS, recall@k를
+전체 정밀도(float32, 전체 차원) 검색과 비교
+
+사용 예:
+    python scripts/benchmark_vector_index.py                       # 합성 3072차원 벡터 50,000개
+    python scripts/benchmark_vector_index.py --source index        # 현재 numpy 인덱스의 벡터 사용
+    python scripts/benchmark_vector_index.py --modes 512,512+int8,1024+binary --k 10
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from core.numpy_vector_store import NumpyVectorStore
+from core.index_versions import IndexVersionStore
+
+DEFAULT_MODES = "full,1024,512,256,full+int8,1024+int8,512+int8,1024+binary,full+binary"
+
+
+def synthetic_vectors(count: int, dimensions: int, decay_dimensions: float = 256.0,
+                      noise: float = 1.2, seed: int = 0) -> np.ndarray:
+    """Matryoshka 임베딩처럼 앞쪽 차원일수록 분산이 큰 군집형 합성 벡터
+
+    군집(약 10개씩)이 서로 많이 겹치고 뒤쪽 차원에도 정보가 남아 있어
+    앞쪽 차원만으로는 순위가 달라지는 경우가 생긴다 (축소 모드의 recall 손실 측정용).
+
+    Args:
+        decay_dimensions: 분산이 절반으로 줄어드는 데 걸리는 차원 수 (클수록 뒤쪽 차원 비중이 큼)
+        noise: 군집 중심 대비 잡음 크기 (클수록 군집이 겹침)
+    """
+    rng = np.random.default_rng(seed)
+    decay = (1.0 / np.sqrt(1.0 + np.arange(dimensions) / decay_dimensions)).astype(np.float32)
+    centers = rng.standard_normal((max(count // 10, 1), dimensions), dtype=np.float32) * decay
+    labels = rng.integers(0, centers.shape[0], count)
+    vectors = centers[labels]
+    vectors += rng.standard_normal((count, dimensions), dtype=np.float32) * decay * noise
+    return vectors
+
+
+def index_vectors(vector_backend_root: Path) -> np.ndarray:
+    """현재 게시된 numpy 인덱스의 임베딩 행렬"""
+    versions = IndexVersionStore(vector_backend_root)
+    version = versions.current()
+    directory = versions.path(version) if version else versions.root
+    path = directory / NumpyVectorStore.EMBEDDINGS_FILE
+    if not path.exists():
+        raise FileNotFoundError(f"numpy 인덱스가 없습니다: {path} (simple_embed.py --vector-backend numpy로 생성)")
+    return np.asarray(np.load(path), dtype=np.float32)
+
+
+def parse_mode(mode: str):
+    """'512+int8' → (512, "int8"), 'full' → (None, "none")"""
+    dims, _, quantization = mode.partition("+")
+    return (None if dims == "full" else int(dims)), (quantization or "none")
+
+
+def run_queries(store: NumpyVectorStore, queries: np.ndarray, k: int):
+    """쿼리별 top-k ID 목록과 총 소요 시간"""
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append([doc.metadata["id"] for doc, _ in store.similarity_search_with_score_by_vector(query, k=k)])
+    return results, time.perf_counter() - start
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="벡터 검색 인덱스 모드 벤치마크")
+    parser.add_argument("--source", choices=["synthetic", "index"], default="synthetic", help="벡터 출처")
+    parser.add_argument("--index-root", default=str(project_root / "data" / "vectordb_numpy"),
+                        help="--source index일 때 numpy 인덱스 루트 디렉토리")
+    parser.add_argument("--count", type=int, default=50000, help="합성 벡터 수")
+    parser.add_argument("--dimensions", type=int, default=3072, help="합성 벡터 차원")
+    parser.add_argument("--decay-dimensions", type=float, default=256.0,
+                        help="합성 벡터 분산 감소 속도 (클수록 축소 모드에 불리)")
+    parser.add_argument("--noise", type=float, default=1.2, help="합성 벡터 군집 잡음 (클수록 군집이 겹침)")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    parser.add_argument("--k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--rescore-factor", type=int, default=4, help="재계산 후보 수 배수")
+    parser.add_argument("--modes", default=DEFAULT_MODES, help="쉼표로 구분한 모드 (차원[+int8|+binary])")
+    args = parser.parse_args()
+
+    if args.source == "index":
+        vectors = index_vectors(Path(args.index_root))
+    else:
+        print(f"🔧 합성 벡터 생성 중... ({args.count:,}개 × {args.dimensions}차원)")
+        vectors = synthetic_vectors(args.count, args.dimensions, args.decay_dimensions, args.noise)
+
+    # 쿼리: 저장된 벡터에 잡음을 더한 벡터 (임베딩 API 호출 없이 비슷한 질문을 흉내)
+    rng = np.random.default_rng(1)
+    sample = rng.choice(vectors.shape[0], min(args.queries, vectors.shape[0]), replace=False)
+    queries = vectors[sample] + rng.standard_normal((len(sample), vectors.shape[1]), dtype=np.float32) \
+        * vectors.std() * 0.5
+
+    ids = [str(i) for i in range(vectors.shape[0])]
+    store = NumpyVectorStore(embedding_function=None, rescore_factor=args.rescore_factor)
+    store.add_embeddings(ids, vectors, metadatas=[{"id": doc_id} for doc_id in ids], ids=ids)
+    full_bytes = store._matrix.nbytes
+
+    baseline, baseline_time = run_queries(store, queries, args.k)
+
+    print(f"\n📊 {vectors.shape[0]:,}개 × {vectors.shape[1]}차원, 쿼리 {len(queries)}개, "
+          f"k={args.k}, 재계산 후보 k×{args.rescore_factor}")
+    print(f"{'모드':<16}{'1차 인덱스 MB':>14}{'메모리 비율':>12}{'빌드(초)':>10}{'QPS':>10}"
+          f"{f'recall@{args.k}':>12}{'재계산 없음':>12}")
+    print(f"{'full (기준)':<16}{full_bytes / 2**20:>14.1f}{1.0:>12.3f}{0.0:>10.2f}"
+          f"{len(queries) / baseline_time:>10.1f}{1.0:>12.3f}{1.0:>12.3f}")
+
+    for mode in args.modes.split(","):
+        dims, quantization = parse_mode(mode.strip())
+        if dims is None and quantization == "none":
+            continue
+        store.search_dimensions = dims
+        store.quantization = quantization
+        store._search_index = None
+
+        start = time.perf_counter()
+        index_bytes = store._get_search_index()["codes"].nbytes
+        build_time = time.perf_counter() - start
+
+        results, elapsed = run_queries(store, queries, args.k)
+        recall = np.mean([len(set(r) & set(b)) / len(b) for r, b in zip(results, baseline)])
+
+        # 재계산 없이 1차 검색 top-k만 쓴 경우 (후보를 k개만 뽑으면 재계산은 순서만 바꿈)
+        store.rescore_factor = 1
+        unrescored, _ = run_queries(store, queries, args.k)
+        store.rescore_factor = args.rescore_factor
+        unrescored_recall = np.mean([len(set(r) & set(b)) / len(b) for r, b in zip(unrescored, baseline)])
+
+        print(f"{mode:<16}{index_bytes / 2**20:>14.1f}{index_bytes / full_bytes:>12.3f}{build_time:>10.2f}"
+              f"{len(queries) / elapsed:>10.1f}{recall:>12.3f}{unrescored_recall:>12.3f}")
+
+    print("\n※ 전체 정밀도 행렬은 재계산용으로 메모리 매핑되어 후보 행만 읽힘")
+    print("※ '재계산 없음'은 1차 검색 top-k를 그대로 쓴 recall (재계산으로 회복되는 정도 비교용)")
+    print("※ int8은 메모리 절약 전용 (NumPy에서는 같은 차원의 양자화 없는 모드보다 느림)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
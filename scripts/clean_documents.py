@@ -0,0 +1,95 @@
+"""
+크롤링 FAQ 문서 정제 스크립트
+data/documents.json의 HTML을 평문으로 정제하고 질문별 문서로 나누어
+data/raw_docs/faq_pages.json으로 저장한 뒤, 정제 전후 토큰 수를 비교
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from core.document_loader import iter_json_array
+from core.html_cleaner import clean_faq_pages
+from core.token_counter import count_tokens, token_counter_backend
+
+data_dir = project_root / "data"
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="크롤링 FAQ 문서 HTML 정제")
+    parser.add_argument("--input", default=str(data_dir / "documents.json"), help="원본 문서 파일")
+    parser.add_argument("--output", default=str(data_dir / "raw_docs" / "faq_pages.json"), help="정제 결과 파일")
+    parser.add_argument("--model", default="gpt-4o-mini", help="토큰 수 계산 기준 모델")
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    output_path = Path(args.output)
+    if not input_path.exists():
+        print(f"⚠️ 원본 문서 파일이 없습니다: {input_path}")
+        return 1
+
+    stats = {"records": 0, "before_content": 0, "before_metadata": 0}
+
+    def tracked_records():
+        # 원본 토큰 수: 임베딩/프롬프트에 들어가던 본문 + 매번 함께 저장되던 메타데이터
+        for record in iter_json_array(input_path):
+            stats["records"] += 1
+            stats["before_content"] += count_tokens(record.get("page_content", ""), args.model)
+            stats["before_metadata"] += count_tokens(
+                json.dumps(record.get("metadata", {}), ensure_ascii=False), args.model
+            )
+            yield record
+
+    print("🧹 FAQ 문서 정제 중...")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(".tmp")
+
+    documents = 0
+    after_content = 0
+    after_metadata = 0
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("[\n")
+        for faq in clean_faq_pages(tracked_records()):
+            if documents:
+                f.write(",\n")
+            f.write(json.dumps(faq, ensure_ascii=False))
+            documents += 1
+
+            # RAGProcessor가 만드는 청크 본문과 같은 형식으로 계산
+            after_content += count_tokens(
+                f"질문: {faq['question']}\n답변: {faq['answer']}\n키워드: {', '.join(faq['keywords'])}",
+                args.model
+            )
+            after_metadata += count_tokens(json.dumps(
+                {"question": faq["question"], "category": faq["category"]}, ensure_ascii=False
+            ), args.model)
+        f.write("\n]\n")
+    tmp_path.replace(output_path)
+
+    before_total = stats["before_content"] + stats["before_metadata"]
+    after_total = after_content + after_metadata
+    backend = token_counter_backend(args.model) or "추정치 (tiktoken 사용 불가)"
+
+    print(f"✅ 정제 완료: {stats['records']}개 레코드 → {documents}개 문서 ({output_path})")
+    print(f"\n📊 토큰 수 비교 (기준: {args.model}, {backend})")
+    print(f"{'':<16}{'정제 전':>12}{'정제 후':>12}{'감소율':>10}")
+    for label, before, after in [
+        ("본문 (임베딩)", stats["before_content"], after_content),
+        ("메타데이터", stats["before_metadata"], after_metadata),
+        ("합계", before_total, after_total),
+    ]:
+        reduction = (1 - after / before) * 100 if before else 0.0
+        print(f"{label:<16}{before:>12,}{after:>12,}{reduction:>9.1f}%")
+    if documents:
+        print(f"\n문서당 평균 본문 토큰: {stats['before_content'] / max(stats['records'], 1):.1f} → "
+              f"{after_content / documents:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,59 @@
+"""
+벡터 인덱스 스냅샷 내보내기/가져오기 스크립트
+임베딩이 끝난 인덱스를 스냅샷으로 내보내고, 새 서버에서는 임베딩 API 호출 없이 가져와 바로 서비스
+
+사용 예:
+    python scripts/index_snapshot.py export --path snapshots/faq-v1
+    python scripts/index_snapshot.py import --path snapshots/faq-v1 --vector-backend numpy
+"""
+import argparse
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="벡터 인덱스 스냅샷 내보내기/가져오기")
+    parser.add_argument("command", choices=["export", "import"], help="export: 스냅샷 저장, import: 스냅샷으로 인덱스 구성")
+    parser.add_argument("--path", required=True, help="스냅샷 디렉토리")
+    parser.add_argument("--embedding-backend", choices=["openai", "local"], default="openai",
+                        help="임베딩 백엔드 (스냅샷의 임베딩 모델과 같아야 함)")
+    parser.add_argument("--vector-backend", choices=["chroma", "numpy"], default="chroma",
+                        help="벡터 스토어 백엔드 (내보낸 백엔드와 달라도 됨)")
+    args = parser.parse_args()
+
+    try:
+        from core.rag_processor import RAGProcessor
+
+        rag_processor = RAGProcessor(
+            embedding_backend=args.embedding_backend,
+            vector_backend=args.vector_backend
+        )
+
+        if args.command == "export":
+            print(f"📦 스냅샷 내보내기: {rag_processor.vector_db_path} → {args.path}")
+            manifest = rag_processor.export_snapshot(args.path)
+            print(f"✅ 완료: {manifest['count']}개 청크, {manifest['dimensions']}차원 ({manifest['embedding_model']})")
+        else:
+            print(f"📥 스냅샷 가져오기: {args.path} → {rag_processor.index_versions.root}")
+            stats = rag_processor.import_snapshot(args.path)
+            print(f"✅ 완료: 인덱스 버전 {stats['version']}, {stats['count']}개 청크, ⏱️ {stats['elapsed']:.2f}초")
+        return 0
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
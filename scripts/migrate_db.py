@@ -0,0 +1,47 @@
+"""
+데이터베이스 마이그레이션 스크립트
+기존 DB를 WAL 모드로 전환하고 상품 전문 검색(FTS5) 테이블/트리거를 만들거나 다시 구성
+(DatabaseQueryEngine은 DB 파일을 바꾸지 않으므로 이 단계를 명시적으로 실행)
+
+사용 예:
+    python scripts/migrate_db.py
+    python scripts/migrate_db.py --db-path data/sample_db/ecommerce.db
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from core.db_query_engine import DatabaseQueryEngine, DEFAULT_DB_PATH
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="데이터베이스 마이그레이션 (WAL 모드, 상품 전문 검색 인덱스)")
+    parser.add_argument("--db-path", default=str(DEFAULT_DB_PATH), help="SQLite 데이터베이스 경로")
+    args = parser.parse_args()
+
+    db_path = Path(args.db_path)
+    if not db_path.exists():
+        print(f"❌ 데이터베이스 파일이 없습니다: {db_path}")
+        return 1
+
+    try:
+        print(f"🔧 마이그레이션 중: {db_path}")
+        with DatabaseQueryEngine(str(db_path), async_chat_log=False) as db_engine:
+            db_engine.migrate_database()
+        print("✅ 마이그레이션 완료 (WAL 모드, 상품 전문 검색 인덱스)")
+        return 0
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -3,10 +3,12 @@
 """
 import sqlite3
 import json
+import sys
 from pathlib import Path
 
 # 프로젝트 루트 경로
 project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
 db_path = project_root / "data" / "sample_db" / "ecommerce.db"
 
 def create_tables():
@@ -152,6 +154,12 @@ def main():
     
     # 샘플 데이터 삽입
     insert_sample_data()
+
+    # WAL 모드 전환 및 상품 전문 검색 인덱스 생성
+    from core.db_query_engine import DatabaseQueryEngine
+    with DatabaseQueryEngine(str(db_path), async_chat_log=False) as db_engine:
+        db_engine.migrate_database()
+    print("✅ 상품 검색 인덱스 생성 완료")
     
     print(f"✅ 데이터베이스 초기화 완료: {db_path}")
 
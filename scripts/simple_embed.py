@@ -1,15 +1,12 @@
 """
 문서 임베딩 스크립트
 FAQ와 상품 정보를 벡터 데이터베이스에 임베딩
+(RAGProcessor가 새 인덱스 버전을 만들어 검증 후 게시, data/vectordb_* 아래에 직접 쓰지 않음)
 """
-import json
-import os
+import argparse
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
-from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain_core.documents import Document
 
 # 환경변수 로드
 load_dotenv()
@@ -18,129 +15,28 @@ load_dotenv()
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-data_dir = project_root / "data"
-vector_db_path = data_dir / "vectordb_chroma"
-
-def load_documents():
-    """문서 로드"""
-    documents = []
-    
-    # FAQ 문서 로드
-    faq_path = data_dir / "raw_docs" / "faq_data.json"
-    if faq_path.exists():
-        with open(faq_path, 'r', encoding='utf-8') as f:
-            faq_data = json.load(f)
-            
-        for faq in faq_data:
-            doc = Document(
-                page_content=f"질문: {faq['question']}\n답변: {faq['answer']}",
-                metadata={
-                    "source": "faq",
-                    "category": faq['category'],
-                    "faq_id": faq.get('faq_id', faq.get('id', 'unknown')),
-                    "keywords": faq.get('keywords', '')
-                }
-            )
-            documents.append(doc)
-    
-    # 제품 정보 문서 로드
-    product_path = data_dir / "raw_docs" / "product_info.json"
-    if product_path.exists():
-        with open(product_path, 'r', encoding='utf-8') as f:
-            product_data = json.load(f)
-            
-        for product in product_data:
-            # 사양 정보를 문자열로 변환
-            specs = product.get('specifications', {})
-            specs_text = ", ".join([f"{k}: {v}" for k, v in specs.items()]) if isinstance(specs, dict) else str(specs)
-            
-            # 특징 정보를 문자열로 변환
-            features = product.get('features', [])
-            features_text = ", ".join(features) if isinstance(features, list) else str(features)
-            
-            doc = Document(
-                page_content=f"상품명: {product['name']}\n설명: {product['description']}\n사양: {specs_text}\n특징: {features_text}\n가격: {product['price']:,}원",
-                metadata={
-                    "source": "product",
-                    "product_id": product['product_id'],
-                    "category": product['category'],
-                    "price": product['price'],
-                    "keywords": str(product.get('keywords', ''))
-                }
-            )
-            documents.append(doc)
-    
-    return documents
-
-def create_vector_store():
-    """벡터 스토어 생성"""
-    print("📄 문서 로드 중...")
-    documents = load_documents()
-    
-    if not documents:
-        print("⚠️ 로드할 문서가 없습니다.")
-        return None
-    
-    print(f"📄 {len(documents)}개 문서 로드 완료")
-    
-    # 임베딩 모델 초기화
-    print("🔧 임베딩 모델 초기화 중...")
-    embeddings = OpenAIEmbeddings()
-    
-    # 벡터 스토어 생성
-    print("💾 벡터 스토어 생성 중...")
-    vector_db_path.mkdir(parents=True, exist_ok=True)
-    
-    vectorstore = Chroma.from_documents(
-        documents=documents,
-        embedding=embeddings,
-        persist_directory=str(vector_db_path)
-    )
-    
-    # 저장
-    vectorstore.persist()
-    print(f"✅ 벡터 스토어 생성 완료: {vector_db_path}")
-    
-    return vectorstore
-
-def test_search():
-    """검색 테스트"""
-    print("\n🔍 검색 테스트 시작...")
-    
-    # 임베딩 모델 초기화
-    embeddings = OpenAIEmbeddings()
-    
-    # 벡터 스토어 로드
-    vectorstore = Chroma(
-        persist_directory=str(vector_db_path),
-        embedding_function=embeddings
-    )
-    
-    # 테스트 쿼리
-    test_queries = [
-        "배송비는 얼마인가요?",
-        "무선 이어폰 가격",
-        "반품 방법"
-    ]
-    
-    for query in test_queries:
-        print(f"\n질문: {query}")
-        results = vectorstore.similarity_search(query, k=2)
-        
-        for i, doc in enumerate(results, 1):
-            print(f"  결과 {i}: {doc.page_content[:100]}...")
-            print(f"  소스: {doc.metadata.get('source', 'unknown')}")
 
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="문서 임베딩 및 벡터 스토어 생성")
+    parser.add_argument("--embedding-backend", choices=["openai", "local"], default="openai",
+                        help="임베딩 백엔드 (local: 네트워크 없이 해시 n-gram TF-IDF 사용, 별도 인덱스)")
+    parser.add_argument("--vector-backend", choices=["chroma", "numpy"], default="chroma",
+                        help="벡터 스토어 백엔드")
+    args = parser.parse_args()
+
     print("🚀 문서 임베딩 시작...")
 
     try:
         # RAG 프로세서를 사용한 임베딩
         from core.rag_processor import RAGProcessor
 
-        rag_processor = RAGProcessor()
-        rag_processor.initialize_vector_store()
+        rag_processor = RAGProcessor(
+            embedding_backend=args.embedding_backend,
+            vector_backend=args.vector_backend
+        )
+        # 새 인덱스 버전에 변경된 문서만 다시 임베딩한 뒤 검증하여 게시 (서비스 중인 버전은 그대로)
+        rag_processor.initialize_vector_store(sync=True)
 
         print("✅ 문서 임베딩 완료!")
 
@@ -154,6 +50,12 @@ def main():
         print("\n🔍 테스트 쿼리 실행:")
         for query in test_queries:
             print(f"\n질문: {query}")
+            if args.embedding_backend == "local":
+                # 로컬 백엔드는 네트워크 없이 검색 결과만 확인
+                for doc, score in rag_processor.search_documents_with_scores(query):
+                    score_text = f"{score:.3f}" if score is not None else "BM25"
+                    print(f"  [{score_text}] {doc.page_content[:80]}...")
+                continue
             result = rag_processor.process_query(query)
             print(f"답변: {result['response'][:100]}...")
             print(f"신뢰도: {result['confidence']:.2f}")
@@ -37,6 +37,34 @@ def test_rag_processor():
     except Exception as e:
         print(f"❌ RAG 프로세서 테스트 실패: {e}")
 
+def test_metadata_filters():
+    """검색 필터 백엔드 일치 테스트 (Chroma where 절과 numpy 사전 필터가 같은 청크를 반환하는지)"""
+    print("🔎 검색 필터 백엔드 일치 테스트")
+    print("-" * 50)
+    
+    try:
+        from core.rag_processor import RAGProcessor
+        
+        filters = {"source": "product", "min_price": 30000, "max_price": 100000}
+        found = {}
+        for backend in ("chroma", "numpy"):
+            # 로컬 임베딩으로 두 백엔드에 같은 문서를 적재하고, 필터에 맞는 청크를 모두 조회
+            rag = RAGProcessor(vector_backend=backend, embedding_backend="local",
+                               use_hybrid_search=False, min_relevance_score=-1.0)
+            rag.initialize_vector_store()
+            results = rag.search_documents("상품 추천", k=len(rag.metadata_index) or 1, filters=filters)
+            found[backend] = sorted(doc.metadata.get("chunk_id", "") for doc in results)
+        
+        print(f"필터: {filters}")
+        print(f"청크 수: chroma {len(found['chroma'])}개, numpy {len(found['numpy'])}개")
+        if found["chroma"] == found["numpy"]:
+            print("✅ 두 백엔드의 검색 결과가 동일합니다.")
+        else:
+            print(f"❌ 검색 결과 불일치: {sorted(set(found['chroma']) ^ set(found['numpy']))}")
+            
+    except Exception as e:
+        print(f"❌ 검색 필터 테스트 실패: {e}")
+
 def test_db_query_engine():
     """DB 쿼리 엔진 테스트"""
     print("🗄️ DB 쿼리 엔진 테스트")
@@ -162,6 +190,7 @@ def main():
     
     try:
         test_rag_processor()
+        test_metadata_filters()
         test_db_query_engine()
         test_delivery_api()
         test_langchain_tools()